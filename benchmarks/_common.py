@@ -0,0 +1,67 @@
+# benchmarks/_common.py
+#
+# Helpers shared by the benchmark scripts.
+
+import contextlib
+import os
+import statistics
+
+
+def percentile(ordered, fraction):
+    """
+    The `fraction` (0-1) percentile of already sorted samples, interpolating
+    between the two nearest ones, so it never falls below the median for
+    fraction >= 0.5 however few samples there are.
+    """
+    if not ordered:
+        raise ValueError("percentile of no samples")
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """Summary of timing samples in seconds, reported in milliseconds."""
+    if not samples:
+        return {"runs": 0}
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def open_library(workdir, music_dir, workers=None, use_processes=False):
+    """
+    A LibraryManager watching `music_dir`, with its database, art cache and
+    settings in `workdir`/data rather than the user's profile. Not scanned yet.
+    """
+    # Kivy reads these when first imported: keep it from parsing the benchmark's arguments.
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    from dad_player.core.library_manager import LibraryManager
+    from dad_player.core.settings_manager import SettingsManager
+
+    data_dir = os.path.join(workdir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    settings = SettingsManager(data_dir=data_dir)
+    settings.put("music_folders", [music_dir])
+    if workers:
+        settings.set_scan_workers(workers)
+    settings.set_scan_use_processes(use_processes)
+    return LibraryManager(settings, data_dir=data_dir)
+
+
+@contextlib.contextmanager
+def scanned_library(workdir, music_dir, **options):
+    """open_library() after a full scan of `music_dir`; closed on exit."""
+    library = open_library(workdir, music_dir, **options)
+    try:
+        library.run_scan(full_rescan=True)
+        yield library
+    finally:
+        library.close()
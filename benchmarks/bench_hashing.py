@@ -0,0 +1,77 @@
+# benchmarks/bench_hashing.py
+#
+# Compares the legacy full-file MD5 (generate_file_hash) with the sampled
+# fingerprint (generate_file_fingerprint) used by library scans.
+#
+#   python -m benchmarks.bench_hashing --files 50 --size-mb 30
+#   python -m benchmarks.bench_hashing --dir "D:/Music"
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from dad_player.utils.file_utils import (
+    FINGERPRINT_SAMPLE_SIZE, generate_file_fingerprint, generate_file_hash, iter_audio_files
+)
+
+
+def _make_files(directory, count, size_mb):
+    paths = []
+    chunk = os.urandom(1024 * 1024)
+    for i in range(count):
+        path = os.path.join(directory, f"bench_{i:04d}.flac")
+        with open(path, "wb") as f:
+            for _ in range(size_mb):
+                f.write(chunk)
+            f.write(i.to_bytes(4, "little"))
+        paths.append(path)
+    return paths
+
+
+def _time_function(func, paths, bytes_per_file):
+    start = time.perf_counter()
+    for path in paths:
+        func(path)
+    elapsed = time.perf_counter() - start
+    total_bytes = sum(bytes_per_file(path) for path in paths)
+    return {
+        "seconds": round(elapsed, 4),
+        "files_per_second": round(len(paths) / elapsed, 1) if elapsed else None,
+        "mb_read": round(total_bytes / (1024 * 1024), 2),
+        "mb_per_second_of_library": round(
+            sum(os.path.getsize(p) for p in paths) / (1024 * 1024) / elapsed, 1
+        ) if elapsed else None,
+    }
+
+
+def run(paths):
+    sampled_bytes = lambda p: min(os.path.getsize(p), FINGERPRINT_SAMPLE_SIZE * 3)
+    return {
+        "files": len(paths),
+        "library_mb": round(sum(os.path.getsize(p) for p in paths) / (1024 * 1024), 2),
+        "md5_full_file": _time_function(generate_file_hash, paths, os.path.getsize),
+        "fingerprint_sampled": _time_function(generate_file_fingerprint, paths, sampled_bytes),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark file hashing used by library scans.")
+    parser.add_argument("--dir", help="Benchmark the audio files in an existing folder instead.")
+    parser.add_argument("--files", type=int, default=50, help="Synthetic files to create.")
+    parser.add_argument("--size-mb", type=int, default=30, help="Size of each synthetic file.")
+    args = parser.parse_args(argv)
+
+    if args.dir:
+        report = run([entry.path for entry in iter_audio_files([args.dir])])
+    else:
+        with tempfile.TemporaryDirectory(prefix="harmony_bench_") as tmp:
+            report = run(_make_files(tmp, args.files, args.size_mb))
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# benchmarks/bench_library.py
+#
+# End-to-end scan and query benchmark on synthetic libraries. For each size
+# it generates a library, runs LibraryManager scans headlessly and times the
+# query methods the UI uses, then writes one JSON report for comparing releases.
+#
+#   python -m benchmarks.bench_library                       # 1k, 10k and 100k tracks
+#   python -m benchmarks.bench_library --sizes 1000 --art-size 600 --output report.json
+#   python -m benchmarks.bench_library --sizes 10000 --formats flac --tag-density full
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import mutagen
+
+from benchmarks._common import open_library, summarize
+from benchmarks.synthetic_library import FORMATS, TAG_DENSITIES, generate_library
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+QUERY_REPEATS = 20
+# Entries in the play queue / playlist used for the batch lookup timings.
+QUEUE_SIZE = 5000
+# Share of files rewritten before the "incremental with changes" scan.
+CHANGED_FRACTION = 0.01
+
+
+def _age_directories(root, seconds=120):
+    # Freshly written directories fall inside the scanner's mtime slack and would
+    # never be treated as unchanged; backdate them as if the library were old.
+    stamp = time.time() - seconds
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (stamp, stamp))
+
+
+def _touch_content(paths):
+    # Appending changes the size and fingerprint, so the files must be re-parsed.
+    for path in paths:
+        with open(path, "ab") as f:
+            f.write(b"\x00" * 16)
+
+
+def _timed_scan(library, full_rescan=False, force_deep=False):
+    start = time.perf_counter()
+    library.run_scan(full_rescan, force_deep)
+    seconds = time.perf_counter() - start
+    stats = dict(library.last_scan_stats)
+    checked = stats.get("checked", 0)
+    return {
+        "seconds": round(seconds, 3),
+        "files_per_second": round(checked / seconds, 1) if seconds else None,
+        "stats": stats,
+    }
+
+
+def _query_suite(library, paths):
+    rng = random.Random(1234)
+    albums = library.get_all_albums()
+    artists = library.get_all_artists()
+    album = rng.choice(albums) if albums else None
+    artist = rng.choice(artists) if artists else None
+    sample_paths = rng.sample(paths, min(QUERY_REPEATS, len(paths)))
+    queue = rng.choices(paths, k=QUEUE_SIZE) if paths else []
+    # Cursor of the last non-empty page, to show a page deep in the library costs the same as the first.
+    last_cursor, cursor = None, None
+    while True:
+        page, next_cursor = library.get_tracks_page(cursor)
+        if page:
+            last_cursor = cursor
+        if next_cursor is None:
+            break
+        cursor = next_cursor
+
+    queries = {
+        "get_all_artists": lambda i: library.get_all_artists(),
+        "get_all_albums": lambda i: library.get_all_albums(),
+        "get_all_albums_consolidated": lambda i: library.get_all_albums(consolidated=True),
+        "get_albums_by_artist": lambda i: library.get_albums_by_artist(artist["id"]),
+        "get_tracks_by_album": lambda i: library.get_tracks_by_album(album["id"]),
+        "get_tracks_by_album_name": lambda i: library.get_tracks_by_album_name(album["name"]),
+        "search_tracks_all": lambda i: library.search_tracks(""),
+        "get_tracks_page_first": lambda i: library.get_tracks_page(),
+        "get_tracks_page_last": lambda i: library.get_tracks_page(last_cursor),
+        "search_tracks_prefix": lambda i: library.search_tracks("song 00"),
+        "search_tracks_no_match": lambda i: library.search_tracks("zzzz"),
+        "get_track_summary_by_filepath": lambda i: library.get_track_summary_by_filepath(sample_paths[i % len(sample_paths)]),
+        "get_track_details_by_filepath": lambda i: library.get_track_details_by_filepath(sample_paths[i % len(sample_paths)]),
+        "get_track_details_with_text": lambda i: library.get_track_details_by_filepath(sample_paths[i % len(sample_paths)], include_text=True),
+        "queue_summaries_per_row": lambda i: [library.get_track_summary_by_filepath(fp) for fp in queue],
+        "queue_summaries_batch": lambda i: library.get_track_summaries_for_filepaths(queue),
+        "queue_summaries_batch_uncached": lambda i: library._track_cache.clear() or library.get_track_summaries_for_filepaths(queue),
+        "queue_details_batch": lambda i: library.get_track_details_for_filepaths(queue),
+    }
+    report = {}
+    for name, query in queries.items():
+        if (album is None and "album" in name and "all" not in name) or (artist is None and "artist" in name and "all" not in name):
+            continue
+        samples, rows = [], None
+        for i in range(QUERY_REPEATS):
+            start = time.perf_counter()
+            result = query(i)
+            samples.append(time.perf_counter() - start)
+            if isinstance(result, tuple):
+                result = result[0]
+            rows = len(result) if isinstance(result, list) else int(result is not None)
+        report[name] = dict(summarize(samples), rows=rows)
+    return report
+
+
+def bench_size(workdir, tracks, args):
+    music_dir = os.path.join(workdir, f"music_{tracks}")
+
+    start = time.perf_counter()
+    paths = generate_library(music_dir, tracks, args.album_size, formats=tuple(args.formats.split(",")),
+                             art_size=args.art_size, tag_density=args.tag_density)
+    generate_seconds = time.perf_counter() - start
+    _age_directories(music_dir)
+
+    library = open_library(os.path.join(workdir, f"library_{tracks}"), music_dir,
+                           workers=args.workers, use_processes=args.processes)
+
+    scans = {"full": _timed_scan(library, full_rescan=True)}
+    scans["incremental_unchanged"] = _timed_scan(library)
+    scans["incremental_deep"] = _timed_scan(library, force_deep=True)
+    changed = paths[::max(1, int(1 / CHANGED_FRACTION))]
+    _touch_content(changed)
+    # In-place edits leave directory mtimes alone, so only a deep scan notices them.
+    scans["incremental_changed_deep"] = dict(_timed_scan(library, force_deep=True), files_changed=len(changed))
+
+    queries = _query_suite(library, paths)
+    track_cache = library.get_track_cache_stats()
+    library.close()
+    return {
+        "tracks": tracks,
+        "library_mb": round(sum(os.path.getsize(p) for p in paths) / (1024 * 1024), 2),
+        "generate_seconds": round(generate_seconds, 2),
+        "database_mb": round(os.path.getsize(library.db_path) / (1024 * 1024), 2),
+        "scans": scans,
+        "queries": queries,
+        "track_cache": track_cache,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark library scans and queries on synthetic libraries.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Track counts to test.")
+    parser.add_argument("--album-size", type=int, default=12, help="Tracks per album.")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated subset of: " + ", ".join(FORMATS))
+    parser.add_argument("--art-size", type=int, default=500, help="Embedded cover size in pixels (0 = no art).")
+    parser.add_argument("--tag-density", choices=TAG_DENSITIES, default="basic")
+    parser.add_argument("--workers", type=int, default=0, help="Scan workers (0 = the app default).")
+    parser.add_argument("--processes", action="store_true", help="Scan with a process pool instead of threads.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    report = {
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "git_revision": _git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "sqlite": sqlite3.sqlite_version,
+            "mutagen": mutagen.version_string,
+        },
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="harmony_bench_") as tmp:
+        for tracks in args.sizes:
+            print(f"Benchmarking {tracks} tracks...", file=sys.stderr)
+            report["results"].append(bench_size(tmp, tracks, args))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_read_latency.py
+#
+# Measures how long UI-style library reads take while a full rescan is
+# writing to the database, compared with the same reads on an idle library.
+#
+#   python -m benchmarks.bench_read_latency --tracks 3000
+#   python -m benchmarks.bench_read_latency --tracks 3000 --lock-reads   # pre-WAL behaviour
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks._common import scanned_library, summarize
+from benchmarks.synthetic_library import generate_library
+
+READ_QUERIES = (
+    ("get_all_albums", lambda lm: lm.get_all_albums()),
+    ("get_all_artists", lambda lm: lm.get_all_artists()),
+    ("search_tracks", lambda lm: lm.search_tracks("song 00")),
+)
+
+
+def _measure_reads(library_manager, keep_going, lock_reads):
+    samples = {name: [] for name, _ in READ_QUERIES}
+    while keep_going():
+        for name, query in READ_QUERIES:
+            start = time.perf_counter()
+            if lock_reads:
+                with library_manager._db_lock:
+                    query(library_manager)
+            else:
+                query(library_manager)
+            samples[name].append(time.perf_counter() - start)
+        time.sleep(0.01)  # Roughly the pace of a user scrolling and searching.
+    return {name: summarize(values) for name, values in samples.items()}
+
+
+def run(workdir, music_dir, lock_reads=False, idle_seconds=2.0):
+    with scanned_library(workdir, music_dir) as library:
+        deadline = time.monotonic() + idle_seconds
+        idle = _measure_reads(library, lambda: time.monotonic() < deadline, lock_reads)
+
+        scan_started = time.perf_counter()
+        library.start_scan_music_library(full_rescan=True)
+        during_scan = _measure_reads(library, lambda: library.is_scanning, lock_reads)
+        scan_seconds = time.perf_counter() - scan_started
+
+    return {
+        "tracks": library.last_scan_stats.get("checked", 0),
+        "readers_take_db_lock": lock_reads,
+        "full_rescan_seconds": round(scan_seconds, 2),
+        "idle": idle,
+        "during_scan": during_scan,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark library read latency during a scan.")
+    parser.add_argument("--tracks", type=int, default=3000, help="Synthetic tracks to generate.")
+    parser.add_argument("--lock-reads", action="store_true",
+                        help="Make reads take the writer lock, as they did before WAL connections.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="harmony_bench_") as tmp:
+        music_dir = os.path.join(tmp, "music")
+        generate_library(music_dir, args.tracks)
+        report = run(tmp, music_dir, lock_reads=args.lock_reads)
+    json.dump(report, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
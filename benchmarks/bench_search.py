@@ -0,0 +1,79 @@
+# benchmarks/bench_search.py
+#
+# Compares search_tracks (FTS5 prefix match, bm25 ranked) with the substring
+# LIKE search it replaced, on a synthetic library, and times the fuzzy search
+# used when neither finds anything. Prints a JSON report with per-query
+# latency and result counts.
+#
+#   python -m benchmarks.bench_search --tracks 100000
+#   python -m benchmarks.bench_search --tracks 10000 --repeats 50 --output search.json
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks._common import scanned_library, summarize
+from benchmarks.synthetic_library import generate_library
+
+# Typical keystroke states: short prefixes, whole words, several words, no match.
+DEFAULT_QUERIES = ("so", "song", "song 0042", "artist 0003", "album 00017", "rock", "composer 4", "zzz")
+# Misspelt queries that only the fuzzy search can answer.
+FUZZY_QUERIES = ("sonh 000042", "artst 0003", "albun 00017", "ablum 00170", "zzz")
+
+
+def _time(call, repeats):
+    samples, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = call()
+        samples.append(time.perf_counter() - start)
+    return dict(summarize(samples), rows=len(result))
+
+
+def _run(library, args):
+    report = {"tracks": args.tracks, "repeats": args.repeats, "fts_available": library._search_index, "queries": {}}
+    for query in args.query or DEFAULT_QUERIES:
+        report["queries"][query] = {
+            "fts": _time(lambda: library.search_tracks(query), args.repeats),
+            "like": _time(lambda: library._search_tracks_like(query), args.repeats),
+        }
+
+    start = time.perf_counter()
+    library._fuzzy_index.build()
+    report["fuzzy_index_build_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    report["fuzzy_queries"] = {
+        query: _time(lambda: library.fuzzy_search_tracks(query), args.repeats)
+        for query in args.fuzzy_query or FUZZY_QUERIES
+    }
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FTS5 search against LIKE search.")
+    parser.add_argument("--tracks", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--query", action="append", help="Query to time (repeatable; default: a built-in set).")
+    parser.add_argument("--fuzzy-query", action="append", help="Query to time with fuzzy search (repeatable).")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="harmony_search_") as tmp:
+        music_dir = os.path.join(tmp, "music")
+        print(f"Generating and scanning {args.tracks} tracks...", file=sys.stderr)
+        generate_library(music_dir, args.tracks, tag_density="full")
+        with scanned_library(tmp, music_dir) as library:
+            report = _run(library, args)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
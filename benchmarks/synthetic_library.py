@@ -0,0 +1,229 @@
+# benchmarks/synthetic_library.py
+#
+# Builds throwaway music libraries of tagged audio files for the benchmarks.
+# Files contain just enough stream structure for mutagen to parse them; they
+# do not play. Layout is root/<Artist>/<Album>/NN - <Title>.<ext>.
+#
+#   python -m benchmarks.synthetic_library /tmp/music --tracks 5000 --art-size 600
+
+import argparse
+import io
+import os
+import struct
+
+from mutagen.flac import FLAC, Picture
+from mutagen.id3 import (
+    APIC, COMM, ID3, TALB, TBPM, TCOM, TCON, TCOP, TDRC, TIT2, TPE1, TPE2, TPOS, TPUB, TRCK, USLT
+)
+from mutagen.mp4 import MP4, MP4Cover
+from mutagen.ogg import OggPage
+from mutagen.oggvorbis import OggVorbis
+from mutagen._vorbis import VComment
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+FORMATS = ("mp3", "flac", "ogg", "m4a")
+TAG_DENSITIES = ("basic", "full")
+GENRES = ("Rock", "Jazz", "Electronic", "Classical", "Hip-Hop", "Folk")
+
+SAMPLE_RATE = 44100
+TRACK_SECONDS = 180
+
+# A silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz); mutagen only needs a valid header.
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+MP3_FRAMES_PER_FILE = 40
+
+# =============================================================================
+# Bare Containers
+# =============================================================================
+
+def _atom(name, payload):
+    return struct.pack(">I4s", 8 + len(payload), name) + payload
+
+
+def _flac_bytes(salt):
+    total_samples = SAMPLE_RATE * TRACK_SECONDS
+    packed = (SAMPLE_RATE << 44) | (1 << 41) | (15 << 36) | total_samples  # stereo, 16 bit
+    streaminfo = struct.pack(">HH", 4096, 4096) + b"\x00" * 6 + packed.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + bytes([0x80, 0, 0, len(streaminfo)]) + streaminfo + salt
+
+
+def _ogg_bytes(salt):
+    ident = (b"\x01vorbis" + struct.pack("<IBI", 0, 2, SAMPLE_RATE)
+             + struct.pack("<iii", 0, 160000, 0) + b"\xb8\x01")
+    comment = b"\x03vorbis" + VComment().write(framing=True)
+    setup = b"\x05vorbis" + b"\x00" * 32
+    pages = []
+    for sequence, (packets, position) in enumerate((([ident], 0), ([comment, setup], 0),
+                                                    ([salt], SAMPLE_RATE * TRACK_SECONDS))):
+        page = OggPage()
+        page.packets, page.serial, page.sequence, page.position = packets, 1, sequence, position
+        page.first = sequence == 0
+        page.last = sequence == 2
+        pages.append(page.write())
+    return b"".join(pages)
+
+
+def _m4a_bytes(salt):
+    mvhd = _atom(b"mvhd", b"\x00" * 12 + struct.pack(">II", 1000, TRACK_SECONDS * 1000) + b"\x00" * 80)
+    mdhd = _atom(b"mdhd", b"\x00" * 12 + struct.pack(">II", SAMPLE_RATE, SAMPLE_RATE * TRACK_SECONDS) + b"\x00" * 4)
+    hdlr = _atom(b"hdlr", b"\x00" * 8 + b"soun" + b"\x00" * 13)
+    stsd = _atom(b"stsd", b"\x00" * 8)
+    minf = _atom(b"minf", _atom(b"stbl", stsd))
+    trak = _atom(b"trak", _atom(b"mdia", mdhd + hdlr + minf))
+    ftyp = _atom(b"ftyp", b"M4A \x00\x00\x00\x00M4A mp42isom")
+    return ftyp + _atom(b"moov", mvhd + trak) + _atom(b"mdat", salt)
+
+# =============================================================================
+# Tag Writers
+# =============================================================================
+
+def _write_mp3(path, tags, art, salt):
+    with open(path, "wb") as f:
+        f.write(MP3_FRAME * MP3_FRAMES_PER_FILE + salt)
+    id3 = ID3()
+    frames = {
+        "title": TIT2, "artist": TPE1, "albumartist": TPE2, "album": TALB, "tracknumber": TRCK,
+        "date": TDRC, "genre": TCON, "composer": TCOM, "publisher": TPUB, "copyright": TCOP,
+        "bpm": TBPM, "discnumber": TPOS,
+    }
+    for key, frame in frames.items():
+        if key in tags:
+            id3.add(frame(encoding=3, text=tags[key]))
+    if "comment" in tags:
+        id3.add(COMM(encoding=3, lang="eng", desc="", text=tags["comment"]))
+    if "lyrics" in tags:
+        id3.add(USLT(encoding=3, lang="eng", desc="", text=tags["lyrics"]))
+    if art:
+        # The scanner reads the 'APIC:' frame, i.e. a picture with an empty description.
+        id3.add(APIC(encoding=3, mime="image/jpeg", type=3, desc="", data=art))
+    id3.save(path)
+
+
+def _write_flac(path, tags, art, salt):
+    with open(path, "wb") as f:
+        f.write(_flac_bytes(salt))
+    audio = FLAC(path)
+    for key, value in tags.items():
+        audio[key] = value
+    if art:
+        picture = Picture()
+        picture.type, picture.mime, picture.data = 3, "image/jpeg", art
+        audio.add_picture(picture)
+    audio.save()
+
+
+def _write_ogg(path, tags, art, salt):
+    # The scanner does not read METADATA_BLOCK_PICTURE, so Ogg files carry no art.
+    with open(path, "wb") as f:
+        f.write(_ogg_bytes(salt))
+    audio = OggVorbis(path)
+    for key, value in tags.items():
+        audio[key] = value
+    audio.save()
+
+
+def _write_m4a(path, tags, art, salt):
+    with open(path, "wb") as f:
+        f.write(_m4a_bytes(salt))
+    audio = MP4(path)
+    keys = {
+        "title": "\xa9nam", "artist": "\xa9ART", "albumartist": "aART", "album": "\xa9alb",
+        "date": "\xa9day", "genre": "\xa9gen", "composer": "\xa9wrt", "comment": "\xa9cmt",
+        "lyrics": "\xa9lyr", "copyright": "cprt",
+    }
+    for key, atom in keys.items():
+        if key in tags:
+            audio[atom] = [tags[key]]
+    audio["trkn"] = [(int(tags["tracknumber"]), 0)]
+    if "bpm" in tags:
+        audio["tmpo"] = [int(tags["bpm"])]
+    if art:
+        audio["covr"] = [MP4Cover(art, imageformat=MP4Cover.FORMAT_JPEG)]
+    audio.save()
+
+
+WRITERS = {"mp3": _write_mp3, "flac": _write_flac, "ogg": _write_ogg, "m4a": _write_m4a}
+
+# =============================================================================
+# Library Generation
+# =============================================================================
+
+def make_cover_art(size, seed):
+    """A solid-colour JPEG of size x size pixels; None when PIL is missing or size is 0."""
+    if not size or PILImage is None:
+        return None
+    colour = ((seed * 67) % 256, (seed * 131) % 256, (seed * 197) % 256)
+    stream = io.BytesIO()
+    PILImage.new("RGB", (size, size), colour).save(stream, format="JPEG", quality=90)
+    return stream.getvalue()
+
+
+def track_tags(index, artist, album, track_number, album_index, tag_density):
+    tags = {
+        "title": f"Song {index:06d}",
+        "artist": artist,
+        "albumartist": artist,
+        "album": album,
+        "tracknumber": str(track_number),
+        "date": str(1970 + album_index % 50),
+        "genre": GENRES[album_index % len(GENRES)],
+    }
+    if tag_density == "full":
+        tags.update({
+            "composer": f"Composer {index % 97:02d}",
+            "comment": f"Synthetic track {index} for library benchmarks.",
+            "lyrics": "\n".join(f"Line {n} of song {index}" for n in range(12)),
+            "publisher": f"Label {album_index % 13:02d}",
+            "copyright": f"(C) {1970 + album_index % 50} Label {album_index % 13:02d}",
+            "bpm": str(80 + index % 90),
+            "discnumber": "1",
+        })
+    return tags
+
+
+def generate_library(root, tracks, tracks_per_album=10, albums_per_artist=5, formats=("mp3",),
+                     art_size=0, tag_density="basic"):
+    """
+    Writes `tracks` files and returns their paths. Each album uses one format,
+    cycling through `formats`, and gets its own cover of `art_size` pixels
+    embedded in every track (0 disables art).
+    """
+    paths = []
+    art = None
+    for i in range(tracks):
+        album_index, track_index = divmod(i, tracks_per_album)
+        artist = f"Artist {album_index // albums_per_artist:04d}"
+        album = f"Album {album_index:05d}"
+        fmt = formats[album_index % len(formats)]
+        directory = os.path.join(root, artist, album)
+        if track_index == 0:
+            os.makedirs(directory, exist_ok=True)
+            art = make_cover_art(art_size, album_index)
+        tags = track_tags(i, artist, album, track_index + 1, album_index, tag_density)
+        path = os.path.join(directory, f"{track_index + 1:02d} - {tags['title']}.{fmt}")
+        # The salt keeps every file's content (and so its fingerprint) unique.
+        WRITERS[fmt](path, tags, art, i.to_bytes(8, "little"))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic tagged music library.")
+    parser.add_argument("root", help="Directory to create the library in.")
+    parser.add_argument("--tracks", type=int, default=1000)
+    parser.add_argument("--album-size", type=int, default=10, help="Tracks per album.")
+    parser.add_argument("--formats", default=",".join(FORMATS), help="Comma-separated subset of: " + ", ".join(FORMATS))
+    parser.add_argument("--art-size", type=int, default=0, help="Embedded cover size in pixels (0 = no art).")
+    parser.add_argument("--tag-density", choices=TAG_DENSITIES, default="basic")
+    args = parser.parse_args(argv)
+    paths = generate_library(args.root, args.tracks, args.album_size, formats=tuple(args.formats.split(",")),
+                             art_size=args.art_size, tag_density=args.tag_density)
+    print(f"Wrote {len(paths)} files to {args.root}")
+
+
+if __name__ == "__main__":
+    main()
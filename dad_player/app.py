@@ -8,9 +8,12 @@ from kivy.lang import Builder
 from kivy.uix.label import Label
 from kivymd.app import MDApp
 from kivymd.uix.screenmanager import MDScreenManager
-from dad_player.constants import APP_NAME, APP_VERSION, CONFIG_KEY_CONSOLIDATE_ALBUMS
-from dad_player.core.exceptions import VlcInitializationError
+from dad_player.constants import (
+    APP_NAME, APP_VERSION, CONFIG_KEY_CONSOLIDATE_ALBUMS, CONFIG_KEY_MUSIC_FOLDERS, CONFIG_KEY_WATCH_FOLDERS
+)
+from dad_player.core.exceptions import PlaylistError, VlcInitializationError
 from dad_player.core.library_manager import LibraryManager
+from dad_player.core.library_watcher import LibraryWatcher
 from dad_player.core.player_engine import PlayerEngine
 from dad_player.core.settings_manager import SettingsManager
 from dad_player.ui.screens.main_screen import MainScreen
@@ -32,6 +35,7 @@ class DadPlayerApp(MDApp):
         super().__init__(**kwargs)
         self.settings_manager = None
         self.library_manager = None
+        self.library_watcher = None
         self.playlist_manager = None
         self.player_engine = None
         self.screen_manager = None
@@ -55,6 +59,10 @@ class DadPlayerApp(MDApp):
             self.settings_manager.bind(on_setting_changed=self._on_setting_changed)
             self.playlist_manager = PlaylistManager()
             self.library_manager = LibraryManager(settings_manager=self.settings_manager)
+            self.library_manager.bind(on_tracks_moved=self._on_tracks_moved)
+            self.library_watcher = LibraryWatcher(self.library_manager, self.settings_manager)
+            if self.settings_manager.get_watch_folders():
+                self.library_watcher.start()
             self.player_engine = PlayerEngine(
                 settings_manager=self.settings_manager,
                 library_manager=self.library_manager,
@@ -103,6 +111,16 @@ class DadPlayerApp(MDApp):
                 log.info("Library refresh command sent successfully.")
             except Exception as e:
                 log.error(f"Failed to refresh library view after setting change: {e}", exc_info=True)
+        elif key in (CONFIG_KEY_MUSIC_FOLDERS, CONFIG_KEY_WATCH_FOLDERS):
+            self.library_watcher.stop()
+            if self.settings_manager.get_watch_folders():
+                self.library_watcher.start()
+
+    def _on_tracks_moved(self, library_manager_instance, moves):
+        try:
+            self.playlist_manager.rewrite_track_paths(moves)
+        except PlaylistError as e:
+            log.error(f"Failed to update playlists for moved tracks: {e}")
 
     def on_window_touch_down(self, window, touch):
         if self.floating_widget and not self.floating_widget.collide_point(*touch.pos):
@@ -129,7 +147,7 @@ class DadPlayerApp(MDApp):
         log.debug(f"Request to show details for: {track_path}")
         details_screen = self.screen_manager.get_screen('track_details_view')
         
-        track_data = self.library_manager.get_track_details_by_filepath(track_path)
+        track_data = self.library_manager.get_track_details_by_filepath(track_path, include_text=True)
         
         if track_data:
             details_screen.track_path = track_path
@@ -157,5 +175,7 @@ class DadPlayerApp(MDApp):
         log.info("Harmony Player is shutting down.")
         if self.player_engine:
             self.player_engine.shutdown()
+        if self.library_watcher:
+            self.library_watcher.stop()
         if self.library_manager:
             self.library_manager.close()
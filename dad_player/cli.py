@@ -0,0 +1,173 @@
+# dad_player/cli.py
+#
+# Headless library commands, run as `python main_dad_player.py <command>`.
+# They drive LibraryManager directly, without the UI or VLC, so a library
+# database can be built or refreshed on a server or from cron.
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+COMMANDS = ("scan", "rescan", "stats", "vacuum", "verify")
+
+log = logging.getLogger("dad_player")
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def _prepare_kivy():
+    # Kivy reads these when first imported: keep it from parsing our arguments and from logging.
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    os.environ.setdefault("KIVY_NO_FILELOG", "1")
+
+
+def _configure_logging(verbose):
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter("[%(levelname)-7s] %(message)s"))
+    log.handlers[:] = [handler]
+    log.setLevel(logging.DEBUG if verbose > 1 else logging.INFO if verbose else logging.WARNING)
+    log.propagate = False
+
+
+def _format_bytes(count):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if count < 1024 or unit == "GiB":
+            return f"{count:.1f} {unit}" if unit != "B" else f"{count} B"
+        count /= 1024
+
+
+def _format_duration(seconds):
+    hours, rest = divmod(int(seconds), 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def _open_library(args):
+    from dad_player.core.library_manager import LibraryManager
+    from dad_player.core.settings_manager import SettingsManager
+
+    if args.data_dir:
+        os.makedirs(args.data_dir, exist_ok=True)
+    settings = SettingsManager(data_dir=args.data_dir)
+    return settings, LibraryManager(settings, data_dir=args.data_dir)
+
+# =============================================================================
+# Commands
+# =============================================================================
+
+def _add_folders(settings, folders):
+    from dad_player.core.exceptions import FolderExistsError, InvalidFolderPathError
+
+    for folder in folders or ():
+        try:
+            settings.add_music_folder(os.path.abspath(folder))
+        except FolderExistsError:
+            pass
+        except InvalidFolderPathError as e:
+            raise SystemExit(f"error: {e}")
+
+
+def cmd_scan(args, settings, library):
+    from dad_player.core.scan_telemetry import format_telemetry_summary
+
+    _add_folders(settings, args.folder)
+    if not settings.get_music_folders():
+        print("No music folders configured; pass --folder PATH.", file=sys.stderr)
+        return 2
+
+    if args.progress:
+        library.bind(on_scan_progress=lambda instance, snapshot: print(snapshot['message'], file=sys.stderr))
+    started = time.perf_counter()
+    message = library.run_scan(full_rescan=args.command == "rescan", force_deep=args.deep or None, workers=args.workers)
+    elapsed = time.perf_counter() - started
+
+    stats = library.last_scan_stats
+    checked, scanned = stats.get('checked', 0), stats.get('bytes_scanned', 0)
+    print(message)
+    print(f"{checked} files checked in {elapsed:.2f} s: {checked / elapsed:.1f} files/s, "
+          f"{_format_bytes(scanned / elapsed)}/s scanned ({_format_bytes(scanned)} of files total)")
+    telemetry = library.last_scan_telemetry
+    if telemetry.get('files'):
+        print(format_telemetry_summary(telemetry, slowest=args.slowest))
+        if args.telemetry:
+            with open(args.telemetry, "w", encoding="utf-8") as f:
+                json.dump(telemetry, f, indent=2)
+            print(f"Telemetry report written to {args.telemetry}")
+    return 1 if message and message.startswith("Scan failed") else 0
+
+
+def cmd_stats(args, settings, library):
+    stats = library.get_library_stats()
+    print(f"Database:  {library.db_path} (schema v{stats['schema_version']}, {_format_bytes(stats['database_bytes'])})")
+    print(f"Folders:   {', '.join(settings.get_music_folders()) or '(none)'}")
+    print(f"Tracks:    {stats['tracks']} ({_format_duration(stats['total_duration'])}, {_format_bytes(stats['total_file_bytes'])}), "
+          f"{stats['tracks_with_text']} with lyrics or comments")
+    print(f"Albums:    {stats['albums']}")
+    print(f"Artists:   {stats['artists']}")
+    print(f"Art cache: {stats['art_files']} thumbnails, {_format_bytes(stats['art_bytes'])}")
+    return 0
+
+
+def cmd_vacuum(args, settings, library):
+    started = time.perf_counter()
+    result = library.vacuum()
+    if not result:
+        return 1
+    print(f"Database {_format_bytes(result['bytes_before'])} -> {_format_bytes(result['bytes_after'])}, "
+          f"{result['removed_art_files']} unused thumbnails removed, in {time.perf_counter() - started:.2f} s")
+    return 0
+
+
+def cmd_verify(args, settings, library):
+    started = time.perf_counter()
+    problems = library.verify(check_files=not args.skip_files)
+    messages = problems.pop('integrity_messages')
+    for name, count in problems.items():
+        print(f"{name.replace('_', ' '):22} {count}")
+    for message in messages[:20]:
+        print(f"  {message}")
+    print(f"Verified in {time.perf_counter() - started:.2f} s")
+    return 1 if any(problems.values()) else 0
+
+
+HANDLERS = {"scan": cmd_scan, "rescan": cmd_scan, "stats": cmd_stats, "vacuum": cmd_vacuum, "verify": cmd_verify}
+
+# =============================================================================
+# Entry Point
+# =============================================================================
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main_dad_player.py", description="Headless Harmony Player library tools.")
+    parser.add_argument("--data-dir", help="Library and settings directory (default: the app's user data dir).")
+    parser.add_argument("-v", "--verbose", action="count", default=0, help="Log progress (twice: debug).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("scan", "Index new and changed files."), ("rescan", "Clear the library and index everything.")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--folder", action="append", help="Add a music folder to the library first (repeatable).")
+        command.add_argument("--deep", action="store_true", help="Check every file, even in unchanged directories.")
+        command.add_argument("--workers", type=int, help="Scan worker count for this run (default: the scan_workers setting; 0 = one per CPU).")
+        command.add_argument("--progress", action="store_true", help="Print progress while scanning.")
+        command.add_argument("--slowest", type=int, default=5, help="Slowest files to list after the scan.")
+        command.add_argument("--telemetry", metavar="PATH", help="Write per-stage timings and the slowest files as JSON.")
+    commands.add_parser("stats", help="Show library size and counts.")
+    commands.add_parser("vacuum", help="Drop unused art and compact the database (run with the app closed).")
+    verify = commands.add_parser("verify", help="Check database integrity and references.")
+    verify.add_argument("--skip-files", action="store_true", help="Do not check that track files still exist.")
+    return parser
+
+
+def run_cli(argv):
+    """Runs one library command and returns the process exit code."""
+    _prepare_kivy()
+    args = build_parser().parse_args(argv)
+    _configure_logging(args.verbose)
+    settings, library = _open_library(args)
+    try:
+        return HANDLERS[args.command](args, settings, library)
+    finally:
+        library.close()
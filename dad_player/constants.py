@@ -41,6 +41,10 @@ CONFIG_KEY_REPEAT = "repeat_mode"
 CONFIG_KEY_LAST_VOLUME = "last_volume"
 CONFIG_KEY_REPLAYGAIN = "replaygain"
 CONFIG_KEY_CONSOLIDATE_ALBUMS = "consolidate_albums"
+CONFIG_KEY_SCAN_WORKERS = "scan_workers" # 0 = one per CPU core
+CONFIG_KEY_SCAN_USE_PROCESSES = "scan_use_processes"
+CONFIG_KEY_SCAN_DEEP_CHECK = "scan_deep_check" # Check every file even in unchanged directories
+CONFIG_KEY_WATCH_FOLDERS = "watch_folders"
 
 # =============================================================================
 # Playback Modes
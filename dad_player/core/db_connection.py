@@ -0,0 +1,82 @@
+# dad_player/core/db_connection.py
+
+import logging
+import sqlite3
+import threading
+
+log = logging.getLogger(__name__)
+
+DB_BUSY_TIMEOUT_SECONDS = 10
+# Applied to every connection. WAL lets readers run alongside the scan writer;
+# with WAL, synchronous=NORMAL only risks the last commits on power loss, never corruption.
+DB_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",       # 16 MiB page cache per connection
+    "PRAGMA mmap_size = 134217728",     # 128 MiB memory-mapped reads
+)
+
+
+class ConnectionManager:
+    """
+    Hands out one persistent SQLite connection per thread.
+
+    The database is switched to WAL journaling once, so any number of reader
+    threads can query while a single writer commits. Writers still serialize
+    among themselves (LibraryManager holds its `_db_lock` for writes); readers
+    never need a Python-level lock.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._enable_wal()
+
+    def _enable_wal(self):
+        conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT_SECONDS)
+        try:
+            mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+            if mode.lower() != 'wal':
+                log.warning(f"SQLite refused WAL journaling (mode is '{mode}'); readers may block during scans.")
+        finally:
+            conn.close()
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.generation != self._generation:
+            # Each connection is only used by its own thread; the flag just lets close_all() close it.
+            conn = sqlite3.connect(self.db_path, timeout=DB_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            for pragma in DB_CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            self._local.generation = self._generation
+            with self._lock:
+                self._connections.add(conn)
+        return conn
+
+    def release(self):
+        """Closes this thread's connection; call it before a worker thread exits."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.discard(conn)
+        conn.close()
+
+    def close_all(self):
+        """Closes every thread's connection, e.g. when the app shuts down."""
+        with self._lock:
+            # Threads that come back later notice the new generation and reconnect.
+            self._generation += 1
+            connections, self._connections = self._connections, set()
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                log.warning(f"Failed to close a database connection: {e}")
@@ -0,0 +1,262 @@
+# dad_player/core/db_migrations.py
+
+import logging
+import sqlite3
+
+from dad_player.constants import DB_ALBUMS_TABLE, DB_ARTISTS_TABLE, DB_TRACKS_TABLE
+
+log = logging.getLogger(__name__)
+
+# =============================================================================
+# Migrations
+# =============================================================================
+#
+# The schema version lives in SQLite's `PRAGMA user_version` (0 for a new file
+# and for databases created before migrations existed). Each migration runs in
+# its own transaction together with the version bump, so a crash leaves the
+# database at the previous version and the step is simply retried next start.
+# Never edit a released migration; append a new one instead.
+
+def _column_names(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _add_missing_columns(conn, table, columns):
+    existing = _column_names(conn, table)
+    for col, col_type in columns.items():
+        if col not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
+
+
+def _migrate_base_tables(conn):
+    """Library tables. Databases from before versioning get their missing columns added."""
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {DB_ARTISTS_TABLE} (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL COLLATE NOCASE)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {DB_ALBUMS_TABLE} (id INTEGER PRIMARY KEY, name TEXT NOT NULL COLLATE NOCASE, artist_id INTEGER, art_filename TEXT, art_hash TEXT, year INTEGER, UNIQUE(name, artist_id), FOREIGN KEY (artist_id) REFERENCES {DB_ARTISTS_TABLE}(id) ON DELETE CASCADE)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {DB_TRACKS_TABLE} (id INTEGER PRIMARY KEY, filepath TEXT UNIQUE NOT NULL, filehash TEXT, title TEXT COLLATE NOCASE, album_id INTEGER, artist_id INTEGER, track_number INTEGER, disc_number INTEGER, duration REAL, genre TEXT COLLATE NOCASE, year INTEGER, last_modified REAL, composer TEXT COLLATE NOCASE, bpm REAL, comment TEXT, bitrate INTEGER, samplerate INTEGER, lyrics TEXT, publisher TEXT COLLATE NOCASE, copyright TEXT COLLATE NOCASE, file_size INTEGER, mtime_ns INTEGER, inode INTEGER, FOREIGN KEY (album_id) REFERENCES {DB_ALBUMS_TABLE}(id) ON DELETE SET NULL, FOREIGN KEY (artist_id) REFERENCES {DB_ARTISTS_TABLE}(id) ON DELETE SET NULL)")
+    _add_missing_columns(conn, DB_TRACKS_TABLE, {
+        'composer': 'TEXT COLLATE NOCASE',
+        'bpm': 'REAL',
+        'comment': 'TEXT',
+        'bitrate': 'INTEGER',
+        'samplerate': 'INTEGER',
+        'lyrics': 'TEXT',
+        'publisher': 'TEXT COLLATE NOCASE',
+        'copyright': 'TEXT COLLATE NOCASE',
+        'file_size': 'INTEGER',
+        'mtime_ns': 'INTEGER',
+        'inode': 'INTEGER',
+    })
+    _add_missing_columns(conn, DB_ALBUMS_TABLE, {'art_hash': 'TEXT'})
+
+
+def _migrate_scan_tables(conn):
+    """Bookkeeping for resumable scans and for skipping unchanged directories."""
+    conn.execute("CREATE TABLE IF NOT EXISTS scan_state (key TEXT PRIMARY KEY, value TEXT)")
+    conn.execute("CREATE TABLE IF NOT EXISTS scan_checkpoint (path TEXT PRIMARY KEY, is_folder INTEGER NOT NULL DEFAULT 0)")
+    conn.execute("CREATE TABLE IF NOT EXISTS scan_directories (path TEXT PRIMARY KEY, mtime_ns INTEGER NOT NULL, names_digest TEXT NOT NULL, checked_at_ns INTEGER NOT NULL)")
+
+
+def _migrate_foreign_key_indexes(conn):
+    """
+    Indexes for the album/artist joins and the orphan cleanup. Album track
+    lists come out of idx_tracks_album in disc/track order and an artist's
+    albums out of idx_albums_artist in name order. Album names are covered by
+    the UNIQUE(name, artist_id) index.
+    """
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tracks_album ON {DB_TRACKS_TABLE} (album_id, disc_number, track_number)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_tracks_artist ON {DB_TRACKS_TABLE} (artist_id)")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_albums_artist ON {DB_ALBUMS_TABLE} (artist_id, name)")
+
+
+def _migrate_track_text(conn):
+    """
+    Moves lyrics and comments out of `tracks` into `track_text`, so reading a
+    track row no longer pulls its lyrics along. Rows are only created for
+    tracks that have either text, and the trigger removes them with the track.
+    """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS track_text (track_id INTEGER PRIMARY KEY REFERENCES {DB_TRACKS_TABLE}(id) ON DELETE CASCADE, lyrics TEXT, comment TEXT)")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS track_text_cleanup AFTER DELETE ON {DB_TRACKS_TABLE}
+        BEGIN DELETE FROM track_text WHERE track_id = old.id; END
+    """)
+    columns = _column_names(conn, DB_TRACKS_TABLE)
+    if not {'lyrics', 'comment'} <= columns:
+        return
+    conn.execute(f"""
+        INSERT OR REPLACE INTO track_text (track_id, lyrics, comment)
+        SELECT id, lyrics, comment FROM {DB_TRACKS_TABLE} WHERE lyrics IS NOT NULL OR comment IS NOT NULL
+    """)
+    try:
+        conn.execute(f"ALTER TABLE {DB_TRACKS_TABLE} DROP COLUMN lyrics")
+        conn.execute(f"ALTER TABLE {DB_TRACKS_TABLE} DROP COLUMN comment")
+    except sqlite3.OperationalError:
+        # DROP COLUMN needs SQLite 3.35; older versions keep the columns, emptied.
+        conn.execute(f"UPDATE {DB_TRACKS_TABLE} SET lyrics = NULL, comment = NULL WHERE lyrics IS NOT NULL OR comment IS NOT NULL")
+
+
+def _migrate_search_index(conn):
+    """
+    FTS5 index for search_tracks(), one row per track with rowid = tracks.id.
+    The scan writer fills it; the trigger removes rows with their track.
+    SQLite builds without FTS5 skip it and search falls back to LIKE.
+    """
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS track_search USING fts5(
+                title, artist, album, album_artist, genre, composer,
+                tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        log.warning(f"Full-text search is unavailable in this SQLite build ({e}); search will use LIKE.")
+        return
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS track_search_cleanup AFTER DELETE ON {DB_TRACKS_TABLE}
+        BEGIN DELETE FROM track_search WHERE rowid = old.id; END
+    """)
+    conn.execute("DELETE FROM track_search")
+    conn.execute(f"""
+        INSERT INTO track_search (rowid, title, artist, album, album_artist, genre, composer)
+        SELECT t.id, t.title, ar.name, al.name, aa.name, t.genre, t.composer
+        FROM {DB_TRACKS_TABLE} t
+        LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+        LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+        LEFT JOIN {DB_ARTISTS_TABLE} aa ON al.artist_id = aa.id
+    """)
+
+
+def _migrate_listing_sort_keys(conn):
+    """
+    Copies of the artist and album names on each track, so the All Songs
+    listing (artist, album, disc, track) can be read in order from a single
+    index and paged by keyset instead of sorting the joined library. The scan
+    writer keeps them in step with artist_id and album_id.
+    """
+    _add_missing_columns(conn, DB_TRACKS_TABLE, {
+        'artist_sort': "TEXT NOT NULL DEFAULT '' COLLATE NOCASE",
+        'album_sort': "TEXT NOT NULL DEFAULT '' COLLATE NOCASE",
+    })
+    conn.execute(f"""
+        UPDATE {DB_TRACKS_TABLE} SET
+            artist_sort = IFNULL((SELECT name FROM {DB_ARTISTS_TABLE} WHERE id = {DB_TRACKS_TABLE}.artist_id), ''),
+            album_sort = IFNULL((SELECT name FROM {DB_ALBUMS_TABLE} WHERE id = {DB_TRACKS_TABLE}.album_id), '')
+    """)
+    # Missing disc and track numbers sort first; the expressions must match get_tracks_page's.
+    conn.execute(f"""
+        CREATE INDEX IF NOT EXISTS idx_tracks_listing ON {DB_TRACKS_TABLE}
+        (artist_sort, album_sort, IFNULL(disc_number, 0), IFNULL(track_number, 0), id)
+    """)
+
+
+def _album_group_refresh(name):
+    """SQL recomputing the album_groups row for the album name `name` (an expression such as NEW.name)."""
+    return f"""
+        DELETE FROM album_groups WHERE name = {name};
+        INSERT INTO album_groups (name, album_id, year, art_filename, artist_name)
+        SELECT
+            MIN(al.name), MIN(al.id), MAX(al.year),
+            (SELECT art_filename FROM {DB_ALBUMS_TABLE} WHERE name = {name} AND art_filename IS NOT NULL LIMIT 1),
+            CASE WHEN COUNT(DISTINCT al.artist_id) > 1 THEN 'Various Artists' ELSE MAX(ar.name) END
+        FROM {DB_ALBUMS_TABLE} al
+        LEFT JOIN {DB_ARTISTS_TABLE} ar ON al.artist_id = ar.id
+        WHERE al.name = {name}
+        GROUP BY al.name;
+    """
+
+
+def _migrate_album_groups(conn):
+    """
+    The consolidated album grid (albums merged by name across artists), kept
+    as a table instead of grouping every album on each visit. Triggers on the
+    albums table recompute only the names an insert, update or delete touches,
+    so scans, tag edits, art changes and orphan cleanup all keep it current.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS album_groups (
+            name TEXT PRIMARY KEY COLLATE NOCASE,
+            album_id INTEGER NOT NULL,
+            year INTEGER,
+            art_filename TEXT,
+            artist_name TEXT
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS album_groups_insert AFTER INSERT ON {DB_ALBUMS_TABLE}
+        BEGIN {_album_group_refresh('NEW.name')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS album_groups_update AFTER UPDATE OF name, artist_id, year, art_filename ON {DB_ALBUMS_TABLE}
+        BEGIN {_album_group_refresh('OLD.name')} {_album_group_refresh('NEW.name')} END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS album_groups_delete AFTER DELETE ON {DB_ALBUMS_TABLE}
+        BEGIN {_album_group_refresh('OLD.name')} END
+    """)
+    conn.execute("DELETE FROM album_groups")
+    conn.execute(f"""
+        INSERT INTO album_groups (name, album_id, year, art_filename, artist_name)
+        SELECT
+            MIN(al.name), MIN(al.id), MAX(al.year),
+            (SELECT art_filename FROM {DB_ALBUMS_TABLE} WHERE name = al.name AND art_filename IS NOT NULL LIMIT 1),
+            CASE WHEN COUNT(DISTINCT al.artist_id) > 1 THEN 'Various Artists' ELSE MAX(ar.name) END
+        FROM {DB_ALBUMS_TABLE} al
+        LEFT JOIN {DB_ARTISTS_TABLE} ar ON al.artist_id = ar.id
+        GROUP BY al.name COLLATE NOCASE
+    """)
+
+
+# (version, description, function) in order; the last version is the current schema.
+MIGRATIONS = (
+    (1, "library tables", _migrate_base_tables),
+    (2, "scan bookkeeping tables", _migrate_scan_tables),
+    (3, "foreign key indexes", _migrate_foreign_key_indexes),
+    (4, "lyrics and comments in track_text", _migrate_track_text),
+    (5, "full-text search index", _migrate_search_index),
+    (6, "track listing sort keys", _migrate_listing_sort_keys),
+    (7, "consolidated album groups", _migrate_album_groups),
+)
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# =============================================================================
+# Runner
+# =============================================================================
+
+def get_schema_version(conn) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def has_table(conn, name) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def migrate(conn) -> int:
+    """
+    Brings the database up to SCHEMA_VERSION and returns the version it ends at.
+    The caller must be the only writer. A database written by a newer release
+    is left untouched.
+    """
+    version = get_schema_version(conn)
+    if version > SCHEMA_VERSION:
+        log.warning(f"Database schema version {version} is newer than this release supports ({SCHEMA_VERSION}); not migrating.")
+        return version
+
+    start_version = version
+    for target, description, apply in MIGRATIONS:
+        if target <= version:
+            continue
+        log.info(f"Migrating database schema to version {target}: {description}.")
+        # Explicit BEGIN: the sqlite3 module does not open transactions for DDL on its own.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        version = target
+    if version != start_version:
+        # Refreshes planner statistics for any new indexes.
+        conn.execute("PRAGMA optimize")
+    return version
@@ -0,0 +1,158 @@
+# dad_player/core/fuzzy_index.py
+
+import logging
+import re
+import threading
+import unicodedata
+from array import array
+from collections import Counter
+from difflib import SequenceMatcher
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:
+    fuzz = None
+
+log = logging.getLogger(__name__)
+
+# Entries handed to the scorer per query, chosen by shared trigrams.
+FUZZY_CANDIDATES = 300
+# Trigrams in more entries than this say little about a match and are skipped when counting.
+FUZZY_MAX_POSTINGS = 5000
+# Minimum score (0-100) for an entry to count as a match.
+FUZZY_SCORE_CUTOFF = 70
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize_text(text: str) -> str:
+    """Lower case, accents removed, punctuation collapsed to single spaces."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(" ", stripped).strip()
+
+
+def trigrams(normalized: str) -> set:
+    """Trigrams of each word, padded so short words and word starts still count."""
+    grams = set()
+    for word in normalized.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _score(query, text):
+    if fuzz is not None:
+        return fuzz.WRatio(query, text)
+    return SequenceMatcher(None, query, text).ratio() * 100
+
+
+class FuzzyIndex:
+    """
+    In-memory trigram index over library names for typo-tolerant search.
+
+    `loader()` returns (kind, ref_id, text) rows, e.g. ('artist', 12, 'Beyoncé').
+    A query only scores the FUZZY_CANDIDATES entries sharing the most trigrams
+    with it, so a keystroke costs a few posting-list merges instead of a pass
+    over every title. Scores come from RapidFuzz when it is installed and from
+    difflib otherwise.
+
+    The index is built by `warm()` on a background thread, and rebuilt the
+    same way when a search finds it stale after `invalidate()`; searches keep
+    using the previous index meanwhile, and find nothing before the first
+    build. `build()` does the same work on the calling thread. `release`, if
+    given, is called on the background thread before it exits, e.g. to close
+    its database connection.
+    """
+
+    def __init__(self, loader, release=None):
+        self._loader = loader
+        self._release = release
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+        self._warming = False
+        self._stale = True
+        # (entries, postings), replaced as a whole so a search never mixes two builds.
+        self._index = ([], {})
+
+    def invalidate(self):
+        self._stale = True
+
+    def warm(self):
+        """Rebuilds a stale index on a background thread; does nothing while one is already running."""
+        with self._warm_lock:
+            if not self._stale or self._warming:
+                return
+            self._warming = True
+        threading.Thread(target=self._warm, name="fuzzy-index", daemon=True).start()
+
+    def _warm(self):
+        try:
+            while True:
+                built = self.build()
+                with self._warm_lock:
+                    # A change that arrived during the build needs another pass.
+                    if not (built and self._stale):
+                        self._warming = False
+                        return
+        finally:
+            if self._release is not None:
+                self._release()
+
+    def build(self) -> bool:
+        """Builds the index on the calling thread if it is stale. Returns False if the build failed."""
+        with self._lock:
+            if not self._stale:
+                return True
+            # Cleared first: a change arriving during the build marks it stale again.
+            self._stale = False
+            try:
+                self._build()
+            except Exception:
+                self._stale = True
+                log.exception("Failed to build the fuzzy search index.")
+                return False
+        return True
+
+    def _build(self):
+        entries, postings = [], {}
+        for kind, ref_id, text in self._loader():
+            normalized = normalize_text(text or "")
+            if not normalized:
+                continue
+            index = len(entries)
+            entries.append((kind, ref_id, normalized))
+            for gram in trigrams(normalized):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(index)
+        self._index = (entries, postings)
+        log.info(f"Built fuzzy search index: {len(entries)} names, {len(postings)} trigrams.")
+
+    def search(self, query, limit=50, score_cutoff=FUZZY_SCORE_CUTOFF):
+        """Returns up to `limit` (kind, ref_id, score) matches, best first."""
+        normalized = normalize_text(query)
+        grams = trigrams(normalized)
+        if not grams:
+            return []
+        if self._stale:
+            self.warm()
+        entries, postings = self._index
+
+        lists = sorted((postings[g] for g in grams if g in postings), key=len)
+        if not lists:
+            return []
+        selective = [p for p in lists if len(p) <= FUZZY_MAX_POSTINGS] or lists[:1]
+        shared = Counter()
+        for posting in selective:
+            shared.update(posting)
+
+        scored = []
+        for index, _ in shared.most_common(FUZZY_CANDIDATES):
+            kind, ref_id, text = entries[index]
+            score = _score(normalized, text)
+            if score >= score_cutoff:
+                scored.append((score, kind, ref_id))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(kind, ref_id, score) for score, kind, ref_id in scored[:limit]]
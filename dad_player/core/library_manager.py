@@ -1,9 +1,14 @@
 # dad_player/core/library_manager.py
 
+import json
 import logging
 import os
+import queue
+import re
 import sqlite3
 import threading
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 import mutagen
 from mutagen.id3 import APIC, ID3, PictureType
@@ -11,385 +16,828 @@ from mutagen.flac import Picture as FLACPicture
 from kivy.clock import Clock
 from kivy.event import EventDispatcher
 from kivy.properties import BooleanProperty, NumericProperty, StringProperty
-import io
-
-try:
-    from PIL import Image as PILImage
-except ImportError:
-    PILImage = None
 
 from dad_player.constants import (
-    ALBUM_ART_THUMBNAIL_SIZE, ART_THUMBNAIL_DIR, DATABASE_NAME,
-    DB_ALBUMS_TABLE, DB_ARTISTS_TABLE, DB_TRACKS_TABLE,
-    SUPPORTED_AUDIO_EXTENSIONS
-)
-from dad_player.utils.file_utils import (
-    get_user_data_dir_for_app, generate_file_hash, sanitize_filename_for_cache
+    ART_THUMBNAIL_DIR, DATABASE_NAME,
+    DB_ALBUMS_TABLE, DB_ARTISTS_TABLE, DB_TRACKS_TABLE
 )
+from dad_player.utils.file_utils import get_user_data_dir_for_app, iter_audio_files
+from dad_player.core.db_connection import ConnectionManager
+from dad_player.core.db_migrations import get_schema_version, has_table, migrate
 from dad_player.core.exceptions import MetadataUpdateError
+from dad_player.core.fuzzy_index import FuzzyIndex
+from dad_player.core.move_detection import MoveIndex
+from dad_player.core.scan_id_cache import ScanIdCache
+from dad_player.core.scan_progress import ScanProgressReporter
+from dad_player.core.scan_stats import ScanStats
+from dad_player.core.scan_telemetry import ScanTelemetry, format_telemetry_summary
+from dad_player.core.track_cache import TrackCache
+from dad_player.core.track_metadata import extract_track_record, get_embedded_art_data, save_album_art_thumbnail
 
 
 log = logging.getLogger(__name__)
 
+# Jobs allowed in the worker pool per worker before the scan walk blocks.
+SCAN_JOBS_PER_WORKER = 4
+# A scan transaction is committed after this many files or seconds, whichever comes first.
+SCAN_BATCH_SIZE = 500
+SCAN_BATCH_SECONDS = 2.0
+# How long closing the library waits for a stopped scan to write its checkpoint.
+SCAN_STOP_TIMEOUT_SECONDS = 10
+
+# Columns for the track queries; lyrics and comment live in track_text and are read on demand.
+TRACK_SUMMARY_COLUMNS = (
+    "t.id, t.filepath, t.title, t.duration, t.track_number, t.disc_number, t.album_id, "
+    "al.name as album, ar.name as artist, aa.name as album_artist, al.art_filename"
+)
+# Keys of a summary, taken from a (cached) detail row; art_filename is resolved to art_path.
+TRACK_SUMMARY_KEYS = (
+    'id', 'filepath', 'title', 'duration', 'track_number', 'disc_number', 'album_id',
+    'album', 'artist', 'album_artist', 'art_path'
+)
+TRACK_DETAIL_COLUMNS = (
+    TRACK_SUMMARY_COLUMNS + ", t.filehash, t.artist_id, t.genre, t.year, t.last_modified, t.composer, "
+    "t.bpm, t.bitrate, t.samplerate, t.publisher, t.copyright, t.file_size, t.mtime_ns, t.inode"
+)
+
+# bm25 weights of the track_search columns: title, artist, album, album artist, genre, composer.
+SEARCH_COLUMN_WEIGHTS = "10.0, 5.0, 4.0, 3.0, 1.0, 1.0"
+# Ranked search results returned per query; a search box never needs the whole library.
+SEARCH_RESULTS_LIMIT = 1000
+# Keys per IN (...) query in the batch lookups; below SQLite's older 999-variable limit.
+BATCH_LOOKUP_CHUNK = 500
+# Rows per get_tracks_page() call.
+TRACK_PAGE_SIZE = 200
+# Whole-library listing order; served by idx_tracks_listing, whose expressions it must match.
+TRACK_LISTING_ORDER = "t.artist_sort, t.album_sort, IFNULL(t.disc_number, 0), IFNULL(t.track_number, 0), t.id"
+# Name matches (titles, albums, artists) a fuzzy search expands into tracks, and the tracks returned.
+FUZZY_MATCH_LIMIT = 50
+FUZZY_RESULTS_LIMIT = 200
+
 # =============================================================================
 # Helper Functions
 # =============================================================================
 
-def _get_tag_values(meta, key_list):
-    if not meta:
-        return []
-    values = []
-    for key in key_list:
-        try:
-            raw_val = meta.get(key)
-            if not raw_val:
-                continue
-            potential_values = raw_val if isinstance(raw_val, list) else [raw_val]
-            for item in potential_values:
-                if hasattr(item, 'text') and item.text:
-                    text_val = item.text if isinstance(item.text, list) else [item.text]
-                    values.extend(str(t) for t in text_val)
-                elif not hasattr(item, 'text'):
-                    values.append(str(item))
-        except (KeyError, ValueError):
-            continue
-    return values
-
-def _safe_convert(value, target_type, split_char=None):
-    if not value:
-        return None
-    try:
-        s_val = str(value)
-        if split_char:
-            s_val = s_val.split(split_char)[0]
-        return target_type(s_val)
-    except (ValueError, IndexError):
-        return None
+_SEARCH_WORD_RE = re.compile(r"\w+")
+
+def _fts_match_expression(query):
+    """
+    Turns free text into an FTS5 query in which every word must match as a
+    prefix, e.g. 'beat abb' -> '"beat"* "abb"*'. Quoting keeps FTS5 operators
+    and punctuation in user input from being parsed. Returns None when the
+    query has no words.
+    """
+    words = _SEARCH_WORD_RE.findall(query)
+    return " ".join(f'"{word}"*' for word in words) if words else None
+
+def _stat_tuple(st):
+    return (st.st_size, st.st_mtime_ns, st.st_ino, st.st_mtime)
+
+def _stat_record_matches(row, st):
+    """True when a stored (size, mtime_ns, inode) record still describes the file."""
+    if not row or row['file_size'] is None or row['mtime_ns'] is None:
+        return False
+    if row['file_size'] != st.st_size or row['mtime_ns'] != st.st_mtime_ns:
+        return False
+    # Some platforms report an inode of 0; only compare when both sides know it.
+    if row['inode'] and st.st_ino and row['inode'] != st.st_ino:
+        return False
+    return True
 
 # =============================================================================
 # LibraryManager Class
 # =============================================================================
 
 class LibraryManager(EventDispatcher):
-    __events__ = ('on_scan_progress', 'on_scan_finished')
+    __events__ = ('on_scan_progress', 'on_scan_finished', 'on_library_changed', 'on_tracks_moved')
 
     is_scanning = BooleanProperty(False)
     scan_progress_message = StringProperty("")
     progress_value = NumericProperty(0.0)
 
-    def __init__(self, settings_manager, **kwargs):
+    def __init__(self, settings_manager, data_dir=None, **kwargs):
         super().__init__(**kwargs)
         self.settings_manager = settings_manager
-        user_data_dir = Path(get_user_data_dir_for_app())
+        user_data_dir = Path(data_dir or get_user_data_dir_for_app())
         self.db_path = user_data_dir / DATABASE_NAME
         self.art_cache_dir = user_data_dir / "cache" / ART_THUMBNAIL_DIR
         self.art_cache_dir.mkdir(parents=True, exist_ok=True)
         self._db_lock = threading.Lock()
+        self._db = ConnectionManager(self.db_path)
+        self._search_index = False
+        self._fuzzy_index = FuzzyIndex(self._load_fuzzy_entries, release=self._db.release)
+        self._art_paths = {}
+        self._track_cache = TrackCache()
         self._initialize_db()
         self._scan_thread = None
+        self._cancel_event = threading.Event()
+        self.last_scan_stats = {}
+        self.last_scan_telemetry = {}
+        self.last_scan_message = ""
         log.info(f"LibraryManager initialized. Database at: {self.db_path}")
 
     def _get_db_connection(self):
+        """
+        Returns the calling thread's persistent connection. Reads use it without
+        the lock (WAL keeps them off the writer's path); writes hold `_db_lock`.
+        """
         try:
-            conn = sqlite3.connect(self.db_path, timeout=10)
-            conn.row_factory = sqlite3.Row
-            return conn
+            return self._db.connection()
         except sqlite3.Error as e:
             log.error(f"Database connection error: {e}")
             return None
 
+    def release_thread_connection(self):
+        """Closes the calling thread's database connection; call it before a thread that used the library exits."""
+        self._db.release()
+
     def _initialize_db(self):
         log.info(f"Initializing database at {self.db_path}...")
         with self._db_lock:
             conn = self._get_db_connection()
             if not conn: return
             try:
-                with conn:
-                    cursor = conn.cursor()
-                    cursor.execute(f"CREATE TABLE IF NOT EXISTS {DB_ARTISTS_TABLE} (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL COLLATE NOCASE)")
-                    cursor.execute(f"CREATE TABLE IF NOT EXISTS {DB_ALBUMS_TABLE} (id INTEGER PRIMARY KEY, name TEXT NOT NULL COLLATE NOCASE, artist_id INTEGER, art_filename TEXT, year INTEGER, UNIQUE(name, artist_id), FOREIGN KEY (artist_id) REFERENCES {DB_ARTISTS_TABLE}(id) ON DELETE CASCADE)")
-                    cursor.execute(f"CREATE TABLE IF NOT EXISTS {DB_TRACKS_TABLE} (id INTEGER PRIMARY KEY, filepath TEXT UNIQUE NOT NULL, filehash TEXT, title TEXT COLLATE NOCASE, album_id INTEGER, artist_id INTEGER, track_number INTEGER, disc_number INTEGER, duration REAL, genre TEXT COLLATE NOCASE, year INTEGER, last_modified REAL, composer TEXT COLLATE NOCASE, bpm REAL, comment TEXT, bitrate INTEGER, samplerate INTEGER, lyrics TEXT, publisher TEXT COLLATE NOCASE, copyright TEXT COLLATE NOCASE, FOREIGN KEY (album_id) REFERENCES {DB_ALBUMS_TABLE}(id) ON DELETE SET NULL, FOREIGN KEY (artist_id) REFERENCES {DB_ARTISTS_TABLE}(id) ON DELETE SET NULL)")
-                    cursor.execute(f"PRAGMA table_info({DB_TRACKS_TABLE})")
-                    existing_columns = {row['name'] for row in cursor.fetchall()}
-                    
-                    new_columns = {
-                        'composer': 'TEXT COLLATE NOCASE',
-                        'bpm': 'REAL',
-                        'comment': 'TEXT',
-                        'bitrate': 'INTEGER',
-                        'samplerate': 'INTEGER',
-                        'lyrics': 'TEXT',
-                        'publisher': 'TEXT COLLATE NOCASE',
-                        'copyright': 'TEXT COLLATE NOCASE'
-                    }
-                    
-                    for col, col_type in new_columns.items():
-                        if col not in existing_columns:
-                            cursor.execute(f"ALTER TABLE {DB_TRACKS_TABLE} ADD COLUMN {col} {col_type}")
-                    
-                    log.info("Database tables created/verified and migrated.")
+                version = migrate(conn)
+                self._search_index = has_table(conn, 'track_search')
+                log.info(f"Database schema is at version {version}.")
             except sqlite3.Error as e:
                 log.error(f"Database initialization failed: {e}")
 
-    def start_scan_music_library(self, full_rescan=False):
+    def start_scan_music_library(self, full_rescan=False, force_deep=None, folders=None, workers=None):
+        """
+        Starts a scan on a background thread. If a previous scan was stopped or
+        crashed part-way, it is resumed from its checkpoint instead.
+
+        Files in directories whose entries are unchanged since the last scan are
+        skipped. `force_deep` (default: the scan_deep_check setting) checks every
+        file anyway, which catches tags edited in place with the watcher off.
+        `folders` limits an incremental scan to some of the music folders, and
+        `workers` overrides the scan_workers setting for this scan only.
+        """
         if self.is_scanning:
             log.warning("Scan already in progress. Ignoring request.")
             return
         self.is_scanning = True
-        self._scan_thread = threading.Thread(target=self._scan_music_library, args=(full_rescan,))
+        self._cancel_event.clear()
+        if force_deep is None:
+            force_deep = self.settings_manager.get_scan_deep_check()
+        self._scan_thread = threading.Thread(target=self._scan_music_library, args=(full_rescan, force_deep, folders, workers))
         self._scan_thread.daemon = True
         self._scan_thread.start()
 
-    def _scan_music_library(self, full_rescan):
+    def _scan_music_library(self, full_rescan, force_deep=False, only_folders=None, workers=None):
         try:
             log.info("Starting library scan...")
             folders = self.settings_manager.get_music_folders()
+            if only_folders is not None:
+                folders = [folder for folder in folders if folder in only_folders]
             log.info(f"Folders to scan: {folders}")
 
             if not folders:
                 log.warning("No music folders are configured. Scan will not proceed.")
-                Clock.schedule_once(lambda dt: self.dispatch('on_scan_finished', "No music folders configured."))
+                self._finish_scan("No music folders configured.")
                 return
 
-            if full_rescan:
-                log.info("Performing full rescan, clearing all entries first.")
-                self._clear_database()
+            checkpoint = self._load_scan_checkpoint()
+            if checkpoint and (checkpoint['full_rescan'] or not full_rescan):
+                # A resumed full rescan must not clear the tracks it already stored.
+                full_rescan = checkpoint['full_rescan']
+                completed_folders, done_paths = checkpoint['completed_folders'], checkpoint['done_paths']
+                log.info(f"Resuming interrupted scan: {len(completed_folders)} folder(s) and "
+                         f"{len(done_paths)} file(s) already processed.")
+            else:
+                if full_rescan:
+                    log.info("Performing full rescan, clearing all entries first.")
+                    self._clear_database()
+                completed_folders, done_paths = set(), set()
+                self._begin_scan_checkpoint(folders, full_rescan)
+
+            stats = ScanStats(telemetry=ScanTelemetry())
+            progress = ScanProgressReporter(stats, self._dispatch_scan_progress)
+            known_files = self._load_stat_index()
+            known_dirs, visited_dirs = self._load_directory_index(), {}
+            move_index = MoveIndex(known_files)
+            walked_folders, seen_paths, unchanged_dirs = [], set(), set()
+
+            def skip_unchanged_dir(path, audio_file_count):
+                unchanged_dirs.add(path)
+                stats.increment('checked', audio_file_count)
+                stats.increment('dir_skipped', audio_file_count)
+
+            workers = self._get_scan_worker_count(workers)
+            results = queue.Queue()
+            in_flight = threading.BoundedSemaphore(workers * SCAN_JOBS_PER_WORKER)
+            writer = threading.Thread(target=self._run_scan_writer, args=(results, stats, in_flight, progress), daemon=True)
+            writer.start()
+
+            discovered = 0
+            log.info(f"Walking music folders with {workers} worker(s) processing files...")
+            try:
+                with self._create_scan_pool(workers) as pool:
+                    for folder in folders:
+                        if folder in completed_folders:
+                            log.info(f"Skipping folder completed before the scan was interrupted: {folder}")
+                            continue
+                        walked_folders.append(folder)
+                        for entry in iter_audio_files([folder], known_dirs, visited_dirs, skip_unchanged_dir, force_deep):
+                            if self._cancel_event.is_set():
+                                break
+                            discovered += 1
+                            seen_paths.add(entry.path)
+                            if entry.path in done_paths:
+                                stats.increment('checked')
+                                stats.increment('checkpoint_skipped')
+                            else:
+                                self._submit_scan_job(pool, entry, known_files, move_index, stats, results, in_flight)
+                            progress.notify()
+                        if self._cancel_event.is_set():
+                            pool.shutdown(wait=True, cancel_futures=True)
+                            break
+                        results.put(('folder', folder))
+                    progress.finish_walk()
+            finally:
+                results.put(None)
+                writer.join()
+            self.last_scan_stats = stats.snapshot()
+            self.last_scan_telemetry = stats.telemetry.report()
+            if self.last_scan_telemetry['files']:
+                log.info(format_telemetry_summary(self.last_scan_telemetry))
+
+            if self._cancel_event.is_set():
+                log.info(f"Scan stopped; checkpoint kept for resuming. Stats so far: {stats.summary()}")
+                self._finish_scan("Scan paused. It will resume where it stopped next time.")
+                return
 
-            all_files = [p for f in folders if os.path.isdir(f) for p in Path(f).rglob('*') if p.is_file()]
-            total_files = len(all_files)
-            log.info(f"Found {total_files} total files to check.")
+            log.info(f"Walk finished: {discovered} audio files to check, {stats.snapshot()['dir_skipped']} in unchanged directories.")
+            removed = self._delete_vanished_tracks(known_files, walked_folders, seen_paths, unchanged_dirs, stats.moves)
+            self._store_directory_index(visited_dirs, stats.failed_paths, None if only_folders is None else walked_folders)
+            self._clear_scan_checkpoint()
+            self._dispatch_tracks_moved(stats.moves)
 
-            if total_files == 0:
-                Clock.schedule_once(lambda dt: self.dispatch('on_scan_finished', "No files found in configured folders."))
+            if stats.snapshot()['checked'] == 0:
+                if removed:
+                    self._clean_orphans()
+                self._finish_scan("No audio files found in configured folders.")
                 return
 
-            processed = 0
-            log.info("Starting to process files...")
-            for filepath_obj in all_files:
-                filepath = str(filepath_obj)
-                if filepath.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS):
-                    self._process_audio_file(filepath)
-                
-                processed += 1
-                progress = processed / total_files if total_files > 0 else 0
-                Clock.schedule_once(lambda dt: self.dispatch('on_scan_progress', progress, f"Scanning: {processed}/{total_files}"))
-
             self._clean_orphans()
+            summary = stats.summary()
+            if removed:
+                summary += f", {removed} removed"
+            log.info(f"Scan stats: {summary}")
 
-            Clock.schedule_once(lambda dt: self.dispatch('on_scan_finished', "Library scan completed."))
+            self._finish_scan(f"Library scan completed: {summary}.")
         except Exception as e:
             log.exception("Scan failed with an unexpected error.")
-            error_str = str(e)
-            Clock.schedule_once(lambda dt: self.dispatch('on_scan_finished', f"Scan failed: {error_str}"))
+            self._finish_scan(f"Scan failed: {e}")
         finally:
             self.is_scanning = False
+            self._db.release()
             log.info("Scan thread finished.")
 
-    def _process_audio_file(self, filepath):
+    def _finish_scan(self, message):
+        self.last_scan_message = message
+        Clock.schedule_once(lambda dt: self.dispatch('on_scan_finished', message))
+
+    def run_scan(self, full_rescan=False, force_deep=None, workers=None):
+        """
+        Scans like start_scan_music_library() but blocks until the scan ends and
+        returns its final message; for headless use. Kivy's clock is pumped on
+        this thread meanwhile, so progress events still fire. Ctrl+C stops the
+        scan at a checkpoint, as stop_scan() does.
+        """
+        if self.is_scanning:
+            log.warning("Scan already in progress. Ignoring request.")
+            return None
+        self.start_scan_music_library(full_rescan, force_deep, workers=workers)
         try:
-            file_hash = generate_file_hash(filepath)
-            last_modified = os.path.getmtime(filepath)
-            
-            with self._db_lock, self._get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"SELECT filehash, last_modified FROM {DB_TRACKS_TABLE} WHERE filepath = ?", (filepath,))
-                row = cursor.fetchone()
-                if row and row['filehash'] == file_hash and row['last_modified'] == last_modified:
-                    return
-                
-                try:
-                    meta = mutagen.File(filepath, easy=False)
-                    if meta is None:
-                        log.warning(f"SKIPPED: Could not load metadata for: {os.path.basename(filepath)}")
-                        return
-                except Exception as e:
-                    log.warning(f"SKIPPED: Failed to read metadata for {os.path.basename(filepath)} due to error: {e}")
-                    return
-                
-                self._update_track_in_db(conn, filepath, meta, file_hash, last_modified)
-                conn.commit()
-                log.info(f"ADDED/UPDATED: {os.path.basename(filepath)}")
-
-        except Exception:
-            log.exception(f"FAILED: Unexpected error processing file {os.path.basename(filepath)}")
-
-    def _update_track_in_db(self, conn, filepath, meta, file_hash, last_modified):
-        titles = _get_tag_values(meta, ['TIT2', 'title', '©nam'])
-        title = titles[0] if titles else Path(filepath).stem
-
-        albums = _get_tag_values(meta, ['TALB', 'album', '©alb'])
-        album_name = albums[0] if albums else 'Unknown Album'
-
-        track_artists = _get_tag_values(meta, ['TPE1', 'artist', '©ART'])
-        track_artist_name = ', '.join(track_artists) if track_artists else 'Unknown Artist'
-
-        album_artists = _get_tag_values(meta, ['TPE2', 'albumartist', 'aART'])
-        album_artist_name = ', '.join(album_artists) if album_artists else track_artist_name
-
-        composers = _get_tag_values(meta, ['TCOM', 'composer', '©wrt'])
-        composer = ', '.join(composers) if composers else None
-
-        bpm_vals = _get_tag_values(meta, ['TBPM', 'bpm'])
-        bpm = _safe_convert(bpm_vals[0] if bpm_vals else None, float)
-
-        comment_vals = _get_tag_values(meta, ['COMM', 'comment', '©cmt'])
-        comment = '\n'.join(comment_vals) if comment_vals else None
-
-        lyrics_vals = _get_tag_values(meta, ['USLT', 'lyrics', '©lyr'])
-        lyrics = '\n'.join(lyrics_vals) if lyrics_vals else None
-
-        publisher_vals = _get_tag_values(meta, ['TPUB', 'publisher'])
-        publisher = ', '.join(publisher_vals) if publisher_vals else None
-
-        copyright_vals = _get_tag_values(meta, ['TCOP', 'copyright', 'cprt'])
-        copyright = ', '.join(copyright_vals) if copyright_vals else None
-
-        years = _get_tag_values(meta, ['TYER', 'TDAT', 'TDRC', 'date', '©day'])
-        year = _safe_convert(years[0][:4] if years and years[0] else None, int)
-
-        genres = _get_tag_values(meta, ['TCON', 'genre', '©gen'])
-        genre = genres[0] if genres else None
-
-        track_numbers = _get_tag_values(meta, ['TRCK', 'tracknumber', '©trk'])
-        track_number = _safe_convert(track_numbers[0] if track_numbers else None, int, split_char='/')
-
-        disc_numbers = _get_tag_values(meta, ['TPOS', 'discnumber', '©dsk'])
-        disc_number = _safe_convert(disc_numbers[0] if disc_numbers else None, int, split_char='/')
+            while self._scan_thread.is_alive():
+                Clock.tick()
+                self._scan_thread.join(0.05)
+        except KeyboardInterrupt:
+            log.info("Interrupted; stopping the scan at a checkpoint.")
+            self.stop_scan(wait_seconds=SCAN_STOP_TIMEOUT_SECONDS)
+        Clock.tick()
+        return self.last_scan_message
+
+    def _dispatch_scan_progress(self, snapshot):
+        # Runs on the main thread via ScanProgressReporter, at a bounded rate.
+        if self.is_scanning:
+            self.progress_value = snapshot['progress']
+            self.scan_progress_message = snapshot['message']
+            self.dispatch('on_scan_progress', snapshot)
+
+    def _get_scan_worker_count(self, workers=None):
+        if workers is None:
+            workers = self.settings_manager.get_scan_workers()
+        return max(1, workers or os.cpu_count() or 1)
+
+    def _create_scan_pool(self, workers):
+        if self.settings_manager.get_scan_use_processes():
+            return ProcessPoolExecutor(max_workers=workers)
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scan-worker")
+
+    def _load_stat_index(self):
+        """Loads the stored stat record of every track in one query, keyed by filepath."""
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT filepath, filehash, file_size, mtime_ns, inode FROM {DB_TRACKS_TABLE}")
+            return {row['filepath']: row for row in cursor.fetchall()}
 
-        duration = meta.info.length if hasattr(meta.info, 'length') else 0
+    def _submit_scan_job(self, pool, entry, known_files, move_index, stats, results, in_flight):
+        filepath = entry.path
+        stats.increment('checked')
+        started = time.perf_counter()
+        try:
+            st = entry.stat()
+        except OSError as e:
+            log.warning(f"FAILED: Could not stat {os.path.basename(filepath)}: {e}")
+            stats.fail(filepath)
+            return
+        stat_seconds = time.perf_counter() - started
+        row = known_files.get(filepath)
+        if _stat_record_matches(row, st):
+            stats.increment('fast_skipped')
+            if stats.telemetry:
+                stats.telemetry.record(filepath, {'stat': stat_seconds}, 'fast_skipped')
+            return
 
-        bitrate = int(meta.info.bitrate / 1000) if hasattr(meta.info, 'bitrate') and meta.info.bitrate else None
+        stats.increment('bytes_scanned', st.st_size)
+        while not in_flight.acquire(timeout=0.5):
+            if self._cancel_event.is_set():
+                return
+        future = pool.submit(
+            extract_track_record, filepath, _stat_tuple(st),
+            row['filehash'] if row else None, str(self.art_cache_dir),
+            move_candidates=() if row else move_index.candidates(filepath, st)
+        )
+        # Results are written in submission order, which keeps folder checkpoints simple.
+        results.put(('job', future, filepath, row is None, stat_seconds))
+
+    def _run_scan_writer(self, results, stats, in_flight, progress):
+        """
+        Single thread that applies worker results to the database. Records are
+        grouped into one transaction per SCAN_BATCH_SIZE files or SCAN_BATCH_SECONDS,
+        whichever comes first, so commit latency does not bound import speed.
+        Each transaction also checkpoints the paths it wrote.
+        """
+        conn = self._get_db_connection()
+        ids = ScanIdCache()
+        batch = []
+        deadline = 0.0
+        try:
+            while True:
+                timeout = max(0.0, deadline - time.monotonic()) if batch else None
+                try:
+                    item = results.get(timeout=timeout)
+                except queue.Empty:
+                    self._flush_scan_batch(conn, batch, stats, ids)
+                    progress.notify()
+                    batch = []
+                    continue
+                if item is None:
+                    break
+                if item[0] == 'folder':
+                    self._flush_scan_batch(conn, batch, stats, ids, completed_folder=item[1])
+                    batch = []
+                    continue
+
+                _, future, filepath, is_new, stat_seconds = item
+                try:
+                    record = future.result()
+                except CancelledError:
+                    continue
+                except Exception:
+                    log.exception(f"FAILED: Scan worker raised an unexpected error for {os.path.basename(filepath)}.")
+                    stats.fail(filepath)
+                    continue
+                finally:
+                    in_flight.release()
+
+                record['timings']['stat'] = stat_seconds
+                if not batch:
+                    deadline = time.monotonic() + SCAN_BATCH_SECONDS
+                batch.append((record, is_new))
+                if len(batch) >= SCAN_BATCH_SIZE or time.monotonic() >= deadline:
+                    self._flush_scan_batch(conn, batch, stats, ids)
+                    progress.notify()
+                    batch = []
+        finally:
+            if batch:
+                self._flush_scan_batch(conn, batch, stats, ids)
+            self._db.release()
 
-        samplerate = int(meta.info.sample_rate) if hasattr(meta.info, 'sample_rate') and meta.info.sample_rate else None
+    def _flush_scan_batch(self, conn, batch, stats, ids, completed_folder=None):
+        started = time.perf_counter()
+        try:
+            with self._db_lock:
+                outcomes = self._write_scan_batch(conn, batch, ids, checkpoint=True, completed_folder=completed_folder)
+        except sqlite3.Error:
+            log.exception(f"Batch write of {len(batch)} tracks failed; retrying them one by one.")
+            conn.rollback()
+            outcomes = []
+            for item in batch:
+                try:
+                    with self._db_lock:
+                        outcomes.extend(self._write_scan_batch(conn, [item], ids, checkpoint=True))
+                except sqlite3.Error:
+                    conn.rollback()
+                    log.exception(f"FAILED: Could not store {os.path.basename(item[0]['filepath'])}")
+                    outcomes.append('failed')
+            if completed_folder:
+                with self._db_lock:
+                    self._write_scan_batch(conn, [], ids, completed_folder=completed_folder)
+        # Telemetry charges each file an equal share of the batch's write time.
+        db_seconds = (time.perf_counter() - started) / len(batch) if batch else 0.0
+        for (record, _), outcome in zip(batch, outcomes):
+            self._count_scan_outcome(stats, record, outcome)
+            if stats.telemetry:
+                stats.telemetry.record(record['filepath'], dict(record['timings'], db=db_seconds), outcome)
+
+    def _count_scan_outcome(self, stats, record, outcome):
+        if outcome == 'failed':
+            stats.fail(record['filepath'])
+        elif outcome == 'moved':
+            stats.record_move(record['moved_from'], record['filepath'])
+        else:
+            stats.increment(outcome)
+
+    # --- Directory fingerprints ---
+
+    def _load_directory_index(self):
+        with self._get_db_connection() as conn:
+            rows = conn.execute("SELECT path, mtime_ns, names_digest, checked_at_ns FROM scan_directories").fetchall()
+        return {row['path']: (row['mtime_ns'], row['names_digest'], row['checked_at_ns']) for row in rows}
+
+    def _store_directory_index(self, visited_dirs, failed_paths, roots=None):
+        """
+        Replaces the stored fingerprints after a completed scan, only those
+        below `roots` if the scan was limited to them. Directories holding a
+        file that failed are left out so the file is retried next time.
+        """
+        failed_dirs = {os.path.dirname(path) for path in failed_paths}
+        rows = [(path, *fingerprint) for path, fingerprint in visited_dirs.items() if path not in failed_dirs]
+        with self._db_lock, self._get_db_connection() as conn:
+            if roots is None:
+                conn.execute("DELETE FROM scan_directories")
+            for root in roots or ():
+                prefix = root.rstrip(os.sep) + os.sep
+                conn.execute("DELETE FROM scan_directories WHERE path = ? OR substr(path, 1, ?) = ?", (root, len(prefix), prefix))
+            conn.executemany("INSERT INTO scan_directories (path, mtime_ns, names_digest, checked_at_ns) VALUES (?, ?, ?, ?)", rows)
+            conn.commit()
 
-        album_artist_id = self._get_or_create_artist(conn, album_artist_name) if album_artist_name else None
-        track_artist_id = self._get_or_create_artist(conn, track_artist_name) if track_artist_name else None
+    # --- Scan checkpoints ---
 
-        album_id = self._get_or_create_album(conn, album_name, album_artist_id, year=year)
+    def _load_scan_checkpoint(self):
+        """Returns the state of an interrupted scan, or None if the last scan finished."""
+        with self._get_db_connection() as conn:
+            row = conn.execute("SELECT value FROM scan_state WHERE key = 'active_scan'").fetchone()
+            if not row:
+                return None
+            state = json.loads(row['value'])
+            completed_folders, done_paths = set(), set()
+            for path, is_folder in conn.execute("SELECT path, is_folder FROM scan_checkpoint"):
+                (completed_folders if is_folder else done_paths).add(path)
+        return {
+            'folders': state.get('folders', []),
+            'full_rescan': bool(state.get('full_rescan')),
+            'completed_folders': completed_folders,
+            'done_paths': done_paths,
+        }
+
+    def _begin_scan_checkpoint(self, folders, full_rescan):
+        state = json.dumps({'folders': folders, 'full_rescan': full_rescan, 'started_at': time.time()})
+        with self._db_lock, self._get_db_connection() as conn:
+            conn.execute("DELETE FROM scan_checkpoint")
+            conn.execute("INSERT OR REPLACE INTO scan_state (key, value) VALUES ('active_scan', ?)", (state,))
+            conn.commit()
 
-        art_filename = None
-        pictures = None
-        if hasattr(meta, 'pictures') and meta.pictures:
-            pictures = meta.pictures
-        elif 'APIC:' in meta:
-            pictures = [meta['APIC:']]
-        elif meta.tags and any(key.startswith('covr') for key in meta.tags):
-            pictures = [meta.tags.get('covr')[0]]
+    def _clear_scan_checkpoint(self):
+        with self._db_lock, self._get_db_connection() as conn:
+            conn.execute("DELETE FROM scan_checkpoint")
+            conn.execute("DELETE FROM scan_state WHERE key = 'active_scan'")
+            conn.commit()
 
-        if pictures:
-            pic = pictures[0]
-            art_data = pic.data if hasattr(pic, 'data') else bytes(pic)
-            art_filename = self._extract_and_save_album_art(filepath, art_data, album_name, album_artist_name)
-            if art_filename:
+    def _process_audio_file(self, filepath, stats=None, force=False, move_index=None):
+        """
+        Adds or refreshes a single track. Unless `force` is set, the stored stat
+        record is compared first so unchanged files are never read from disk.
+        A file new to the library is matched against vanished tracks in
+        `move_index` first. Returns one of 'fast_skipped', 'hash_skipped',
+        'moved', 'added', 'updated' or 'failed'.
+        """
+        stats = stats or ScanStats()
+        stats.increment('checked')
+        try:
+            st = os.stat(filepath)
+            with self._get_db_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(f"UPDATE {DB_ALBUMS_TABLE} SET art_filename = COALESCE(art_filename, ?) WHERE id = ?", (art_filename, album_id))
-
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            INSERT OR REPLACE INTO {DB_TRACKS_TABLE}
-            (filepath, filehash, title, album_id, artist_id, track_number, disc_number, duration, genre, year, last_modified, composer, bpm, comment, bitrate, samplerate, lyrics, publisher, copyright)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (filepath, file_hash, title, album_id, track_artist_id, track_number, disc_number, duration, genre, year, last_modified, composer, bpm, comment, bitrate, samplerate, lyrics, publisher, copyright))
+                cursor.execute(f"SELECT filehash, file_size, mtime_ns, inode FROM {DB_TRACKS_TABLE} WHERE filepath = ?", (filepath,))
+                row = cursor.fetchone()
+            if not force and _stat_record_matches(row, st):
+                stats.increment('fast_skipped')
+                return 'fast_skipped'
+
+            move_candidates = move_index.candidates(filepath, st) if move_index and not row else ()
+            record = extract_track_record(
+                filepath, _stat_tuple(st), row['filehash'] if row else None, str(self.art_cache_dir),
+                force=force, move_candidates=move_candidates
+            )
+            with self._db_lock, self._get_db_connection() as conn:
+                outcome = self._write_scan_batch(conn, [(record, row is None)], ScanIdCache())[0]
+            self._count_scan_outcome(stats, record, outcome)
+            return outcome
 
-    def _get_or_create_artist(self, conn, name):
-        if not name:
-            return None
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT id FROM {DB_ARTISTS_TABLE} WHERE name = ?", (name,))
-        row = cursor.fetchone()
-        if row:
-            return row['id']
-        cursor.execute(f"INSERT INTO {DB_ARTISTS_TABLE} (name) VALUES (?)", (name,))
-        return cursor.lastrowid
-
-    def _get_or_create_album(self, conn, name, artist_id, art_filename=None, year=None):
-        cursor = conn.cursor()
-        if artist_id is None:
-            cursor.execute(f"SELECT id FROM {DB_ALBUMS_TABLE} WHERE name = ? AND artist_id IS NULL", (name,))
-        else:
-            cursor.execute(f"SELECT id FROM {DB_ALBUMS_TABLE} WHERE name = ? AND artist_id = ?", (name, artist_id))
-        row = cursor.fetchone()
-        if row:
-            album_id = row['id']
-            if art_filename:
-                cursor.execute(f"UPDATE {DB_ALBUMS_TABLE} SET art_filename = COALESCE(art_filename, ?) WHERE id = ?", (art_filename, album_id))
-            if year is not None:
-                cursor.execute(f"UPDATE {DB_ALBUMS_TABLE} SET year = COALESCE(year, ?) WHERE id = ?", (year, album_id))
-            return album_id
-        cursor.execute(f"INSERT INTO {DB_ALBUMS_TABLE} (name, artist_id, art_filename, year) VALUES (?, ?, ?, ?)", (name, artist_id, art_filename, year))
-        return cursor.lastrowid
-
-    def _extract_and_save_album_art(self, filepath, art_data, album_name, artist_name):
-        if PILImage is None:
-            log.warning("PIL not available, skipping album art extraction.")
-            return None
+        except Exception:
+            log.exception(f"FAILED: Unexpected error processing file {os.path.basename(filepath)}")
+            stats.fail(filepath)
+            return 'failed'
+
+    def _write_scan_batch(self, conn, batch, ids, checkpoint=False, completed_folder=None):
+        """
+        Writes (record, is_new) pairs in a single transaction and commits it.
+        Artist and album IDs are resolved through the scan's ScanIdCache `ids`.
+        With `checkpoint`, the written paths (and a finished root folder) are
+        recorded in the same transaction so an interrupted scan can resume.
+        The caller holds the lock. Returns one outcome per record.
+        """
         try:
-            with io.BytesIO(art_data) as img_io:
-                img = PILImage.open(img_io)
-                if isinstance(ALBUM_ART_THUMBNAIL_SIZE, int):
-                    thumbnail_size = (ALBUM_ART_THUMBNAIL_SIZE, ALBUM_ART_THUMBNAIL_SIZE)
-                else:
-                    thumbnail_size = ALBUM_ART_THUMBNAIL_SIZE
-                img.thumbnail(thumbnail_size, PILImage.LANCZOS)
-                thumbnail_stream = io.BytesIO()
-                img.save(thumbnail_stream, format='JPEG', quality=85)
-                thumbnail_stream.seek(0)
-
-            filename = sanitize_filename_for_cache(f"{artist_name}_{album_name}.jpg")
-            art_path = self.art_cache_dir / filename
-            
-            with open(art_path, 'wb') as f:
-                f.write(thumbnail_stream.read())
-
-            if os.path.exists(art_path):
-                return filename
+            outcomes = self._apply_scan_batch(conn, batch, ids, checkpoint, completed_folder)
+        except sqlite3.Error:
+            ids.rollback()
+            raise
+        ids.commit()
+        return outcomes
+
+    def _apply_scan_batch(self, conn, batch, ids, checkpoint, completed_folder):
+        track_rows, text_rows, textless_paths, stat_rows, outcomes = [], [], [], [], []
+        moved_paths = []
+        for record, is_new in batch:
+            filepath = record['filepath']
+            if record['status'] == 'moved':
+                if self._move_track_row(conn, record):
+                    moved_paths += (record['moved_from'], filepath)
+                    outcomes.append('moved')
+                    continue
+                # Another new file already took over that row (the track was copied
+                # as well as moved), so this one is imported as a track of its own.
+                record = extract_track_record(filepath, record['stat'], None, str(self.art_cache_dir))
+            if record['status'] == 'hash_skipped':
+                # A legacy row whose full-file hash still matched: store the stat record and
+                # the sampled fingerprint that replaces the legacy hash.
+                size, mtime_ns, inode, mtime = record['stat']
+                stat_rows.append((record['filehash'], size, mtime_ns, inode, mtime, filepath))
+                outcomes.append('hash_skipped')
+            elif record['status'] == 'parsed':
+                track_rows.append(self._build_track_row(conn, record, ids))
+                if record['lyrics'] is not None or record['comment'] is not None:
+                    text_rows.append((record['lyrics'], record['comment'], filepath))
+                elif not is_new:
+                    textless_paths.append((filepath,))
+                outcome = 'added' if is_new else 'updated'
+                log.info(f"{outcome.upper()}: {os.path.basename(filepath)}")
+                outcomes.append(outcome)
             else:
-                log.error(f"FAILURE: Thumbnail file was NOT created at {art_path}.")
-                return None
-        except Exception as e:
-            log.error(f"Pillow failed to process album art for {os.path.basename(filepath)}: {e}", exc_info=True)
-            return None
-
-    def _clear_obsolete_entries(self, current_folders):
-        if not current_folders:
-            return
+                outcomes.append('failed')
+
+        if stat_rows:
+            conn.executemany(f"UPDATE {DB_TRACKS_TABLE} SET filehash = ?, file_size = ?, mtime_ns = ?, inode = ?, last_modified = ? WHERE filepath = ?", stat_rows)
+        if track_rows:
+            # An upsert rather than INSERT OR REPLACE, which would delete the row and give the track a new id.
+            conn.executemany(f"""
+                INSERT INTO {DB_TRACKS_TABLE}
+                (filepath, filehash, title, album_id, artist_id, track_number, disc_number, duration, genre, year, last_modified, composer, bpm, bitrate, samplerate, publisher, copyright, file_size, mtime_ns, inode, artist_sort, album_sort)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(filepath) DO UPDATE SET
+                    filehash = excluded.filehash, title = excluded.title, album_id = excluded.album_id,
+                    artist_id = excluded.artist_id, track_number = excluded.track_number,
+                    disc_number = excluded.disc_number, duration = excluded.duration, genre = excluded.genre,
+                    year = excluded.year, last_modified = excluded.last_modified, composer = excluded.composer,
+                    bpm = excluded.bpm, bitrate = excluded.bitrate,
+                    samplerate = excluded.samplerate, publisher = excluded.publisher,
+                    copyright = excluded.copyright, file_size = excluded.file_size,
+                    mtime_ns = excluded.mtime_ns, inode = excluded.inode,
+                    artist_sort = excluded.artist_sort, album_sort = excluded.album_sort
+            """, track_rows)
+        if text_rows:
+            conn.executemany(f"""
+                INSERT INTO track_text (track_id, lyrics, comment)
+                SELECT id, ?, ? FROM {DB_TRACKS_TABLE} WHERE filepath = ?
+                ON CONFLICT(track_id) DO UPDATE SET lyrics = excluded.lyrics, comment = excluded.comment
+            """, text_rows)
+        if textless_paths:
+            conn.executemany(f"DELETE FROM track_text WHERE track_id = (SELECT id FROM {DB_TRACKS_TABLE} WHERE filepath = ?)", textless_paths)
+        if track_rows and self._search_index:
+            conn.executemany(f"""
+                INSERT OR REPLACE INTO track_search (rowid, title, artist, album, album_artist, genre, composer)
+                SELECT t.id, t.title, ar.name, al.name, aa.name, t.genre, t.composer
+                FROM {DB_TRACKS_TABLE} t
+                LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                LEFT JOIN {DB_ARTISTS_TABLE} aa ON al.artist_id = aa.id
+                WHERE t.filepath = ?
+            """, [(row[0],) for row in track_rows])
+        updated_albums = ids.flush_album_updates(conn)
+        if checkpoint and batch:
+            # Failed files stay out of the checkpoint so a resumed scan tries them again.
+            conn.executemany("INSERT OR IGNORE INTO scan_checkpoint (path, is_folder) VALUES (?, 0)",
+                             [(record['filepath'],) for (record, _), outcome in zip(batch, outcomes) if outcome != 'failed'])
+        if completed_folder:
+            conn.execute("INSERT OR IGNORE INTO scan_checkpoint (path, is_folder) VALUES (?, 1)", (completed_folder,))
+        conn.commit()
+        if track_rows or stat_rows or moved_paths:
+            written = [row[0] for row in track_rows] + [row[-1] for row in stat_rows] + moved_paths
+            self._tracks_changed(written, updated_albums, names_changed=bool(track_rows))
+        log.debug(f"Committed scan batch: {len(track_rows)} tracks written, {len(stat_rows)} stat records refreshed.")
+        return outcomes
+
+    def _move_track_row(self, conn, record):
+        """Points the vanished track's row at its new path; False if the row is already gone."""
+        size, mtime_ns, inode, mtime = record['stat']
+        cursor = conn.execute(
+            f"UPDATE {DB_TRACKS_TABLE} SET filepath = ?, filehash = ?, file_size = ?, mtime_ns = ?, inode = ?, last_modified = ? WHERE filepath = ?",
+            (record['filepath'], record['filehash'], size, mtime_ns, inode, mtime, record['moved_from'])
+        )
+        if cursor.rowcount:
+            log.info(f"MOVED: {record['moved_from']} -> {record['filepath']}")
+        return cursor.rowcount > 0
+
+    def _build_track_row(self, conn, r, ids):
+        """Resolves artist and album IDs for a parsed record and returns its tracks row."""
+        size, mtime_ns, inode, mtime = r['stat']
+        album_artist_id = ids.artist_id(conn, r['album_artist_name'])
+        track_artist_id = ids.artist_id(conn, r['track_artist_name'])
+        album_id = ids.album_id(conn, r['album_name'], album_artist_id, art_filename=r['art_filename'], art_hash=r['art_hash'], year=r['year'])
+        # Lyrics and comment go to track_text, written separately once the row has an id.
+        return (r['filepath'], r['filehash'], r['title'], album_id, track_artist_id, r['track_number'], r['disc_number'], r['duration'], r['genre'], r['year'], mtime, r['composer'], r['bpm'], r['bitrate'], r['samplerate'], r['publisher'], r['copyright'], size, mtime_ns, inode, r['track_artist_name'] or '', r['album_name'] or '')
+
+    def apply_file_changes(self, changed_paths, deleted_paths):
+        """
+        Re-indexes only the given paths instead of walking the library; used by
+        the folder watcher. Deleted paths may be files or whole directories.
+        """
+        stats = ScanStats()
+        # A move arrives as a delete plus a create; match them up before deleting anything.
+        move_index = MoveIndex(self._load_stat_index_below(deleted_paths)) if deleted_paths else None
+        gone = list(deleted_paths)
+        for filepath in changed_paths:
+            if os.path.isfile(filepath):
+                self._process_audio_file(filepath, stats=stats, move_index=move_index)
+            else:
+                gone.append(filepath)
+        removed = self._delete_tracks_for_paths(gone) if gone else 0
+        counts = stats.snapshot()
+        if removed or counts['added'] or counts['updated'] or counts['moved']:
+            self._clean_orphans()
+            self._dispatch_tracks_moved(stats.moves)
+            Clock.schedule_once(lambda dt: self.dispatch('on_library_changed'))
+        log.info(f"Applied watched changes: {stats.summary()}, {removed} removed.")
+
+    def _load_stat_index_below(self, paths):
+        """Like _load_stat_index, for the tracks at or below the given paths."""
+        rows = {}
+        with self._get_db_connection() as conn:
+            for path in paths:
+                prefix = path.rstrip(os.sep) + os.sep
+                cursor = conn.execute(
+                    f"SELECT filepath, filehash, file_size, mtime_ns, inode FROM {DB_TRACKS_TABLE} WHERE filepath = ? OR substr(filepath, 1, ?) = ?",
+                    (path, len(prefix), prefix)
+                )
+                rows.update((row['filepath'], row) for row in cursor)
+        return rows
+
+    def _delete_vanished_tracks(self, known_files, walked_folders, seen_paths, unchanged_dirs, moves=()):
+        """
+        After a complete walk, deletes tracks whose file is gone. Tracks that
+        were moved already point at their new path, so the old paths in `moves`
+        are skipped. Only folders walked in this run are considered, and each
+        file is confirmed missing before deletion, so a directory that could
+        not be listed does not lose its tracks.
+        """
+        prefixes = tuple(folder.rstrip(os.sep) + os.sep for folder in walked_folders)
+        moved_from = {old_path for old_path, _ in moves}
+        vanished = [
+            path for path in known_files
+            if path.startswith(prefixes) and path not in seen_paths and path not in moved_from
+            and os.path.dirname(path) not in unchanged_dirs and not os.path.lexists(path)
+        ]
+        if not vanished:
+            return 0
         with self._db_lock, self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            patterns = [f + os.path.sep + '%' for f in current_folders]
-            condition = " AND ".join(["filepath NOT LIKE ?"] * len(patterns))
-            cursor.execute(f"DELETE FROM {DB_TRACKS_TABLE} WHERE {condition}", tuple(patterns))
-            conn.execute(f"DELETE FROM {DB_ALBUMS_TABLE} WHERE id NOT IN (SELECT DISTINCT album_id FROM {DB_TRACKS_TABLE} WHERE album_id IS NOT NULL)")
-            conn.execute(f"DELETE FROM {DB_ARTISTS_TABLE} WHERE id NOT IN (SELECT DISTINCT artist_id FROM {DB_TRACKS_TABLE} WHERE artist_id IS NOT NULL) AND id NOT IN (SELECT DISTINCT artist_id FROM {DB_ALBUMS_TABLE} WHERE artist_id IS NOT NULL)")
+            cursor = conn.executemany(f"DELETE FROM {DB_TRACKS_TABLE} WHERE filepath = ?", [(path,) for path in vanished])
+            removed = cursor.rowcount
             conn.commit()
+        self._tracks_changed(vanished)
+        if removed:
+            log.info(f"REMOVED: {removed} track(s) no longer on disk.")
+        return removed
+
+    def _dispatch_tracks_moved(self, moves):
+        if moves:
+            moved = dict(moves)
+            Clock.schedule_once(lambda dt: self.dispatch('on_tracks_moved', moved))
+
+    def _delete_tracks_for_paths(self, paths):
+        """Deletes tracks at the given paths or anywhere below them; returns the count."""
+        removed = 0
+        with self._db_lock, self._get_db_connection() as conn:
+            for path in paths:
+                prefix = path.rstrip(os.sep) + os.sep
+                cursor = conn.execute(
+                    f"DELETE FROM {DB_TRACKS_TABLE} WHERE filepath = ? OR substr(filepath, 1, ?) = ?",
+                    (path, len(prefix), prefix)
+                )
+                removed += cursor.rowcount
+            conn.commit()
+        if removed:
+            self._track_cache.invalidate_below(paths)
+            self._tracks_changed(filepaths=())
+            log.info(f"REMOVED: {removed} track(s) no longer on disk.")
+        return removed
 
     def _clear_database(self):
         with self._db_lock, self._get_db_connection() as conn:
             conn.execute(f"DELETE FROM {DB_TRACKS_TABLE}")
             conn.execute(f"DELETE FROM {DB_ALBUMS_TABLE}")
             conn.execute(f"DELETE FROM {DB_ARTISTS_TABLE}")
+            conn.execute("DELETE FROM scan_directories")
             conn.commit()
+        self._tracks_changed()
         log.info("Database cleared for full rescan.")
 
+    def _tracks_changed(self, filepaths=None, album_ids=(), names_changed=True):
+        """
+        Called after every committed change to track or album rows; drops data
+        derived from them. `filepaths` (old and new paths of the tracks written)
+        and `album_ids` (albums whose art or year changed) limit what leaves the
+        track cache; None empties it. Without `names_changed` (only stat
+        records or paths changed) the fuzzy index is kept.
+        """
+        if names_changed:
+            self._fuzzy_index.invalidate()
+        self._art_paths.clear()
+        if filepaths is None:
+            self._track_cache.clear()
+            return
+        self._track_cache.invalidate_paths(filepaths)
+        if album_ids:
+            self._track_cache.invalidate_albums(album_ids)
+
     def _clean_orphans(self):
+        # Only albums and artists no track refers to are deleted, so no track row (or cached copy) changes.
         with self._db_lock, self._get_db_connection() as conn:
-            conn.execute(f"DELETE FROM {DB_ALBUMS_TABLE} WHERE id NOT IN (SELECT DISTINCT album_id FROM {DB_TRACKS_TABLE} WHERE album_id IS NOT NULL)")
-            conn.execute(f"DELETE FROM {DB_ARTISTS_TABLE} WHERE id NOT IN (SELECT DISTINCT artist_id FROM {DB_TRACKS_TABLE} WHERE artist_id IS NOT NULL) AND id NOT IN (SELECT DISTINCT artist_id FROM {DB_ALBUMS_TABLE} WHERE artist_id IS NOT NULL)")
+            # NOT EXISTS probes idx_tracks_album / idx_tracks_artist / idx_albums_artist once per row.
+            conn.execute(f"DELETE FROM {DB_ALBUMS_TABLE} WHERE NOT EXISTS (SELECT 1 FROM {DB_TRACKS_TABLE} t WHERE t.album_id = {DB_ALBUMS_TABLE}.id)")
+            conn.execute(f"DELETE FROM {DB_ARTISTS_TABLE} WHERE NOT EXISTS (SELECT 1 FROM {DB_TRACKS_TABLE} t WHERE t.artist_id = {DB_ARTISTS_TABLE}.id) AND NOT EXISTS (SELECT 1 FROM {DB_ALBUMS_TABLE} al WHERE al.artist_id = {DB_ARTISTS_TABLE}.id)")
             conn.commit()
         log.info("Cleaned orphan albums and artists.")
 
-    def stop_scan(self):
+    def stop_scan(self, wait_seconds=0):
+        """
+        Asks a running scan to stop at the next file. Work already written is
+        kept and the next start_scan_music_library resumes from the checkpoint.
+        """
         if self._scan_thread and self._scan_thread.is_alive():
-            log.warning("Scan thread stop requested, but threading doesn't support forced stop. Waiting for completion.")
-        self.is_scanning = False
+            log.info("Scan stop requested; finishing in-flight files and saving checkpoint.")
+            self._cancel_event.set()
+            if wait_seconds:
+                self._scan_thread.join(timeout=wait_seconds)
+
+    # =========================================================================
+    # Queries
+    # =========================================================================
+
+    def _art_path(self, art_filename):
+        """
+        Thumbnail path for an albums.art_filename, or None when there is none or
+        it is missing from the cache directory. Each file is stat'ed once; the
+        results are dropped whenever tracks change.
+        """
+        if not art_filename:
+            return None
+        path = self._art_paths.get(art_filename, False)
+        if path is False:
+            candidate = self.art_cache_dir / art_filename
+            path = self._art_paths[art_filename] = str(candidate) if candidate.exists() else None
+        return path
+
+    def _track_row(self, row):
+        """A track row as a dict, with the album's art_filename resolved to `art_path`."""
+        track = dict(row)
+        track['art_path'] = self._art_path(track.pop('art_filename', None))
+        return track
+
+    def _track_rows(self, cursor):
+        return [self._track_row(row) for row in cursor]
 
     def get_all_artists(self):
-        with self._db_lock, self._get_db_connection() as conn:
+        with self._get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, name FROM artists ORDER BY name COLLATE NOCASE")
             return [dict(row) for row in cursor.fetchall()]
 
     def get_all_albums(self, consolidated=False):
-        with self._db_lock, self._get_db_connection() as conn:
+        with self._get_db_connection() as conn:
             cursor = conn.cursor()
             if not consolidated:
                 cursor.execute("""
@@ -398,34 +846,23 @@ class LibraryManager(EventDispatcher):
                     ORDER BY al.name COLLATE NOCASE
                 """)
             else:
+                # Maintained by triggers on albums; see db_migrations._migrate_album_groups.
                 cursor.execute("""
-                    SELECT
-                        MIN(al.id) as id,
-                        al.name,
-                        MAX(al.year) as year,
-                        (SELECT art_filename FROM albums WHERE name = al.name AND art_filename IS NOT NULL LIMIT 1) as art_filename,
-                        CASE
-                            WHEN COUNT(DISTINCT al.artist_id) > 1 THEN 'Various Artists'
-                            ELSE MAX(ar.name)
-                        END as artist_name
-                    FROM albums al
-                    LEFT JOIN artists ar ON al.artist_id = ar.id
-                    GROUP BY al.name COLLATE NOCASE
-                    ORDER BY al.name COLLATE NOCASE
+                    SELECT album_id as id, name, year, art_filename, artist_name
+                    FROM album_groups ORDER BY name
                 """)
             
             albums = []
             for row in cursor.fetchall():
-                art_path = self.art_cache_dir / row["art_filename"] if row["art_filename"] else None
                 albums.append({
                     "id": row["id"], "name": row["name"], "year": row["year"],
                     "artist_name": row["artist_name"] or "Unknown Artist",
-                    "art_path": str(art_path) if art_path and art_path.exists() else None
+                    "art_path": self._art_path(row["art_filename"])
                 })
             return albums
 
     def get_albums_by_artist(self, artist_id):
-        with self._db_lock, self._get_db_connection() as conn:
+        with self._get_db_connection() as conn:
             cursor = conn.cursor()
             if artist_id is None:
                 cursor.execute("""
@@ -441,115 +878,318 @@ class LibraryManager(EventDispatcher):
                 """, (artist_id,))
             albums = []
             for row in cursor.fetchall():
-                art_path = self.art_cache_dir / row["art_filename"] if row["art_filename"] else None
                 albums.append({
                     "id": row["id"], "name": row["name"], "year": row["year"],
                     "artist_name": row["artist_name"] or "Unknown Artist",
-                    "art_path": str(art_path) if art_path and art_path.exists() else None
+                    "art_path": self._art_path(row["art_filename"])
                 })
             return albums
 
     def get_tracks_by_album(self, album_id):
-        with self._db_lock, self._get_db_connection() as conn:
+        with self._get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT t.id, t.filepath, t.title, t.track_number, t.disc_number, t.duration, ar.name as artist_name
+                SELECT t.id, t.filepath, t.title, t.track_number, t.disc_number, t.duration, ar.name as artist_name, al.art_filename
                 FROM tracks t LEFT JOIN artists ar ON t.artist_id = ar.id
+                LEFT JOIN albums al ON t.album_id = al.id
                 WHERE t.album_id = ? ORDER BY t.disc_number, t.track_number
             """, (album_id,))
-            return [dict(row) for row in cursor.fetchall()]
+            return self._track_rows(cursor)
 
     def get_tracks_by_album_name(self, album_name: str):
-        with self._db_lock, self._get_db_connection() as conn:
+        with self._get_db_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT t.id, t.filepath, t.title, t.track_number, t.disc_number, t.duration, ar.name as artist_name
+                SELECT t.id, t.filepath, t.title, t.track_number, t.disc_number, t.duration, ar.name as artist_name, al.art_filename
                 FROM tracks t
                 LEFT JOIN artists ar ON t.artist_id = ar.id
                 JOIN albums al ON t.album_id = al.id
                 WHERE al.name = ? ORDER BY t.disc_number, t.track_number
             """, (album_name,))
-            return [dict(row) for row in cursor.fetchall()]
-
-    def search_tracks(self, query: str):
-        with self._db_lock, self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            if not query:
+            return self._track_rows(cursor)
+
+    def search_tracks(self, query: str, limit=SEARCH_RESULTS_LIMIT):
+        """
+        Tracks whose title, artist, album, album artist, genre or composer has
+        a word starting with each word of `query`, best `limit` matches first.
+        An empty query lists the whole library. Without the FTS5 index (or for
+        a query with no searchable words) it falls back to substring matching.
+        """
+        if not query:
+            with self._get_db_connection() as conn:
+                cursor = conn.cursor()
                 cursor.execute(f"""
                     SELECT 
                         t.id, t.filepath, t.title, t.duration,
                         al.name as album_name,
-                        ar.name as artist_name
+                        ar.name as artist_name, al.art_filename
                     FROM {DB_TRACKS_TABLE} t
                     LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
                     LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
-                    ORDER BY ar.name COLLATE NOCASE, al.name COLLATE NOCASE, t.disc_number, t.track_number
+                    ORDER BY {TRACK_LISTING_ORDER}
                 """)
-            else:
-                search_term = f"%{query}%"
-                cursor.execute(f"""
-                    SELECT 
-                        t.id, t.filepath, t.title, t.duration,
-                        al.name as album_name,
-                        ar.name as artist_name
-                    FROM {DB_TRACKS_TABLE} t
-                    LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
-                    LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
-                    WHERE t.title LIKE ?
-                    
-                    UNION
-                    
-                    SELECT 
-                        t.id, t.filepath, t.title, t.duration,
-                        al.name as album_name,
-                        ar.name as artist_name
-                    FROM {DB_TRACKS_TABLE} t
-                    JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
-                    LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
-                    WHERE al.name LIKE ?
+                return self._track_rows(cursor)
 
-                    UNION
-
-                    SELECT 
-                        t.id, t.filepath, t.title, t.duration,
+        match = _fts_match_expression(query)
+        if not (self._search_index and match):
+            return self._search_tracks_like(query, limit)
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT
+                    t.id, t.filepath, t.title, t.duration,
+                    al.name as album_name,
+                    ar.name as artist_name, al.art_filename
+                FROM track_search s
+                JOIN {DB_TRACKS_TABLE} t ON t.id = s.rowid
+                LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                WHERE track_search MATCH ?
+                ORDER BY bm25(track_search, {SEARCH_COLUMN_WEIGHTS})
+                LIMIT ?
+            """, (match, limit))
+            results = self._track_rows(cursor)
+        log.info(f"Search for '{query}' found {len(results)} tracks.")
+        return results
+
+    def get_tracks_page(self, after=None, limit=TRACK_PAGE_SIZE):
+        """
+        One page of the whole library in listing order (artist, album, disc,
+        track). Pass the cursor returned with the previous page as `after`.
+        Returns (tracks, cursor); cursor is None once the last page is read.
+        Each page is a range read on idx_tracks_listing, so it costs the same
+        at the start of the library as at the end.
+        """
+        where, params = "", ()
+        if after is not None:
+            where = f"WHERE ({TRACK_LISTING_ORDER}) > (?, ?, ?, ?, ?)"
+            params = tuple(after)
+        with self._get_db_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT
+                    t.id, t.filepath, t.title, t.duration,
+                    al.name as album_name,
+                    ar.name as artist_name, al.art_filename,
+                    t.artist_sort, t.album_sort, IFNULL(t.disc_number, 0) AS disc_key, IFNULL(t.track_number, 0) AS track_key
+                FROM {DB_TRACKS_TABLE} t
+                LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                {where}
+                ORDER BY {TRACK_LISTING_ORDER}
+                LIMIT ?
+            """, params + (limit,))
+            tracks = self._track_rows(cursor)
+        if len(tracks) < limit:
+            next_cursor = None
+        else:
+            last = tracks[-1]
+            next_cursor = (last['artist_sort'], last['album_sort'], last['disc_key'], last['track_key'], last['id'])
+        for track in tracks:
+            for key in ('artist_sort', 'album_sort', 'disc_key', 'track_key'):
+                del track[key]
+        return tracks, next_cursor
+
+    def get_all_track_filepaths(self):
+        """Every track's path in listing order: the play queue for the All Songs view."""
+        with self._get_db_connection() as conn:
+            cursor = conn.execute(f"SELECT t.filepath FROM {DB_TRACKS_TABLE} t ORDER BY {TRACK_LISTING_ORDER}")
+            return [row[0] for row in cursor]
+
+    def _search_tracks_like(self, query: str, limit=SEARCH_RESULTS_LIMIT):
+        """Substring search over titles, album names and artist names; unranked, at most `limit` tracks."""
+        with self._get_db_connection() as conn:
+            cursor = conn.cursor()
+            search_term = f"%{query}%"
+            cursor.execute(f"""
+                SELECT 
+                    t.id, t.filepath, t.title, t.duration,
+                    al.name as album_name,
+                    ar.name as artist_name, al.art_filename
+                FROM {DB_TRACKS_TABLE} t
+                LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                WHERE t.title LIKE ?
+                
+                UNION
+                
+                SELECT 
+                    t.id, t.filepath, t.title, t.duration,
+                    al.name as album_name,
+                    ar.name as artist_name, al.art_filename
+                FROM {DB_TRACKS_TABLE} t
+                JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                WHERE al.name LIKE ?
+
+                UNION
+
+                SELECT 
+                    t.id, t.filepath, t.title, t.duration,
+                    al.name as album_name,
+                    ar.name as artist_name, al.art_filename
+                FROM {DB_TRACKS_TABLE} t
+                JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                WHERE ar.name LIKE ?
+                LIMIT ?
+            """, (search_term, search_term, search_term, limit))
+            results = self._track_rows(cursor)
+        log.info(f"Search for '{query}' found {len(results)} tracks.")
+        return results
+
+    def _load_fuzzy_entries(self):
+        """(kind, id, name) for every track title, album and artist; feeds the fuzzy index."""
+        with self._get_db_connection() as conn:
+            yield from conn.execute(f"SELECT 'track', id, title FROM {DB_TRACKS_TABLE}")
+            yield from conn.execute(f"SELECT 'album', id, name FROM {DB_ALBUMS_TABLE}")
+            yield from conn.execute(f"SELECT 'artist', id, name FROM {DB_ARTISTS_TABLE}")
+
+    def warm_fuzzy_index(self):
+        """Builds the fuzzy index in the background if it is missing or stale."""
+        self._fuzzy_index.warm()
+
+    def fuzzy_search_tracks(self, query: str, limit=FUZZY_RESULTS_LIMIT):
+        """
+        Typo-tolerant search for when search_tracks finds nothing: tracks whose
+        title, album or artist is similar to `query`, best match first. Album
+        and artist matches bring in their tracks in album order.
+        """
+        matches = self._fuzzy_index.search(query, limit=FUZZY_MATCH_LIMIT)
+        if not matches:
+            return []
+        scores = {'track': {}, 'album': {}, 'artist': {}}
+        for kind, ref_id, score in matches:
+            scores[kind][ref_id] = score
+
+        ranked = []
+        with self._get_db_connection() as conn:
+            for kind, column in (('track', 't.id'), ('album', 't.album_id'), ('artist', 't.artist_id')):
+                ids = scores[kind]
+                if not ids:
+                    continue
+                placeholders = ", ".join("?" * len(ids))
+                cursor = conn.execute(f"""
+                    SELECT
+                        t.id, t.filepath, t.title, t.duration, {column} AS match_id,
                         al.name as album_name,
-                        ar.name as artist_name
+                        ar.name as artist_name, al.art_filename
                     FROM {DB_TRACKS_TABLE} t
-                    JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
                     LEFT JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
-                    WHERE ar.name LIKE ?
-                """, (search_term, search_term, search_term))
-            
-            results = [dict(row) for row in cursor.fetchall()]
-            log.info(f"Search for '{query}' found {len(results)} tracks.")
-            return results
-
-    def get_track_details_by_filepath(self, filepath):
-        with self._db_lock, self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT t.*, al.name as album, ar.name as artist, aa.name as album_artist
-                FROM tracks t
-                LEFT JOIN albums al ON t.album_id = al.id
-                LEFT JOIN artists ar ON t.artist_id = ar.id
-                LEFT JOIN artists aa ON al.artist_id = aa.id
-                WHERE t.filepath = ?
-            """, (filepath,))
-            row = cursor.fetchone()
-            return dict(row) if row else None
+                    LEFT JOIN {DB_ARTISTS_TABLE} ar ON t.artist_id = ar.id
+                    WHERE {column} IN ({placeholders})
+                    ORDER BY al.name COLLATE NOCASE, t.disc_number, t.track_number
+                """, tuple(ids))
+                ranked.extend((ids[track['match_id']], track) for track in self._track_rows(cursor))
+
+        # Stable sort: tracks with equal scores keep their album order.
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        results, seen = [], set()
+        for _, track in ranked:
+            if track['id'] in seen:
+                continue
+            seen.add(track['id'])
+            del track['match_id']
+            results.append(track)
+            if len(results) >= limit:
+                break
+        log.info(f"Fuzzy search for '{query}' found {len(results)} tracks.")
+        return results
+
+    def get_track_summary_by_filepath(self, filepath):
+        """The fields lists and the player show for a track: title, artist, album, duration."""
+        return self._lookup_tracks('filepath', [filepath], summary=True)[0]
+
+    def get_track_details_by_filepath(self, filepath, include_text=False):
+        """Every stored field of a track. Lyrics and comment are only read with `include_text`."""
+        return self._lookup_tracks('filepath', [filepath], include_text=include_text)[0]
+
+    def get_track_summaries_for_filepaths(self, filepaths):
+        """get_track_summary_by_filepath for a whole list (a queue or playlist), in one pass."""
+        return self._lookup_tracks('filepath', filepaths, summary=True)
+
+    def get_track_details_for_filepaths(self, filepaths, include_text=False):
+        """get_track_details_by_filepath for a whole list; None where a path is not in the library."""
+        return self._lookup_tracks('filepath', filepaths, include_text=include_text)
+
+    def get_track_details_for_ids(self, track_ids, include_text=False):
+        """Like get_track_details_for_filepaths, keyed by track id."""
+        return self._lookup_tracks('id', track_ids, include_text=include_text)
+
+    def get_track_cache_stats(self) -> dict:
+        """Size, hit and miss counts of the track lookup cache."""
+        return self._track_cache.stats()
+
+    def _lookup_tracks(self, key_column, keys, summary=False, include_text=False):
+        """
+        One entry per key, in input order, with None for keys not in the
+        library. Each entry is a fresh dict, even for a key that repeats (the
+        same file queued twice).
+        """
+        found = self._get_track_rows(key_column, keys)
+        texts = self._get_track_texts([row['id'] for row in found.values()]) if include_text else {}
+        results = []
+        for key in keys:
+            row = found.get(key)
+            if row is None:
+                results.append(None)
+                continue
+            track = {k: row[k] for k in TRACK_SUMMARY_KEYS} if summary else dict(row)
+            if include_text:
+                track['lyrics'], track['comment'] = texts.get(row['id'], (None, None))
+            results.append(track)
+        return results
+
+    def _get_track_rows(self, key_column, keys):
+        """
+        Detail rows by `key_column` ('filepath' or 'id') as {key: row}. Rows
+        come from the track cache where possible; the rest are read in chunked
+        IN queries and cached. The returned rows are shared: do not modify them.
+        """
+        found, missing = {}, []
+        for key in dict.fromkeys(keys):
+            row = self._track_cache.get(key_column, key)
+            if row is None:
+                missing.append(key)
+            else:
+                found[key] = row
+        if not missing:
+            return found
+        generation = self._track_cache.generation
+        with self._get_db_connection() as conn:
+            for start in range(0, len(missing), BATCH_LOOKUP_CHUNK):
+                chunk = missing[start:start + BATCH_LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(f"""
+                    SELECT {TRACK_DETAIL_COLUMNS}
+                    FROM tracks t
+                    LEFT JOIN albums al ON t.album_id = al.id
+                    LEFT JOIN artists ar ON t.artist_id = ar.id
+                    LEFT JOIN artists aa ON al.artist_id = aa.id
+                    WHERE t.{key_column} IN ({placeholders})
+                """, chunk)
+                for row in self._track_rows(cursor):
+                    found[row[key_column]] = row
+                    self._track_cache.put(row, generation)
+        return found
+
+    def _get_track_texts(self, track_ids):
+        """{track id: (lyrics, comment)} for the tracks that have either."""
+        texts = {}
+        with self._get_db_connection() as conn:
+            for start in range(0, len(track_ids), BATCH_LOOKUP_CHUNK):
+                chunk = track_ids[start:start + BATCH_LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                cursor = conn.execute(f"SELECT track_id, lyrics, comment FROM track_text WHERE track_id IN ({placeholders})", chunk)
+                texts.update((row['track_id'], (row['lyrics'], row['comment'])) for row in cursor)
+        return texts
 
     def get_album_art_path_for_file(self, filepath):
-        details = self.get_track_details_by_filepath(filepath)
-        if not details or not details.get('album_id'): return None
-        
-        with self._db_lock, self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT art_filename FROM albums WHERE id = ?", (details['album_id'],))
-            row = cursor.fetchone()
-            if row and row['art_filename']:
-                art_path = self.art_cache_dir / row['art_filename']
-                return str(art_path) if art_path.exists() else None
-        return None
+        with self._get_db_connection() as conn:
+            row = conn.execute(f"""
+                SELECT al.art_filename FROM {DB_TRACKS_TABLE} t JOIN {DB_ALBUMS_TABLE} al ON t.album_id = al.id
+                WHERE t.filepath = ?
+            """, (filepath,)).fetchone()
+        return self._art_path(row['art_filename']) if row else None
 
     def get_raw_album_art_for_file(self, filepath: str) -> bytes | None:
         if not filepath or not os.path.exists(filepath):
@@ -558,19 +1198,7 @@ class LibraryManager(EventDispatcher):
             meta = mutagen.File(filepath, easy=False)
             if meta is None:
                 return None
-            
-            pictures = []
-            if hasattr(meta, 'pictures') and meta.pictures:
-                pictures = meta.pictures
-            elif 'APIC:' in meta:
-                pictures = [meta['APIC:']]
-            elif meta.tags and any(key.startswith('covr') for key in meta.tags):
-                pictures = [meta.tags.get('covr')[0]]
-
-            if pictures:
-                pic = pictures[0]
-                return pic.data if hasattr(pic, 'data') else bytes(pic)
-                
+            return get_embedded_art_data(meta)
         except Exception as e:
             log.error(f"Failed to extract raw album art from {filepath}: {e}")
         
@@ -598,12 +1226,25 @@ class LibraryManager(EventDispatcher):
 
             audio.save()
             log.info(f"Successfully saved new metadata for {filepath}")
-            self._process_audio_file(filepath)
+            self._process_audio_file(filepath, force=True)
 
         except Exception as e:
             log.error(f"Failed to update metadata for {filepath}: {e}")
             raise MetadataUpdateError(f"Failed to save tags for {os.path.basename(filepath)}.") from e
 
+    def _replace_album_art_for_track(self, filepath, art_data):
+        """Points the track's album at new art. Scans only fill in missing art, so this overwrites."""
+        art_filename, art_hash = save_album_art_thumbnail(art_data, str(self.art_cache_dir), filepath)
+        if not art_filename:
+            return
+        with self._db_lock, self._get_db_connection() as conn:
+            row = conn.execute(f"SELECT album_id FROM {DB_TRACKS_TABLE} WHERE filepath = ?", (filepath,)).fetchone()
+            if not row or row['album_id'] is None:
+                return
+            conn.execute(f"UPDATE {DB_ALBUMS_TABLE} SET art_filename = ?, art_hash = ? WHERE id = ?", (art_filename, art_hash, row['album_id']))
+            conn.commit()
+        self._tracks_changed(filepaths=(), album_ids=[row['album_id']], names_changed=False)
+
     def update_track_album_art(self, track_filepath: str, image_filepath: str):
         if not os.path.exists(track_filepath):
             raise FileNotFoundError(f"Track file not found: {track_filepath}")
@@ -637,19 +1278,103 @@ class LibraryManager(EventDispatcher):
 
             audio.save()
             log.info(f"Successfully updated album art for {track_filepath}")
-            self._process_audio_file(track_filepath)
+            self._process_audio_file(track_filepath, force=True)
+            self._replace_album_art_for_track(track_filepath, art_data)
 
         except Exception as e:
             log.error(f"Failed to update album art for {track_filepath}: {e}", exc_info=True)
             raise MetadataUpdateError(f"Failed to save album art for {os.path.basename(track_filepath)}.") from e
 
 
+    # =========================================================================
+    # Maintenance
+    # =========================================================================
+
+    def _database_bytes(self):
+        return sum(os.path.getsize(f"{self.db_path}{suffix}") for suffix in ("", "-wal")
+                   if os.path.exists(f"{self.db_path}{suffix}"))
+
+    def get_library_stats(self) -> dict:
+        """Row counts and on-disk sizes of the library database and art cache."""
+        with self._get_db_connection() as conn:
+            stats = dict(conn.execute(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM {DB_TRACKS_TABLE}) as tracks,
+                    (SELECT COUNT(*) FROM {DB_ALBUMS_TABLE}) as albums,
+                    (SELECT COUNT(*) FROM {DB_ARTISTS_TABLE}) as artists,
+                    (SELECT COUNT(*) FROM track_text) as tracks_with_text,
+                    (SELECT COALESCE(SUM(duration), 0) FROM {DB_TRACKS_TABLE}) as total_duration,
+                    (SELECT COALESCE(SUM(file_size), 0) FROM {DB_TRACKS_TABLE}) as total_file_bytes
+            """).fetchone())
+            stats['schema_version'] = get_schema_version(conn)
+        thumbnails = [entry.stat().st_size for entry in os.scandir(self.art_cache_dir) if entry.is_file()]
+        stats.update(database_bytes=self._database_bytes(), art_files=len(thumbnails), art_bytes=sum(thumbnails))
+        return stats
+
+    def vacuum(self) -> dict:
+        """
+        Deletes art thumbnails no album uses, then rebuilds the database file to
+        return free pages to the filesystem. Run it while no scan is active.
+        """
+        if self.is_scanning:
+            log.warning("Cannot vacuum while a scan is running.")
+            return {}
+        bytes_before = self._database_bytes()
+        with self._db_lock:
+            conn = self._get_db_connection()
+            used = {row[0] for row in conn.execute(f"SELECT DISTINCT art_filename FROM {DB_ALBUMS_TABLE} WHERE art_filename IS NOT NULL")}
+            removed_art = 0
+            for entry in os.scandir(self.art_cache_dir):
+                if entry.is_file() and entry.name not in used:
+                    try:
+                        os.remove(entry.path)
+                        removed_art += 1
+                    except OSError as e:
+                        log.warning(f"Could not delete unused thumbnail {entry.name}: {e}")
+            self._art_paths.clear()
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.execute("PRAGMA optimize")
+        result = {'bytes_before': bytes_before, 'bytes_after': self._database_bytes(), 'removed_art_files': removed_art}
+        log.info(f"Vacuumed library database: {result}")
+        return result
+
+    def verify(self, check_files=True) -> dict:
+        """
+        Checks the database structure and its references. With `check_files`,
+        also counts tracks whose file is gone. Returns problem counts (0 = fine)
+        plus the integrity check messages.
+        """
+        with self._get_db_connection() as conn:
+            integrity = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+            problems = dict(conn.execute(f"""
+                SELECT
+                    (SELECT COUNT(*) FROM {DB_TRACKS_TABLE} t WHERE t.album_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {DB_ALBUMS_TABLE} al WHERE al.id = t.album_id)) as dangling_album_refs,
+                    (SELECT COUNT(*) FROM {DB_TRACKS_TABLE} t WHERE t.artist_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {DB_ARTISTS_TABLE} ar WHERE ar.id = t.artist_id)) as dangling_artist_refs,
+                    (SELECT COUNT(*) FROM track_text tx WHERE NOT EXISTS (SELECT 1 FROM {DB_TRACKS_TABLE} t WHERE t.id = tx.track_id)) as orphan_text_rows
+            """).fetchone())
+            art_filenames = [row[0] for row in conn.execute(f"SELECT DISTINCT art_filename FROM {DB_ALBUMS_TABLE} WHERE art_filename IS NOT NULL")]
+            filepaths = [row[0] for row in conn.execute(f"SELECT filepath FROM {DB_TRACKS_TABLE}")] if check_files else []
+        problems['integrity_errors'] = 0 if integrity == ['ok'] else len(integrity)
+        problems['missing_art_files'] = sum(1 for name in art_filenames if not (self.art_cache_dir / name).exists())
+        problems['missing_track_files'] = sum(1 for path in filepaths if not os.path.exists(path))
+        problems['integrity_messages'] = [] if integrity == ['ok'] else integrity
+        return problems
+
     def close(self):
-        log.info("LibraryManager is closing.")
-        self.stop_scan()
+        log.info(f"LibraryManager is closing. Track cache: {self._track_cache.stats()}")
+        self.stop_scan(wait_seconds=SCAN_STOP_TIMEOUT_SECONDS)
+        self._db.close_all()
 
-    def on_scan_progress(self, progress, message):
+    def on_scan_progress(self, snapshot):
         pass
 
     def on_scan_finished(self, message):
         pass
+
+    def on_library_changed(self):
+        pass
+
+    def on_tracks_moved(self, moves):
+        """`moves` maps each old filepath to its new one."""
+        pass
@@ -0,0 +1,567 @@
+# dad_player/core/library_watcher.py
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from ctypes import wintypes
+
+from dad_player.constants import SUPPORTED_AUDIO_EXTENSIONS
+from dad_player.utils.file_utils import iter_audio_files
+
+log = logging.getLogger(__name__)
+
+# Events are applied once the folders have been quiet for this long...
+WATCH_DEBOUNCE_SECONDS = 2.0
+# ...or at the latest this long after the first pending event.
+WATCH_MAX_DELAY_SECONDS = 10.0
+# The polling fallback looks for changes this often...
+WATCH_POLL_INTERVAL_SECONDS = 60.0
+# ...and re-stats every file, not only those in changed directories, once every this many polls.
+WATCH_POLL_FULL_EVERY = 10
+
+# Event kinds handed to the watcher's sink. An overflow's path is the watched
+# folder whose events were lost, or None when it could have been any of them.
+EVENT_CHANGED = "changed"
+EVENT_DELETED = "deleted"
+EVENT_OVERFLOW = "overflow"
+
+
+def _is_audio_path(path):
+    return path.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS)
+
+# =============================================================================
+# Polling Backend
+# =============================================================================
+
+class PollingWatcherBackend:
+    """
+    Portable fallback that diffs (size, mtime_ns) snapshots of the folders.
+    Each directory's listing is kept with the directory's mtime and only read
+    again when that mtime moves, so a poll costs one stat per directory. A file
+    rewritten in place leaves its directory's mtime alone; every
+    WATCH_POLL_FULL_EVERY polls all files are stat'ed again to catch those.
+    `poll()` can be called directly to drive it deterministically; `start()`
+    runs it on a background thread every `interval` seconds.
+    """
+
+    def __init__(self, folders, sink, interval=WATCH_POLL_INTERVAL_SECONDS):
+        self.folders = list(folders)
+        self.sink = sink
+        self.interval = interval
+        self._dirs = {}  # dirpath -> (mtime_ns, subdirs, {audio path: (size, mtime_ns)})
+        self._polls = 0
+        self._snapshot = self._take_snapshot(full=True)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def _read_dir(self, path, mtime_ns):
+        subdirs, files = [], {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif _is_audio_path(entry.name) and entry.is_file():
+                        st = entry.stat()
+                        files[entry.path] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+        return mtime_ns, subdirs, files
+
+    def _take_snapshot(self, full=False):
+        dirs, snapshot = {}, {}
+        pending = [folder for folder in self.folders if os.path.isdir(folder)]
+        while pending:
+            path = pending.pop()
+            try:
+                # Stat'ed before listing, so a change made while reading bumps the mtime past the cached one.
+                mtime_ns = os.stat(path).st_mtime_ns
+                listing = self._dirs.get(path)
+                if full or listing is None or listing[0] != mtime_ns:
+                    listing = self._read_dir(path, mtime_ns)
+            except OSError:
+                continue
+            dirs[path] = listing
+            pending.extend(listing[1])
+            snapshot.update(listing[2])
+        self._dirs = dirs
+        return snapshot
+
+    def poll(self) -> int:
+        """Compares the folders against the last snapshot and reports differences."""
+        self._polls += 1
+        current = self._take_snapshot(full=self._polls % WATCH_POLL_FULL_EVERY == 0)
+        events = 0
+        for path, signature in current.items():
+            if self._snapshot.get(path) != signature:
+                self.sink(EVENT_CHANGED, path)
+                events += 1
+        for path in self._snapshot.keys() - current.keys():
+            self.sink(EVENT_DELETED, path)
+            events += 1
+        self._snapshot = current
+        return events
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="library-watcher-poll", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                log.exception("Polling watcher failed to scan the music folders.")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+# =============================================================================
+# Inotify Backend (Linux)
+# =============================================================================
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+               IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcherBackend:
+    """Recursive inotify watches via libc; raises OSError if inotify is unusable."""
+
+    def __init__(self, folders, sink):
+        self.folders = list(folders)
+        self.sink = sink
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._watches = {}
+        self._stop_r, self._stop_w = os.pipe()
+        self._thread = None
+        try:
+            for folder in self.folders:
+                if os.path.isdir(folder):
+                    self._watch_tree(folder)
+        except OSError:
+            self._close_fds()
+            raise
+
+    def _add_watch(self, path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR, errno.EACCES):
+                return
+            raise OSError(err, f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+        self._watches[wd] = path
+
+    def _watch_tree(self, root):
+        self._add_watch(root)
+        for dirpath, dirnames, _ in os.walk(root):
+            for name in dirnames:
+                self._add_watch(os.path.join(dirpath, name))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="library-watcher-inotify", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            readable, _, _ = select.select([self._fd, self._stop_r], [], [])
+            if self._stop_r in readable:
+                break
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                log.exception("Reading inotify events failed; stopping watcher.")
+                break
+            try:
+                self._handle_events(data)
+            except Exception:
+                log.exception("Failed to handle inotify events.")
+        self._close_fds()
+
+    def _handle_events(self, data):
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.sink(EVENT_OVERFLOW, None)
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may already be inside before the watch is in place.
+                    self._watch_tree(path)
+                    for entry in iter_audio_files([path]):
+                        self.sink(EVENT_CHANGED, entry.path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.sink(EVENT_DELETED, path)
+            elif _is_audio_path(path):
+                if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    self.sink(EVENT_CHANGED, path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self.sink(EVENT_DELETED, path)
+
+    def stop(self):
+        if self._thread:
+            os.write(self._stop_w, b"x")
+            self._thread.join(timeout=5)
+            self._thread = None
+        else:
+            self._close_fds()
+
+    def _close_fds(self):
+        for fd in (self._fd, self._stop_r, self._stop_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fd = self._stop_r = self._stop_w = -1
+
+# =============================================================================
+# ReadDirectoryChangesW Backend (Windows)
+# =============================================================================
+
+FILE_LIST_DIRECTORY = 0x0001
+FILE_SHARE_READ_WRITE_DELETE = 0x0007
+OPEN_EXISTING = 3
+FILE_FLAG_BACKUP_SEMANTICS = 0x02000000
+ERROR_OPERATION_ABORTED = 995
+
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x0001
+FILE_NOTIFY_CHANGE_DIR_NAME = 0x0002
+FILE_NOTIFY_CHANGE_SIZE = 0x0008
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x0010
+
+FILE_ACTION_ADDED = 1
+FILE_ACTION_REMOVED = 2
+FILE_ACTION_MODIFIED = 3
+FILE_ACTION_RENAMED_OLD_NAME = 4
+FILE_ACTION_RENAMED_NEW_NAME = 5
+
+_NOTIFY_FILTER = (FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_DIR_NAME |
+                  FILE_NOTIFY_CHANGE_SIZE | FILE_NOTIFY_CHANGE_LAST_WRITE)
+_NOTIFY_HEADER = struct.Struct("<III")
+_NOTIFY_BUFFER_SIZE = 64 * 1024  # The most ReadDirectoryChangesW accepts for network shares.
+
+
+def _load_kernel32():
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                     wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    kernel32.ReadDirectoryChangesW.restype = wintypes.BOOL
+    kernel32.ReadDirectoryChangesW.argtypes = [wintypes.HANDLE, wintypes.LPVOID, wintypes.DWORD, wintypes.BOOL,
+                                               wintypes.DWORD, ctypes.POINTER(wintypes.DWORD),
+                                               wintypes.LPVOID, wintypes.LPVOID]
+    kernel32.CancelIoEx.argtypes = [wintypes.HANDLE, wintypes.LPVOID]
+    kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+    return kernel32
+
+
+class WindowsWatcherBackend:
+    """
+    Recursive ReadDirectoryChangesW watches via kernel32, one blocking reader
+    thread per folder; raises OSError if a folder cannot be opened.
+
+    Windows reports a removed path without saying whether it was a file or a
+    folder, so the folders under each watch are tracked to recognise a
+    deleted or renamed-away folder. `kernel32` stands in for the DLL, e.g. a
+    stub in tests.
+    """
+
+    def __init__(self, folders, sink, kernel32=None):
+        self.folders = [folder for folder in folders if os.path.isdir(folder)]
+        self.sink = sink
+        self._kernel32 = kernel32 or _load_kernel32()
+        self._handles = {}
+        self._dirs = {}
+        self._threads = []
+        self._stopping = False
+        try:
+            for folder in self.folders:
+                self._handles[folder] = self._open_directory(folder)
+                self._dirs[folder] = {dirpath for dirpath, _, _ in os.walk(folder)}
+        except OSError:
+            self._close_handles()
+            raise
+
+    def _open_directory(self, path):
+        handle = self._kernel32.CreateFileW(path, FILE_LIST_DIRECTORY, FILE_SHARE_READ_WRITE_DELETE, None,
+                                            OPEN_EXISTING, FILE_FLAG_BACKUP_SEMANTICS, None)
+        if handle is None or handle == ctypes.c_void_p(-1).value:
+            err = ctypes.get_last_error()
+            raise OSError(err, f"CreateFileW failed for {path}: {ctypes.FormatError(err)}")
+        return handle
+
+    def start(self):
+        self._stopping = False
+        for folder, handle in self._handles.items():
+            thread = threading.Thread(target=self._run, args=(folder, handle),
+                                      name="library-watcher-win32", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self, folder, handle):
+        buffer = ctypes.create_string_buffer(_NOTIFY_BUFFER_SIZE)
+        returned = wintypes.DWORD()
+        while not self._stopping:
+            ok = self._kernel32.ReadDirectoryChangesW(handle, buffer, len(buffer), True, _NOTIFY_FILTER,
+                                                      ctypes.byref(returned), None, None)
+            if not ok:
+                if not self._stopping:
+                    err = ctypes.get_last_error()
+                    if err != ERROR_OPERATION_ABORTED:
+                        log.error(f"Watching {folder} failed: {ctypes.FormatError(err)}; stopping its watch.")
+                break
+            if returned.value == 0:
+                # More changes than fit in the buffer; Windows dropped them all.
+                self.sink(EVENT_OVERFLOW, folder)
+                continue
+            try:
+                self._handle_events(folder, buffer.raw[:returned.value])
+            except Exception:
+                log.exception("Failed to handle directory change events.")
+
+    def _handle_events(self, folder, data):
+        dirs = self._dirs[folder]
+        offset = 0
+        while True:
+            next_offset, action, length = _NOTIFY_HEADER.unpack_from(data, offset)
+            start = offset + _NOTIFY_HEADER.size
+            path = os.path.join(folder, data[start:start + length].decode("utf-16-le"))
+
+            if action in (FILE_ACTION_REMOVED, FILE_ACTION_RENAMED_OLD_NAME):
+                if path in dirs:
+                    prefix = path + os.sep
+                    dirs.difference_update([d for d in dirs if d == path or d.startswith(prefix)])
+                    self.sink(EVENT_DELETED, path)
+                elif _is_audio_path(path):
+                    self.sink(EVENT_DELETED, path)
+            elif os.path.isdir(path):
+                if action != FILE_ACTION_MODIFIED:
+                    # A folder moved in gets no events for the files inside it.
+                    self._add_tree(dirs, path)
+            elif _is_audio_path(path):
+                self.sink(EVENT_CHANGED, path)
+
+            if not next_offset:
+                break
+            offset += next_offset
+
+    def _add_tree(self, dirs, root):
+        for dirpath, _, filenames in os.walk(root):
+            dirs.add(dirpath)
+            for name in filenames:
+                if _is_audio_path(name):
+                    self.sink(EVENT_CHANGED, os.path.join(dirpath, name))
+
+    def stop(self):
+        self._stopping = True
+        for handle in self._handles.values():
+            # Wakes the reader blocked in ReadDirectoryChangesW with ERROR_OPERATION_ABORTED.
+            self._kernel32.CancelIoEx(handle, None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        self._close_handles()
+
+    def _close_handles(self):
+        for handle in self._handles.values():
+            self._kernel32.CloseHandle(handle)
+        self._handles = {}
+
+# =============================================================================
+# LibraryWatcher Class
+# =============================================================================
+
+class LibraryWatcher:
+    """
+    Watches the configured music folders and hands debounced batches of changed
+    and deleted paths to `LibraryManager.apply_file_changes`.
+    """
+
+    def __init__(self, library_manager, settings_manager, debounce_seconds=WATCH_DEBOUNCE_SECONDS,
+                 use_polling=False):
+        self.library_manager = library_manager
+        self.settings_manager = settings_manager
+        self.debounce_seconds = debounce_seconds
+        self.use_polling = use_polling
+        self.backend = None
+        self._pending = {}
+        self._overflowed = set()
+        self._first_event_at = 0.0
+        self._last_event_at = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._flush_thread = None
+
+    def _create_backend(self, folders):
+        native = None
+        if not self.use_polling:
+            if sys.platform.startswith("linux"):
+                native = InotifyWatcherBackend
+            elif sys.platform == "win32":
+                native = WindowsWatcherBackend
+        if native is not None:
+            try:
+                return native(folders, self.record_event)
+            except OSError as e:
+                log.warning(f"{native.__name__} unavailable ({e}); falling back to polling.")
+        return PollingWatcherBackend(folders, self.record_event)
+
+    def start(self):
+        folders = self.settings_manager.get_music_folders()
+        if not folders:
+            log.info("No music folders configured; library watcher not started.")
+            return
+        # Each run gets its own stop event, so a run still setting up when it is
+        # stopped cannot be revived by the next start().
+        self._stop_event = threading.Event()
+        self._flush_thread = threading.Thread(target=self._run, args=(folders, self._stop_event),
+                                              name="library-watcher", daemon=True)
+        self._flush_thread.start()
+
+    def _run(self, folders, stop_event):
+        # Setting up a backend walks the whole library (watch registration, the
+        # polling snapshot), so it happens here rather than on the UI thread.
+        try:
+            backend = self._create_backend(folders)
+            backend.start()
+        except Exception:
+            log.exception("Failed to start the library watcher.")
+            return
+        self.backend = backend
+        log.info(f"Library watcher started ({type(backend).__name__}) on {len(folders)} folder(s).")
+        try:
+            self._flush_loop(stop_event)
+        finally:
+            backend.stop()
+            self.library_manager.release_thread_connection()
+            if self.backend is backend:
+                self.backend = None
+            # Hands on a wake-up this run may have swallowed to the run that replaced it.
+            self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+        if self._flush_thread:
+            self._flush_thread.join(timeout=5)
+            self._flush_thread = None
+
+    def restart(self):
+        self.stop()
+        with self._lock:
+            self._pending.clear()
+            self._overflowed.clear()
+        self.start()
+
+    def record_event(self, kind, path):
+        """Sink for backend events; the last event seen for a path wins."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending and not self._overflowed:
+                self._first_event_at = now
+            if kind == EVENT_OVERFLOW:
+                self._overflowed.add(path)
+            else:
+                self._pending[path] = kind
+            self._last_event_at = now
+        self._wake.set()
+
+    def _seconds_until_flush(self):
+        with self._lock:
+            if not self._pending and not self._overflowed:
+                return None
+            due = min(self._last_event_at + self.debounce_seconds, self._first_event_at + WATCH_MAX_DELAY_SECONDS)
+        return max(0.0, due - time.monotonic())
+
+    def _flush_loop(self, stop_event):
+        while not stop_event.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            delay = self._seconds_until_flush()
+            while delay is not None and not stop_event.is_set():
+                if delay > 0:
+                    stop_event.wait(delay)
+                elif self.flush():
+                    break
+                else:
+                    stop_event.wait(self.debounce_seconds)
+                delay = self._seconds_until_flush()
+
+    def flush(self) -> bool:
+        """Applies pending events now. Returns False if deferred by a running scan."""
+        if self.library_manager.is_scanning:
+            return False
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            overflowed, self._overflowed = self._overflowed, set()
+
+        if overflowed:
+            # The lost events may have been in-place edits, which leave directory
+            # mtimes alone, so the affected folders are rescanned deep.
+            roots = None if None in overflowed else sorted(overflowed)
+            if roots is None:
+                pending = {}
+            else:
+                prefixes = tuple(root.rstrip(os.sep) + os.sep for root in roots)
+                pending = {p: kind for p, kind in pending.items() if p not in overflowed and not p.startswith(prefixes)}
+            log.warning(f"Watcher events were lost; deep-rescanning {roots or 'all music folders'}.")
+            self._apply_events(pending)
+            self.library_manager.start_scan_music_library(force_deep=True, folders=roots)
+            return True
+
+        self._apply_events(pending)
+        return True
+
+    def _apply_events(self, pending):
+        if not pending:
+            return
+        changed = [p for p, kind in pending.items() if kind == EVENT_CHANGED]
+        deleted = [p for p, kind in pending.items() if kind == EVENT_DELETED]
+        log.info(f"Watcher applying {len(changed)} changed and {len(deleted)} deleted path(s).")
+        try:
+            self.library_manager.apply_file_changes(changed, deleted)
+        except Exception:
+            log.exception("Failed to apply watched file changes.")
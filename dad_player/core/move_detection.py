@@ -0,0 +1,40 @@
+# dad_player/core/move_detection.py
+
+import os
+
+from dad_player.utils.file_utils import is_current_fingerprint
+
+# Old paths offered to a worker for one new file; each costs only a string compare.
+MOVE_CANDIDATES_MAX = 8
+
+
+class MoveIndex:
+    """
+    Stored tracks grouped by file size. A file that shows up under a path the
+    library does not know is matched against rows of the same size whose old
+    path no longer exists. The worker then confirms the match by fingerprint,
+    so a moved or renamed file keeps its track row instead of being re-imported.
+    """
+
+    def __init__(self, known_files):
+        self._by_size = {}
+        self._vanished = {}
+        for path, row in known_files.items():
+            if row['file_size'] is not None and is_current_fingerprint(row['filehash']):
+                self._by_size.setdefault(row['file_size'], []).append((path, row['filehash'], row['mtime_ns']))
+
+    def _has_vanished(self, path):
+        vanished = self._vanished.get(path)
+        if vanished is None:
+            vanished = self._vanished[path] = not os.path.lexists(path)
+        return vanished
+
+    def candidates(self, filepath, st) -> tuple:
+        """Returns (old_path, filehash) pairs that `filepath` may have been moved from."""
+        entries = self._by_size.get(st.st_size)
+        if not entries:
+            return ()
+        matches = [entry for entry in entries if entry[0] != filepath and self._has_vanished(entry[0])]
+        # `mv` keeps the modification time, so those rows are the likeliest sources.
+        matches.sort(key=lambda entry: entry[2] != st.st_mtime_ns)
+        return tuple((path, filehash) for path, filehash, _ in matches[:MOVE_CANDIDATES_MAX])
@@ -53,6 +53,7 @@ class PlayerEngine(EventDispatcher):
         self.event_manager = self.player.event_manager()
         self._bind_vlc_events()
         self.settings_manager.bind(on_setting_changed=self._on_setting_changed)
+        self.library_manager.bind(on_tracks_moved=self._on_tracks_moved)
         
         last_volume_fraction = self.settings_manager.get_last_volume()
 
@@ -80,6 +81,23 @@ class PlayerEngine(EventDispatcher):
         elif key == CONFIG_KEY_REPEAT and self.repeat_mode != value:
             self.set_repeat_mode(value)
 
+    def _on_tracks_moved(self, instance, moves):
+        """Follows moved files in the in-memory queue; PlaylistManager rewrites the saved Queue."""
+        if not any(fp in moves for fp in self._playlist):
+            if self.current_media_path in moves:
+                self.current_media_path = self.current_song = moves[self.current_media_path]
+            return
+        self._playlist = [moves.get(fp, fp) for fp in self._playlist]
+        self._shuffled_playlist = [moves.get(fp, fp) for fp in self._shuffled_playlist]
+        metadata = {}
+        for fp, details in self._playlist_metadata.items():
+            new_fp = moves.get(fp, fp)
+            metadata[new_fp] = dict(details, filepath=new_fp) if new_fp != fp and details else details
+        self._playlist_metadata = metadata
+        if self.current_media_path in moves:
+            self.current_media_path = self.current_song = moves[self.current_media_path]
+        self._schedule_dispatch("on_playlist_changed", self.get_current_playlist_details())
+
     def _schedule_dispatch(self, event_name, *args):
         Clock.schedule_once(lambda dt: self.dispatch(event_name, *args), 0)
 
@@ -173,10 +191,8 @@ class PlayerEngine(EventDispatcher):
         self._playlist = [p for p in filepaths if os.path.exists(p)]
         self.playlist_manager.save_queue(self._playlist)
 
-        self._playlist_metadata = {
-            fp: self.library_manager.get_track_details_by_filepath(fp) or {}
-            for fp in self._playlist
-        }
+        summaries = self.library_manager.get_track_summaries_for_filepaths(self._playlist)
+        self._playlist_metadata = {fp: details or {} for fp, details in zip(self._playlist, summaries)}
 
         if self.shuffle_mode:
             self._shuffled_playlist = list(self._playlist)
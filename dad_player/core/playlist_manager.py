@@ -128,6 +128,23 @@ class PlaylistManager(EventDispatcher):
         self.playlists[QUEUE_PLAYLIST_NAME] = filepaths
         self._save_playlists(content_changed_playlist=QUEUE_PLAYLIST_NAME)
 
+    def rewrite_track_paths(self, moves: dict):
+        """
+        Replaces moved filepaths in every playlist, including the Queue and
+        Recents, and saves the file once. `moves` maps old paths to new ones.
+        """
+        changed = []
+        for name, filepaths in self.playlists.items():
+            if any(fp in moves for fp in filepaths):
+                self.playlists[name] = [moves.get(fp, fp) for fp in filepaths]
+                changed.append(name)
+        if not changed:
+            return
+        log.info(f"Updated moved tracks in {len(changed)} playlist(s).")
+        self._save_playlists()
+        for name in changed:
+            self.dispatch('on_playlist_content_changed', name)
+
     def get_tracks_for_playlist(self, playlist_name: str) -> list:
         return self.playlists.get(playlist_name, [])
 
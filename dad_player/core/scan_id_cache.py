@@ -0,0 +1,113 @@
+# dad_player/core/scan_id_cache.py
+
+from dad_player.constants import DB_ALBUMS_TABLE, DB_ARTISTS_TABLE
+
+# SQLite's NOCASE collation only folds the 26 ASCII letters; 'É' and 'é' stay distinct.
+_NOCASE_FOLD = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+
+def nocase_key(name: str) -> str:
+    """Folds a name the way the COLLATE NOCASE columns compare it."""
+    return name.translate(_NOCASE_FOLD)
+
+
+class ScanIdCache:
+    """
+    Artist and album IDs resolved during one scan, so a 15-track album costs a
+    single lookup instead of 15. Only the scan writer thread uses it.
+
+    Albums also remember whether the database already has their year and art.
+    Values found in a batch are queued and written once per album by
+    `flush_album_updates()`, with the same first-value-wins COALESCE semantics
+    as before.
+
+    IDs inserted inside a transaction are staged. `commit()` keeps them once
+    the transaction commits, and `rollback()` forgets them if it fails.
+    """
+
+    def __init__(self):
+        self._artists = {}
+        self._albums = {}
+        self._staged_artists = {}
+        self._staged_albums = {}
+        self._albums_by_id = {}
+        self._album_updates = {}
+
+    def artist_id(self, conn, name):
+        if not name:
+            return None
+        key = nocase_key(name)
+        artist_id = self._artists.get(key) or self._staged_artists.get(key)
+        if artist_id is not None:
+            return artist_id
+        row = conn.execute(f"SELECT id FROM {DB_ARTISTS_TABLE} WHERE name = ?", (name,)).fetchone()
+        if row:
+            self._artists[key] = row['id']
+            return row['id']
+        artist_id = conn.execute(f"INSERT INTO {DB_ARTISTS_TABLE} (name) VALUES (?)", (name,)).lastrowid
+        self._staged_artists[key] = artist_id
+        return artist_id
+
+    def album_id(self, conn, name, artist_id, art_filename=None, art_hash=None, year=None):
+        key = (nocase_key(name), artist_id)
+        entry = self._albums.get(key) or self._staged_albums.get(key)
+        if entry is None:
+            if artist_id is None:
+                row = conn.execute(f"SELECT id, art_filename, year FROM {DB_ALBUMS_TABLE} WHERE name = ? AND artist_id IS NULL", (name,)).fetchone()
+            else:
+                row = conn.execute(f"SELECT id, art_filename, year FROM {DB_ALBUMS_TABLE} WHERE name = ? AND artist_id = ?", (name, artist_id)).fetchone()
+            if row is None:
+                album_id = conn.execute(
+                    f"INSERT INTO {DB_ALBUMS_TABLE} (name, artist_id, art_filename, art_hash, year) VALUES (?, ?, ?, ?, ?)",
+                    (name, artist_id, art_filename, art_hash, year)
+                ).lastrowid
+                entry = [album_id, art_filename is not None, year is not None]
+                self._staged_albums[key] = self._albums_by_id[album_id] = entry
+                return album_id
+            entry = [row['id'], row['art_filename'] is not None, row['year'] is not None]
+            self._albums[key] = self._albums_by_id[row['id']] = entry
+
+        album_id, has_art, has_year = entry
+        if (art_filename and not has_art) or (year is not None and not has_year):
+            pending = self._album_updates.setdefault(album_id, [None, None, None])
+            if art_filename and not has_art and pending[0] is None:
+                pending[0], pending[1] = art_filename, art_hash
+            if year is not None and not has_year and pending[2] is None:
+                pending[2] = year
+        return album_id
+
+    def flush_album_updates(self, conn):
+        """
+        Writes the queued year/art values, one UPDATE per album touched by the
+        batch, and returns the IDs of those albums.
+        """
+        if not self._album_updates:
+            return []
+        # SET expressions all see the old row, so art_hash follows whether art_filename was empty.
+        conn.executemany(
+            f"""UPDATE {DB_ALBUMS_TABLE} SET
+                art_hash = CASE WHEN art_filename IS NULL THEN ? ELSE art_hash END,
+                art_filename = COALESCE(art_filename, ?),
+                year = COALESCE(year, ?)
+            WHERE id = ?""",
+            [(art_hash, art, year, album_id) for album_id, (art, art_hash, year) in self._album_updates.items()]
+        )
+        return list(self._album_updates)
+
+    def commit(self):
+        for album_id, (art, _art_hash, year) in self._album_updates.items():
+            entry = self._albums_by_id[album_id]
+            entry[1] = entry[1] or art is not None
+            entry[2] = entry[2] or year is not None
+        self._artists.update(self._staged_artists)
+        self._albums.update(self._staged_albums)
+        self._staged_artists.clear()
+        self._staged_albums.clear()
+        self._album_updates.clear()
+
+    def rollback(self):
+        for entry in self._staged_albums.values():
+            del self._albums_by_id[entry[0]]
+        self._staged_artists.clear()
+        self._staged_albums.clear()
+        self._album_updates.clear()
@@ -0,0 +1,88 @@
+# dad_player/core/scan_progress.py
+
+import threading
+import time
+
+from kivy.clock import Clock
+
+# Upper bound on how often progress reaches the UI, however fast files are processed.
+SCAN_PROGRESS_MAX_UPDATES_PER_SECOND = 4
+
+
+def format_scan_progress(snapshot) -> str:
+    """One-line description of a progress snapshot for status labels."""
+    text = (
+        f"Scanning: {snapshot['processed']} / {snapshot['discovered']} files "
+        f"({snapshot['added']} added, {snapshot['updated']} updated, "
+        f"{snapshot['skipped']} unchanged, {snapshot['failed']} failed)"
+    )
+    eta = snapshot['eta_seconds']
+    if eta is not None and snapshot['walk_complete']:
+        minutes, seconds = divmod(int(eta), 60)
+        text += f" - about {minutes}:{seconds:02d} left"
+    return text
+
+
+class ScanProgressReporter:
+    """
+    Coalesces scan progress notifications into at most `max_updates_per_second`
+    callbacks on the Kivy main thread.
+
+    Scan threads call `notify()` as often as they like; it only arms a single
+    pending Clock callback. That callback takes one snapshot of the ScanStats
+    when it runs, so the UI always sees current, mutually consistent numbers.
+    """
+
+    def __init__(self, stats, publish, max_updates_per_second=SCAN_PROGRESS_MAX_UPDATES_PER_SECOND):
+        self.stats = stats
+        self.publish = publish
+        self.min_interval = 1.0 / max_updates_per_second
+        self.walk_complete = False
+        self._started_at = time.monotonic()
+        self._last_published_at = 0.0
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+            delay = max(0.0, self._last_published_at + self.min_interval - time.monotonic())
+        Clock.schedule_once(self._publish, delay)
+
+    def finish_walk(self):
+        """Marks discovery as done, so the file total (and the ETA) is final."""
+        self.walk_complete = True
+        self.notify()
+
+    def _publish(self, dt=None):
+        with self._lock:
+            self._scheduled = False
+            self._last_published_at = time.monotonic()
+        self.publish(self.snapshot())
+
+    def snapshot(self) -> dict:
+        counts = self.stats.snapshot()
+        processed = sum(counts[f] for f in self.stats.OUTCOMES)
+        discovered = counts['checked']
+        elapsed = time.monotonic() - self._started_at
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        remaining = max(0, discovered - processed)
+        snapshot = {
+            'discovered': discovered,
+            'processed': processed,
+            'added': counts['added'],
+            'updated': counts['updated'],
+            'moved': counts['moved'],
+            'skipped': sum(counts[f] for f in ('dir_skipped', 'fast_skipped', 'hash_skipped', 'checkpoint_skipped')),
+            'failed': counts['failed'],
+            'bytes_scanned': counts['bytes_scanned'],
+            'elapsed_seconds': elapsed,
+            'files_per_second': rate,
+            'eta_seconds': remaining / rate if rate > 0 else None,
+            'walk_complete': self.walk_complete,
+            'progress': processed / discovered if discovered else 0.0,
+        }
+        snapshot['message'] = format_scan_progress(snapshot)
+        return snapshot
@@ -0,0 +1,70 @@
+# dad_player/core/scan_stats.py
+
+import threading
+
+
+class ScanStats:
+    """
+    Thread-safe counters describing the outcome of a library scan. A full scan
+    also attaches a ScanTelemetry as `telemetry` to collect per-file timings.
+    """
+
+    FIELDS = (
+        'checked',        # Audio files looked at during the scan
+        'dir_skipped',    # In a directory whose entries are unchanged, so never stat'ed
+        'fast_skipped',   # Unchanged according to the stored (size, mtime_ns, inode) record
+        'checkpoint_skipped', # Already written by an interrupted scan that is being resumed
+        'hash_skipped',   # Legacy row whose full-file hash still matched; only the stat record was refreshed
+        'moved',          # Known track found under a new path; its row was re-pointed
+        'added',
+        'updated',
+        'failed',
+        'bytes_scanned',  # Total size of the files handed to the workers; parsers read only part of most files
+    )
+    # Fields that each record the final outcome of one checked file.
+    OUTCOMES = ('dir_skipped', 'fast_skipped', 'checkpoint_skipped', 'hash_skipped', 'moved', 'added', 'updated', 'failed')
+
+    def __init__(self, telemetry=None):
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self.failed_paths = []
+        self.moves = []
+
+    def increment(self, field, amount=1):
+        with self._lock:
+            self._counts[field] += amount
+
+    def fail(self, filepath):
+        """Counts a failed file and remembers its path."""
+        with self._lock:
+            self._counts['failed'] += 1
+            self.failed_paths.append(filepath)
+
+    def record_move(self, old_path, new_path):
+        """Counts a moved track and remembers the (old_path, new_path) pair."""
+        with self._lock:
+            self._counts['moved'] += 1
+            self.moves.append((old_path, new_path))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counts)
+
+    def processed(self) -> int:
+        """Number of checked files whose outcome is already known."""
+        with self._lock:
+            return sum(self._counts[f] for f in self.OUTCOMES)
+
+    def summary(self) -> str:
+        counts = self.snapshot()
+        text = (
+            f"{counts['checked']} checked, {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['moved']} moved, "
+            f"{counts['dir_skipped'] + counts['fast_skipped'] + counts['hash_skipped']} unchanged "
+            f"({counts['dir_skipped']} in unchanged folders, {counts['fast_skipped']} via fast path), "
+            f"{counts['failed']} failed"
+        )
+        if counts['checkpoint_skipped']:
+            text += f", {counts['checkpoint_skipped']} done before resuming"
+        return text
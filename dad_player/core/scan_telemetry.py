@@ -0,0 +1,129 @@
+# dad_player/core/scan_telemetry.py
+
+import heapq
+import os
+import threading
+
+# Per-file stages, in pipeline order. 'db' is the file's share of its batch transaction.
+STAGES = ('stat', 'hash', 'parse', 'art', 'db')
+# Upper bounds (ms) of the histogram buckets; a final bucket holds everything slower.
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+SLOWEST_FILES = 20
+# Folders listed in the report, slowest first; the rest only count towards the totals.
+REPORT_MAX_FOLDERS = 100
+
+
+def _empty_stage_totals():
+    return dict.fromkeys(STAGES, 0.0)
+
+
+class ScanTelemetry:
+    """
+    Per-file stage timings collected during one scan.
+
+    `record()` is called once per file that was at least stat'ed, from the walk
+    thread (fast-path skips) and the scan writer (everything else). Only
+    aggregates and the slowest `slowest` files are kept, so memory does not
+    grow with the library size. `report()` returns a JSON-ready dict.
+    """
+
+    def __init__(self, slowest=SLOWEST_FILES):
+        self._lock = threading.Lock()
+        self._slowest_max = slowest
+        self._slowest = []  # min-heap of (total, sequence, entry)
+        self._sequence = 0
+        self._stage_counts = dict.fromkeys(STAGES, 0)
+        self._stage_totals = _empty_stage_totals()
+        self._stage_max = _empty_stage_totals()
+        self._histograms = {stage: [0] * (len(HISTOGRAM_BOUNDS_MS) + 1) for stage in STAGES}
+        self._by_format = {}
+        self._by_folder = {}
+        self.files = 0
+
+    def record(self, filepath, timings, outcome):
+        """`timings` maps stage names to seconds; stages a file never reached are left out."""
+        total = sum(timings.values())
+        fmt = os.path.splitext(filepath)[1].lower().lstrip('.') or '(none)'
+        folder = os.path.dirname(filepath)
+        with self._lock:
+            self.files += 1
+            for stage, seconds in timings.items():
+                self._stage_counts[stage] += 1
+                self._stage_totals[stage] += seconds
+                if seconds > self._stage_max[stage]:
+                    self._stage_max[stage] = seconds
+                self._histograms[stage][self._bucket(seconds)] += 1
+            for key, groups in ((fmt, self._by_format), (folder, self._by_folder)):
+                group = groups.get(key)
+                if group is None:
+                    group = groups[key] = {'files': 0, 'total': 0.0, 'stages': _empty_stage_totals()}
+                group['files'] += 1
+                group['total'] += total
+                for stage, seconds in timings.items():
+                    group['stages'][stage] += seconds
+
+            self._sequence += 1
+            if len(self._slowest) < self._slowest_max or total > self._slowest[0][0]:
+                entry = {'filepath': filepath, 'outcome': outcome, 'timings': timings}
+                item = (total, self._sequence, entry)
+                if len(self._slowest) < self._slowest_max:
+                    heapq.heappush(self._slowest, item)
+                else:
+                    heapq.heapreplace(self._slowest, item)
+
+    @staticmethod
+    def _bucket(seconds):
+        ms = seconds * 1000
+        for i, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if ms < bound:
+                return i
+        return len(HISTOGRAM_BOUNDS_MS)
+
+    @staticmethod
+    def _group_report(group):
+        return {
+            'files': group['files'],
+            'total_seconds': round(group['total'], 4),
+            'stage_seconds': {stage: round(seconds, 4) for stage, seconds in group['stages'].items()},
+        }
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {}
+            for stage in STAGES:
+                count = self._stage_counts[stage]
+                buckets = [{'lt_ms': bound, 'files': n} for bound, n in zip(HISTOGRAM_BOUNDS_MS, self._histograms[stage])]
+                buckets.append({'lt_ms': None, 'files': self._histograms[stage][-1]})
+                stages[stage] = {
+                    'files': count,
+                    'total_seconds': round(self._stage_totals[stage], 4),
+                    'mean_ms': round(self._stage_totals[stage] * 1000 / count, 3) if count else None,
+                    'max_ms': round(self._stage_max[stage] * 1000, 3),
+                    'histogram': buckets,
+                }
+            folders = sorted(self._by_folder.items(), key=lambda item: item[1]['total'], reverse=True)
+            slowest = [
+                dict(entry, total_ms=round(total * 1000, 3),
+                     timings={stage: round(entry['timings'][stage] * 1000, 3) for stage in STAGES if stage in entry['timings']})
+                for total, _, entry in sorted(self._slowest, reverse=True)
+            ]
+            return {
+                'files': self.files,
+                'stages': stages,
+                'by_format': {fmt: self._group_report(group) for fmt, group in sorted(self._by_format.items())},
+                'folders': len(self._by_folder),
+                'by_folder': {folder: self._group_report(group) for folder, group in folders[:REPORT_MAX_FOLDERS]},
+                'slowest_files': slowest,
+            }
+
+
+def format_telemetry_summary(report, slowest=5) -> str:
+    """A few lines for logs and the CLI: time per stage, then the slowest files (times in ms)."""
+    stages = ", ".join(
+        f"{stage} {data['total_seconds']:.2f} s" for stage, data in report['stages'].items() if data['files']
+    )
+    lines = [f"Scan time by stage over {report['files']} files: {stages or 'nothing recorded'}"]
+    for entry in report['slowest_files'][:slowest]:
+        parts = " ".join(f"{stage}={ms:.0f}" for stage, ms in entry['timings'].items())
+        lines.append(f"  {entry['total_ms']:8.0f} ms  {entry['filepath']}  ({parts})")
+    return "\n".join(lines)
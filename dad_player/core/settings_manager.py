@@ -12,7 +12,11 @@ from dad_player.constants import (
     CONFIG_KEY_MUSIC_FOLDERS,
     CONFIG_KEY_REPLAYGAIN,
     CONFIG_KEY_REPEAT,
+    CONFIG_KEY_SCAN_DEEP_CHECK,
+    CONFIG_KEY_SCAN_USE_PROCESSES,
+    CONFIG_KEY_SCAN_WORKERS,
     CONFIG_KEY_SHUFFLE,
+    CONFIG_KEY_WATCH_FOLDERS,
     REPEAT_NONE,
     SETTINGS_FILE,
 )
@@ -25,9 +29,9 @@ class SettingsManager(EventDispatcher):
     """Manages loading, saving, and accessing all application settings."""
     __events__ = ('on_setting_changed',)
 
-    def __init__(self):
+    def __init__(self, data_dir=None):
         super().__init__()
-        self.user_data_dir = get_user_data_dir_for_app()
+        self.user_data_dir = data_dir or get_user_data_dir_for_app()
         self.settings_path = os.path.join(self.user_data_dir, SETTINGS_FILE)
         self.store = JsonStore(self.settings_path)
         self._defaults = {
@@ -38,6 +42,10 @@ class SettingsManager(EventDispatcher):
             CONFIG_KEY_LAST_VOLUME: 0.75,
             CONFIG_KEY_REPLAYGAIN: False,
             CONFIG_KEY_CONSOLIDATE_ALBUMS: False,
+            CONFIG_KEY_SCAN_WORKERS: 0,
+            CONFIG_KEY_SCAN_USE_PROCESSES: False,
+            CONFIG_KEY_SCAN_DEEP_CHECK: False,
+            CONFIG_KEY_WATCH_FOLDERS: True,
         }
         self._load_settings()
 
@@ -128,5 +136,29 @@ class SettingsManager(EventDispatcher):
     def set_consolidate_albums(self, value: bool):
         self.put(CONFIG_KEY_CONSOLIDATE_ALBUMS, bool(value))
 
+    def get_scan_workers(self) -> int:
+        return int(self.get(CONFIG_KEY_SCAN_WORKERS) or 0)
+
+    def set_scan_workers(self, value: int):
+        self.put(CONFIG_KEY_SCAN_WORKERS, max(0, int(value)))
+
+    def get_scan_use_processes(self) -> bool:
+        return self.get(CONFIG_KEY_SCAN_USE_PROCESSES)
+
+    def set_scan_use_processes(self, value: bool):
+        self.put(CONFIG_KEY_SCAN_USE_PROCESSES, bool(value))
+
+    def get_scan_deep_check(self) -> bool:
+        return self.get(CONFIG_KEY_SCAN_DEEP_CHECK)
+
+    def set_scan_deep_check(self, value: bool):
+        self.put(CONFIG_KEY_SCAN_DEEP_CHECK, bool(value))
+
+    def get_watch_folders(self) -> bool:
+        return self.get(CONFIG_KEY_WATCH_FOLDERS)
+
+    def set_watch_folders(self, value: bool):
+        self.put(CONFIG_KEY_WATCH_FOLDERS, bool(value))
+
     def on_setting_changed(self, key, value):
         pass
@@ -0,0 +1,101 @@
+# dad_player/core/track_cache.py
+
+import os
+import threading
+from collections import OrderedDict
+
+# Tracks kept; enough for a long queue plus the playlist on screen.
+TRACK_CACHE_SIZE = 5000
+
+
+class TrackCache:
+    """
+    Bounded LRU of track rows, reachable by filepath and by track id, so the
+    tracks the UI asks for over and over (the current song, the queue, the
+    open playlist) are read from SQLite once.
+
+    LibraryManager drops entries whenever it changes the rows behind them:
+    by path for rescanned, moved and deleted files, by album when an album's
+    art changes, and everything for bulk deletes. A read that started before
+    an invalidation could return the old row, so `put()` takes the
+    `generation` seen before the read and ignores the row if anything was
+    invalidated since. Cached rows are shared: callers get copies.
+    """
+
+    def __init__(self, capacity=TRACK_CACHE_SIZE):
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        self._rows = OrderedDict()  # filepath -> row, least recently used first
+        self._paths_by_id = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key_column, key):
+        """The cached row for a 'filepath' or 'id' key, or None (counted as a miss)."""
+        with self._lock:
+            path = key if key_column == 'filepath' else self._paths_by_id.get(key)
+            row = self._rows.get(path) if path is not None else None
+            if row is None:
+                self.misses += 1
+                return None
+            self._rows.move_to_end(path)
+            self.hits += 1
+            return row
+
+    def put(self, row, generation):
+        with self._lock:
+            if generation != self.generation:
+                return
+            path = row['filepath']
+            old = self._rows.pop(path, None)
+            if old is not None:
+                self._paths_by_id.pop(old['id'], None)
+            self._rows[path] = row
+            self._paths_by_id[row['id']] = path
+            while len(self._rows) > self.capacity:
+                _, evicted = self._rows.popitem(last=False)
+                self._paths_by_id.pop(evicted['id'], None)
+
+    def _drop(self, paths):
+        # Caller holds the lock.
+        self.generation += 1
+        for path in paths:
+            row = self._rows.pop(path, None)
+            if row is not None:
+                self._paths_by_id.pop(row['id'], None)
+                self.invalidations += 1
+
+    def invalidate_paths(self, paths):
+        with self._lock:
+            self._drop([path for path in paths if path in self._rows])
+
+    def invalidate_below(self, prefixes):
+        """Drops tracks at or below any of the given paths (deleted files or folders)."""
+        folders = tuple(prefix.rstrip(os.sep) + os.sep for prefix in prefixes)
+        exact = set(prefixes)
+        with self._lock:
+            self._drop([path for path in self._rows if path in exact or path.startswith(folders)])
+
+    def invalidate_albums(self, album_ids):
+        """Drops the tracks of albums whose own columns (art, year) changed."""
+        album_ids = set(album_ids)
+        with self._lock:
+            self._drop([path for path, row in self._rows.items() if row.get('album_id') in album_ids])
+
+    def clear(self):
+        with self._lock:
+            self._drop(list(self._rows))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._rows),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'invalidations': self.invalidations,
+            }
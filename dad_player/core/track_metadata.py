@@ -0,0 +1,225 @@
+# dad_player/core/track_metadata.py
+#
+# Tag parsing and album art extraction for the library scanner. This module must
+# stay free of Kivy imports: its functions run inside the scan worker pool, which
+# may be a process pool.
+
+import hashlib
+import io
+import logging
+import os
+import time
+from pathlib import Path
+import mutagen
+
+try:
+    from PIL import Image as PILImage
+except ImportError:
+    PILImage = None
+
+from dad_player.constants import ALBUM_ART_THUMBNAIL_SIZE
+from dad_player.utils.file_utils import (
+    generate_file_fingerprint, generate_file_hash, is_current_fingerprint
+)
+
+log = logging.getLogger(__name__)
+
+# =============================================================================
+# Helper Functions
+# =============================================================================
+
+def _get_tag_values(meta, key_list):
+    if not meta:
+        return []
+    values = []
+    for key in key_list:
+        try:
+            raw_val = meta.get(key)
+            if not raw_val:
+                continue
+            potential_values = raw_val if isinstance(raw_val, list) else [raw_val]
+            for item in potential_values:
+                if hasattr(item, 'text') and item.text:
+                    text_val = item.text if isinstance(item.text, list) else [item.text]
+                    values.extend(str(t) for t in text_val)
+                elif not hasattr(item, 'text'):
+                    values.append(str(item))
+        except (KeyError, ValueError):
+            continue
+    return values
+
+def _safe_convert(value, target_type, split_char=None):
+    if not value:
+        return None
+    try:
+        s_val = str(value)
+        if split_char:
+            s_val = s_val.split(split_char)[0]
+        return target_type(s_val)
+    except (ValueError, IndexError):
+        return None
+
+def get_embedded_art_data(meta) -> bytes | None:
+    """Returns the raw bytes of the first embedded picture, if any."""
+    pictures = None
+    if hasattr(meta, 'pictures') and meta.pictures:
+        pictures = meta.pictures
+    elif 'APIC:' in meta:
+        pictures = [meta['APIC:']]
+    elif meta.tags and any(key.startswith('covr') for key in meta.tags.keys()):
+        pictures = [meta.tags.get('covr')[0]]
+
+    if not pictures:
+        return None
+    pic = pictures[0]
+    return pic.data if hasattr(pic, 'data') else bytes(pic)
+
+# =============================================================================
+# Extraction
+# =============================================================================
+
+def read_track_tags(meta, filepath) -> dict:
+    """Maps a mutagen object onto the column values stored for a track."""
+    titles = _get_tag_values(meta, ['TIT2', 'title', '©nam'])
+    albums = _get_tag_values(meta, ['TALB', 'album', '©alb'])
+    track_artists = _get_tag_values(meta, ['TPE1', 'artist', '©ART'])
+    track_artist_name = ', '.join(track_artists) if track_artists else 'Unknown Artist'
+    album_artists = _get_tag_values(meta, ['TPE2', 'albumartist', 'aART'])
+    composers = _get_tag_values(meta, ['TCOM', 'composer', '©wrt'])
+    bpm_vals = _get_tag_values(meta, ['TBPM', 'bpm'])
+    comment_vals = _get_tag_values(meta, ['COMM', 'comment', '©cmt'])
+    lyrics_vals = _get_tag_values(meta, ['USLT', 'lyrics', '©lyr'])
+    publisher_vals = _get_tag_values(meta, ['TPUB', 'publisher'])
+    copyright_vals = _get_tag_values(meta, ['TCOP', 'copyright', 'cprt'])
+    years = _get_tag_values(meta, ['TYER', 'TDAT', 'TDRC', 'date', '©day'])
+    genres = _get_tag_values(meta, ['TCON', 'genre', '©gen'])
+    track_numbers = _get_tag_values(meta, ['TRCK', 'tracknumber', '©trk'])
+    disc_numbers = _get_tag_values(meta, ['TPOS', 'discnumber', '©dsk'])
+    info = meta.info
+
+    return {
+        'title': titles[0] if titles else Path(filepath).stem,
+        'album_name': albums[0] if albums else 'Unknown Album',
+        'track_artist_name': track_artist_name,
+        'album_artist_name': ', '.join(album_artists) if album_artists else track_artist_name,
+        'composer': ', '.join(composers) if composers else None,
+        'bpm': _safe_convert(bpm_vals[0] if bpm_vals else None, float),
+        'comment': '\n'.join(comment_vals) if comment_vals else None,
+        'lyrics': '\n'.join(lyrics_vals) if lyrics_vals else None,
+        'publisher': ', '.join(publisher_vals) if publisher_vals else None,
+        'copyright': ', '.join(copyright_vals) if copyright_vals else None,
+        'year': _safe_convert(years[0][:4] if years and years[0] else None, int),
+        'genre': genres[0] if genres else None,
+        'track_number': _safe_convert(track_numbers[0] if track_numbers else None, int, split_char='/'),
+        'disc_number': _safe_convert(disc_numbers[0] if disc_numbers else None, int, split_char='/'),
+        'duration': info.length if hasattr(info, 'length') else 0,
+        'bitrate': int(info.bitrate / 1000) if hasattr(info, 'bitrate') and info.bitrate else None,
+        'samplerate': int(info.sample_rate) if hasattr(info, 'sample_rate') and info.sample_rate else None,
+    }
+
+def album_art_hash(art_data) -> str:
+    """Content address of an embedded picture; identical covers share one thumbnail."""
+    return hashlib.blake2b(art_data, digest_size=16).hexdigest()
+
+def save_album_art_thumbnail(art_data, art_cache_dir, filepath=''):
+    """
+    Stores a JPEG thumbnail for the picture under `<art hash>.jpg` and returns
+    (filename, art_hash). If that hash already has a thumbnail, the picture is
+    not decoded again. Returns (None, None) on failure.
+    """
+    art_hash = album_art_hash(art_data)
+    filename = f"{art_hash}.jpg"
+    art_path = Path(art_cache_dir) / filename
+    if art_path.exists():
+        return filename, art_hash
+    if PILImage is None:
+        log.warning("PIL not available, skipping album art extraction.")
+        return None, None
+    try:
+        with io.BytesIO(art_data) as img_io:
+            img = PILImage.open(img_io)
+            if isinstance(ALBUM_ART_THUMBNAIL_SIZE, int):
+                thumbnail_size = (ALBUM_ART_THUMBNAIL_SIZE, ALBUM_ART_THUMBNAIL_SIZE)
+            else:
+                thumbnail_size = ALBUM_ART_THUMBNAIL_SIZE
+            img.thumbnail(thumbnail_size, PILImage.LANCZOS)
+            thumbnail_stream = io.BytesIO()
+            img.save(thumbnail_stream, format='JPEG', quality=85)
+
+        # Several workers may write the same picture at once; publish atomically.
+        tmp_path = art_path.with_name(f"{filename}.{os.getpid()}.{id(thumbnail_stream)}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(thumbnail_stream.getvalue())
+        os.replace(tmp_path, art_path)
+
+        if os.path.exists(art_path):
+            return filename, art_hash
+        log.error(f"FAILURE: Thumbnail file was NOT created at {art_path}.")
+        return None, None
+    except Exception as e:
+        log.error(f"Pillow failed to process album art for {os.path.basename(filepath)}: {e}", exc_info=True)
+        return None, None
+
+def extract_track_record(filepath, stat_record, stored_hash, art_cache_dir, force=False, move_candidates=()) -> dict:
+    """
+    Hashes and parses one audio file. Runs inside the scan worker pool, so it
+    never touches the database; the scan writer applies the returned record.
+
+    `stat_record` is the (size, mtime_ns, inode, mtime) tuple taken by the
+    caller, whose stat record no longer matches the stored one. The sampled
+    fingerprint cannot see a tag edit that keeps the file size (a FLAC title
+    change rewritten into padding), so such a file is always parsed again;
+    only a legacy full-file MD5 row that still matches is 'hash_skipped'.
+    `move_candidates` holds (old_path, filehash) pairs of vanished tracks; if
+    the fingerprint matches one, the file is not parsed and the record carries
+    'moved_from'. The record's 'status' is 'hash_skipped',
+    'moved', 'parsed' or 'failed'; 'filehash' always holds the current-version
+    fingerprint. 'timings' holds the seconds spent per stage (hash, parse, art).
+    """
+    timings = {}
+    record = {'filepath': filepath, 'stat': stat_record, 'status': 'failed', 'timings': timings}
+    started = time.perf_counter()
+    file_hash = generate_file_fingerprint(filepath)
+    record['filehash'] = file_hash
+    unchanged = False
+    if not force and stored_hash and file_hash and not is_current_fingerprint(stored_hash):
+        # Legacy full-file MD5 row: verify it once, then the new fingerprint replaces it.
+        unchanged = generate_file_hash(filepath) == stored_hash
+    timings['hash'] = time.perf_counter() - started
+    if unchanged:
+        record['status'] = 'hash_skipped'
+        return record
+    if not force and file_hash:
+        for old_path, old_hash in move_candidates:
+            if old_hash == file_hash:
+                record['status'] = 'moved'
+                record['moved_from'] = old_path
+                return record
+
+    started = time.perf_counter()
+    try:
+        meta = mutagen.File(filepath, easy=False)
+        if meta is None:
+            log.warning(f"SKIPPED: Could not load metadata for: {os.path.basename(filepath)}")
+            return record
+    except Exception as e:
+        log.warning(f"SKIPPED: Failed to read metadata for {os.path.basename(filepath)} due to error: {e}")
+        return record
+    finally:
+        timings['parse'] = time.perf_counter() - started
+
+    tags = read_track_tags(meta, filepath)
+    timings['parse'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    art_filename = art_hash = None
+    art_data = get_embedded_art_data(meta)
+    if art_data:
+        art_filename, art_hash = save_album_art_thumbnail(art_data, art_cache_dir, filepath)
+    timings['art'] = time.perf_counter() - started
+
+    record.update(tags)
+    record['art_filename'] = art_filename
+    record['art_hash'] = art_hash
+    record['status'] = 'parsed'
+    return record
@@ -46,15 +46,19 @@ class LibraryView(MDBoxLayout):
         self._placeholder_art = get_placeholder_album_art_path()
         self._navigation_stack = []
         self._last_search_results = []
+        self._songs_cursor = None
+        self._loading_songs_page = False
         self.bind(current_view_mode=self.on_view_mode_change)
         Clock.schedule_once(self._post_init)
 
     def _post_init(self, dt):
         self.library_manager.bind(
             on_scan_progress=self._on_scan_progress,
-            on_scan_finished=self._on_scan_finished
+            on_scan_finished=self._on_scan_finished,
+            on_library_changed=self._on_library_changed
         )
         Window.bind(on_resize=self._on_window_resize)
+        self.ids.library_rv.bind(scroll_y=self._on_library_scroll)
         self._update_layout_mode()
         self.navigate_to_all_albums()
 
@@ -74,15 +78,21 @@ class LibraryView(MDBoxLayout):
     def _update_layout_mode(self):
         self.is_wide = Window.width > dp(600)
 
-    def _on_scan_progress(self, instance, progress, message):
-        self.progress_value = progress
-        self.scan_progress_message = message
+    def _on_scan_progress(self, instance, snapshot):
+        # Scans started elsewhere (settings, watcher overflow) should show progress too.
+        self.is_scanning = True
+        self.progress_value = snapshot['progress']
+        self.scan_progress_message = snapshot['message']
 
     def _on_scan_finished(self, instance, message):
         self.is_scanning = False
         self.scan_progress_message = message
         self.refresh_current_view()
 
+    def _on_library_changed(self, instance):
+        if not self.is_scanning:
+            self.refresh_current_view()
+
     def refresh_current_view(self, dt=None):
         log.debug(f"Refreshing library view for mode: {self.current_view_mode}")
         self.load_current_view()
@@ -127,18 +137,9 @@ class LibraryView(MDBoxLayout):
             self.display_path_text = "All Songs"
             self.album_art_path = ""
             self.album_artist = ""
-            all_songs = self.library_manager.search_tracks('')
-            self._last_search_results = all_songs
-            data = [{
-                'text': t.get('title', 'Unknown Title'),
-                'secondary_text': f"{t.get('artist_name', 'Unknown Artist')} - {t.get('album_name', 'Unknown Album')}",
-                'tertiary_text': format_duration(t.get('duration', 0)),
-                'art_path': self.library_manager.get_album_art_path_for_file(t['filepath']) or self._placeholder_art,
-                'filepath': t['filepath'],
-                'on_press_callback': lambda t=t: self.on_song_selected(t['id'], t['filepath']),
-                **data_map
-            } for t in all_songs]
-            self._update_rv('all_songs', data)
+            # Only the first page is read here; _on_library_scroll fetches the rest as the list nears its end.
+            tracks, self._songs_cursor = self.library_manager.get_tracks_page()
+            self._update_rv('all_songs', [self._song_item(t) for t in tracks])
 
         elif self.current_view_mode == "albums_for_artist":
             artist_id = self.current_args['artist_id']
@@ -171,7 +172,7 @@ class LibraryView(MDBoxLayout):
                 tracks = self.library_manager.get_tracks_by_album(album_id)
 
             if tracks:
-                self.album_art_path = self.library_manager.get_album_art_path_for_file(tracks[0]['filepath']) or self._placeholder_art
+                self.album_art_path = tracks[0].get('art_path') or self._placeholder_art
                 self.album_artist = tracks[0].get('artist_name', 'Unknown Artist')
             else:
                 self.album_art_path = self._placeholder_art
@@ -180,7 +181,7 @@ class LibraryView(MDBoxLayout):
                 'text': t.get('title', 'Unknown Title'),
                 'secondary_text': t.get('artist_name', 'Unknown Artist'),
                 'tertiary_text': format_duration(t.get('duration', 0)),
-                'art_path': self.library_manager.get_album_art_path_for_file(t['filepath']) or self._placeholder_art,
+                'art_path': t.get('art_path') or self._placeholder_art,
                 'filepath': t['filepath'],
                 'on_press_callback': lambda t=t: self.on_song_selected(t['id'], t['filepath']),
                 **data_map
@@ -195,12 +196,17 @@ class LibraryView(MDBoxLayout):
             self.album_art_path = ""
             self.album_artist = ""
             results = self.library_manager.search_tracks(query)
+            if not results:
+                # Nothing starts with what was typed; offer names that are close (typos, missing accents).
+                results = self.library_manager.fuzzy_search_tracks(query)
+                if results:
+                    self.display_path_text = f"No exact results for '{query}', showing similar"
             self._last_search_results = results
             data = [{
                 'text': t.get('title', 'Unknown Title'),
                 'secondary_text': f"{t.get('artist_name', 'Unknown Artist')} - {t.get('album_name', 'Unknown Album')}",
                 'tertiary_text': format_duration(t.get('duration', 0)),
-                'art_path': self.library_manager.get_album_art_path_for_file(t['filepath']) or self._placeholder_art,
+                'art_path': t.get('art_path') or self._placeholder_art,
                 'filepath': t['filepath'],
                 'on_press_callback': lambda t=t: self.on_song_selected(t['id'], t['filepath']),
                 **data_map
@@ -216,6 +222,42 @@ class LibraryView(MDBoxLayout):
 
             self._update_rv('search_results', data)
 
+    def _song_item(self, t):
+        return {
+            'text': t.get('title', 'Unknown Title'),
+            'secondary_text': f"{t.get('artist_name', 'Unknown Artist')} - {t.get('album_name', 'Unknown Album')}",
+            'tertiary_text': format_duration(t.get('duration', 0)),
+            'art_path': t.get('art_path') or self._placeholder_art,
+            'filepath': t['filepath'],
+            'on_press_callback': lambda t=t: self.on_song_selected(t['id'], t['filepath']),
+            'on_context_menu_callback': self.show_song_context_menu,
+        }
+
+    def _on_library_scroll(self, rv, scroll_y):
+        if self.current_view_mode != "all_songs" or self._songs_cursor is None or self._loading_songs_page:
+            return
+        # scroll_y runs from 1 at the top to 0 at the bottom; fetch once less than a screen is left below.
+        hidden = self.ids.rv_layout.height - rv.height
+        if hidden > 0 and scroll_y * hidden > rv.height:
+            return
+        self._load_next_songs_page()
+
+    def _load_next_songs_page(self):
+        rv = self.ids.library_rv
+        layout = self.ids.rv_layout
+        tracks, self._songs_cursor = self.library_manager.get_tracks_page(self._songs_cursor)
+        if not tracks:
+            return
+        self._loading_songs_page = True
+        try:
+            # scroll_y is a fraction of the content height, so keep the rows on screen where they are.
+            offset_from_top = (1 - rv.scroll_y) * max(0, layout.height - rv.height)
+            new_height = layout.height + len(tracks) * (layout.default_size[1] + layout.spacing[1])
+            rv.data.extend(self._song_item(t) for t in tracks)
+            rv.scroll_y = 1 - offset_from_top / max(1, new_height - rv.height)
+        finally:
+            self._loading_songs_page = False
+
     def _update_rv(self, mode, data):
         rv = self.ids.library_rv
         layout = self.ids.rv_layout
@@ -301,7 +343,10 @@ class LibraryView(MDBoxLayout):
         self.load_current_view()
 
     def on_song_selected(self, track_id, filepath):
-        if self.current_view_mode in ['search_results', 'all_songs']:
+        if self.current_view_mode == 'all_songs':
+            # The list only holds the pages scrolled so far; queue the whole library.
+            playlist_filepaths = self.library_manager.get_all_track_filepaths()
+        elif self.current_view_mode == 'search_results':
             playlist_filepaths = [track['filepath'] for track in self._last_search_results]
         else:
             album_tracks_data = self.ids.library_rv.data
@@ -335,6 +380,8 @@ class LibraryView(MDBoxLayout):
         pass
 
     def on_search_text(self, query: str):
+        # Typing starts the fuzzy index build, so a query with no exact matches finds it ready.
+        self.library_manager.warm_fuzzy_index()
         Clock.unschedule(self._perform_search)
         Clock.schedule_once(lambda dt: self._perform_search(query), 0.3)
 
@@ -181,11 +181,9 @@ class MainScreen(MDScreen):
         This is the central trigger for all theme updates.
         """
         if media_path:
-            track_meta = self.library_manager.get_track_details_by_filepath(media_path)
+            track_meta = self.library_manager.get_track_summary_by_filepath(media_path) or {}
             self.top_bar_title = track_meta.get('title', "Unknown Title")
-            
-            art_path = self.library_manager.get_album_art_path_for_file(media_path)
-            self._update_theme_from_art(art_path)
+            self._update_theme_from_art(track_meta.get('art_path'))
         else:
             self.top_bar_title = "Harmony Player"
             self._update_theme_from_art(None)
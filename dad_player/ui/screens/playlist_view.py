@@ -99,9 +99,7 @@ class PlaylistView(MDBoxLayout):
         name = self.active_playlist_name
         filepaths = self.playlist_manager.get_tracks_for_playlist(name)
         
-        tracks_details = [
-            self.library_manager.get_track_details_by_filepath(fp) for fp in filepaths
-        ]
+        tracks_details = self.library_manager.get_track_summaries_for_filepaths(filepaths)
         self._populate_song_list([details for details in tracks_details if details])
 
     def _populate_song_list(self, tracks_details: list):
@@ -112,7 +110,7 @@ class PlaylistView(MDBoxLayout):
             'text': track.get('title', 'Unknown Title'),
             'secondary_text': f"{track.get('artist', 'Unknown Artist')} - {track.get('album', 'Unknown Album')}",
             'tertiary_text': format_duration(track.get('duration', 0)),
-            'art_path': self.library_manager.get_album_art_path_for_file(track['filepath']) or self._placeholder_art,
+            'art_path': track.get('art_path') or self._placeholder_art,
             'is_playing': playing_path == track['filepath'],
             'filepath': track['filepath'],
             'on_press_callback': lambda fp=track['filepath']: self.on_song_selected(fp)
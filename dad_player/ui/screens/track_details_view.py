@@ -39,9 +39,7 @@ class TrackDetailsView(MDScreen):
         if not details:
             return
 
-        app = MDApp.get_running_app()
-        art_path = app.library_manager.get_album_art_path_for_file(details.get('filepath', ''))
-        self.album_art_path = art_path if art_path is not None else ""
+        self.album_art_path = details.get('art_path') or ""
         
         self.ids.title_field.text = details.get('title') or ''
         self.ids.artist_field.text = details.get('artist') or ''
@@ -16,6 +16,7 @@ class CustomSettingsPanel(MDBoxLayout):
     autoplay_active = BooleanProperty(False)
     shuffle_active = BooleanProperty(False)
     repeat_mode_text = StringProperty("Repeat: Off")
+    scan_status_text = StringProperty("")
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -27,6 +28,19 @@ class CustomSettingsPanel(MDBoxLayout):
             self.autoplay_active = self.settings_manager.get_autoplay()
             self.shuffle_active = self.settings_manager.get_shuffle()
             self.update_repeat_mode_text()
+        if self.library_manager:
+            self.library_manager.bind(
+                on_scan_progress=self._on_scan_progress,
+                on_scan_finished=self._on_scan_finished
+            )
+            if self.library_manager.is_scanning:
+                self.scan_status_text = self.library_manager.scan_progress_message
+
+    def _on_scan_progress(self, instance, snapshot):
+        self.scan_status_text = snapshot['message']
+
+    def _on_scan_finished(self, instance, message):
+        self.scan_status_text = message
 
     def update_repeat_mode_text(self):
         mode = self.settings_manager.get_repeat_mode()
@@ -57,4 +71,5 @@ class CustomSettingsPanel(MDBoxLayout):
 
     def start_library_scan(self, full_rescan=False):
         if self.library_manager:
+            self.scan_status_text = "Starting scan..."
             self.library_manager.start_scan_music_library(full_rescan=full_rescan)
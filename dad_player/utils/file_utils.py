@@ -5,10 +5,19 @@ import logging
 import os
 import re
 import sys
-from dad_player.constants import APP_NAME
+import time
+from dad_player.constants import APP_NAME, SUPPORTED_AUDIO_EXTENSIONS
 
 log = logging.getLogger(__name__)
 
+# Fingerprints carry a version prefix so rows hashed with an older scheme
+# (plain full-file MD5) can be recognised and upgraded lazily.
+FINGERPRINT_VERSION = "fp1"
+FINGERPRINT_SAMPLE_SIZE = 64 * 1024
+# A directory modified this close to when it was listed may change again within
+# the same timestamp tick (FAT has 2 s resolution), so its mtime is not trusted.
+DIRECTORY_MTIME_SLACK_NS = 2_000_000_000
+
 def get_user_data_dir_for_app() -> str:
     """Gets the platform-specific user data directory for the application."""
     user_data_dir = ""
@@ -46,6 +55,100 @@ def generate_file_hash(filepath: str, block_size: int = 65536) -> str | None:
         log.error(f"Unexpected error hashing file {filepath}: {e}")
         return None
 
+def directory_names_digest(names) -> str:
+    """Order-independent digest of a directory's entry names."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for name in sorted(names):
+        hasher.update(os.fsencode(name))
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+def iter_audio_files(folders, known_dirs=None, visited_dirs=None, on_unchanged_dir=None, force_deep=False):
+    """
+    Lazily walks the given folders with os.scandir and yields a DirEntry for
+    every supported audio file. Filtering uses the directory entry itself, so
+    non-audio files never cost a stat call. Symlinked directories are not
+    followed and unreadable directories are logged and skipped.
+
+    Given `known_dirs`, which maps a directory path to its last
+    (mtime_ns, names_digest, checked_at_ns) fingerprint, only the audio files
+    of directories that changed since then are yielded. Every directory is
+    still listed, but the files of one whose mtime and entry names are
+    unchanged are skipped without a stat call; their count is passed to
+    `on_unchanged_dir(path, audio_file_count)`. Files edited in place do not
+    change their directory's mtime, so `force_deep` disables the skipping for
+    a full per-file check. The fresh fingerprint of each listed directory is
+    stored in `visited_dirs`.
+    """
+    fingerprint_dirs = known_dirs is not None
+    for folder in folders:
+        if not os.path.isdir(folder):
+            log.warning(f"Music folder is not a directory, skipping: {folder}")
+            continue
+        pending_dirs = [folder]
+        while pending_dirs:
+            current = pending_dirs.pop()
+            names, audio_entries = [], []
+            try:
+                if fingerprint_dirs:
+                    mtime_ns = os.stat(current).st_mtime_ns
+                    checked_at_ns = time.time_ns()
+                with os.scandir(current) as it:
+                    for entry in it:
+                        names.append(entry.name)
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                pending_dirs.append(entry.path)
+                            elif entry.name.lower().endswith(SUPPORTED_AUDIO_EXTENSIONS) and entry.is_file():
+                                audio_entries.append(entry)
+                        except OSError as e:
+                            log.warning(f"Could not inspect {entry.path}: {e}")
+            except OSError as e:
+                log.warning(f"Could not list directory {current}: {e}")
+                continue
+
+            if fingerprint_dirs:
+                digest = directory_names_digest(names)
+                known = known_dirs.get(current)
+                if visited_dirs is not None:
+                    visited_dirs[current] = (mtime_ns, digest, checked_at_ns)
+                if (not force_deep and known
+                        and known[0] == mtime_ns and known[1] == digest
+                        and mtime_ns < known[2] - DIRECTORY_MTIME_SLACK_NS):
+                    if on_unchanged_dir:
+                        on_unchanged_dir(current, len(audio_entries))
+                    continue
+            yield from audio_entries
+
+def generate_file_fingerprint(filepath: str, sample_size: int = FINGERPRINT_SAMPLE_SIZE) -> str | None:
+    """
+    Generates a fast content fingerprint from the file size plus fixed-size
+    samples of the head, middle and tail of the file, instead of reading all
+    of it. Small files are hashed whole. The result looks like 'fp1:<hex>'.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    try:
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            hasher.update(size.to_bytes(8, "little"))
+            if size <= sample_size * 3:
+                hasher.update(f.read())
+            else:
+                for offset in (0, (size - sample_size) // 2, size - sample_size):
+                    f.seek(offset)
+                    hasher.update(f.read(sample_size))
+        return f"{FINGERPRINT_VERSION}:{hasher.hexdigest()}"
+    except FileNotFoundError:
+        log.warning(f"File not found for fingerprinting: {filepath}")
+        return None
+    except OSError as e:
+        log.error(f"Could not read file for fingerprinting {filepath}: {e}")
+        return None
+
+def is_current_fingerprint(file_hash: str | None) -> bool:
+    """True if `file_hash` was produced by the current fingerprint scheme."""
+    return bool(file_hash) and file_hash.startswith(f"{FINGERPRINT_VERSION}:")
+
 def sanitize_filename_for_cache(filename: str) -> str:
     """Creates a safe filename string for caching purposes."""
     if not filename:
@@ -1,7 +1,18 @@
 # main_dad_player.py
 
+import multiprocessing
 import os
 import sys
+
+# --- Headless Library Commands ---
+# `python main_dad_player.py [options] scan|rescan|stats|vacuum|verify` never starts
+# the UI. It is routed here, before Kivy is configured, so no window or VLC is set up.
+if __name__ == "__main__":
+    from dad_player.cli import COMMANDS, run_cli
+    if any(arg in COMMANDS for arg in sys.argv[1:]):
+        multiprocessing.freeze_support()
+        sys.exit(run_cli(sys.argv[1:]))
+
 from logging_config import setup_logging
 
 from kivy.config import Config
@@ -45,4 +56,6 @@ def main():
     run_gui_app()
 
 if __name__ == "__main__":
+    # Required for the optional process-based scan pool in frozen builds.
+    multiprocessing.freeze_support()
     main()
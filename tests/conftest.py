@@ -0,0 +1,36 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+# Read by Kivy at import time: no argument parsing, no console log, throwaway config dir.
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+os.environ.setdefault("KIVY_HOME", tempfile.mkdtemp(prefix="harmony_kivy_"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def music_dir(tmp_path):
+    path = tmp_path / "music"
+    path.mkdir()
+    return str(path)
+
+
+@pytest.fixture
+def library(tmp_path, music_dir):
+    """A LibraryManager with its own data directory, watching `music_dir`."""
+    from dad_player.core.library_manager import LibraryManager
+    from dad_player.core.settings_manager import SettingsManager
+
+    data_dir = str(tmp_path / "data")
+    os.makedirs(data_dir)
+    settings = SettingsManager(data_dir=data_dir)
+    settings.put("music_folders", [music_dir])
+    library = LibraryManager(settings, data_dir=data_dir)
+    yield library
+    library.close()
@@ -0,0 +1,19 @@
+# tests/test_benchmark_helpers.py
+
+import pytest
+
+from benchmarks._common import percentile, summarize
+
+
+def test_percentile_interpolates_between_samples():
+    assert percentile([1.0], 0.95) == 1.0
+    assert percentile([1.0, 2.0], 0.5) == 1.5
+    assert percentile([1.0, 2.0], 0.95) == pytest.approx(1.95)
+    assert percentile(list(range(101)), 0.95) == pytest.approx(95)
+
+
+@pytest.mark.parametrize("count", range(1, 25))
+def test_summary_p95_never_below_median(count):
+    summary = summarize([i / 1000 for i in range(count)])
+    assert summary["runs"] == count
+    assert summary["min_ms"] <= summary["median_ms"] <= summary["p95_ms"] <= summary["max_ms"]
@@ -0,0 +1,39 @@
+# tests/test_file_utils.py
+
+import os
+import time
+
+from dad_player.utils.file_utils import DIRECTORY_MTIME_SLACK_NS, iter_audio_files
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def test_iter_audio_files_yields_audio_files_only(tmp_path):
+    root = str(tmp_path)
+    for name in ("a/01.mp3", "a/cover.jpg", "a/b/02.FLAC", "notes.txt"):
+        _touch(os.path.join(root, name))
+    found = sorted(entry.path for entry in iter_audio_files([root]))
+    assert found == [os.path.join(root, "a", "01.mp3"), os.path.join(root, "a", "b", "02.FLAC")]
+
+
+def test_iter_audio_files_skips_directories_unchanged_since_known(tmp_path):
+    root = str(tmp_path)
+    for name in ("a/01.mp3", "a/02.mp3", "b/03.mp3"):
+        _touch(os.path.join(root, name))
+    visited = {}
+    assert len(list(iter_audio_files([root], {}, visited))) == 3
+
+    # Pretend the listing happened long enough after the last change to trust the mtimes.
+    known = {path: (mtime, digest, checked + DIRECTORY_MTIME_SLACK_NS + 1)
+             for path, (mtime, digest, checked) in visited.items()}
+    _touch(os.path.join(root, "b", "04.mp3"))
+    skipped = []
+    found = [entry.name for entry in iter_audio_files([root], known, {}, lambda path, count: skipped.append((path, count)))]
+    assert sorted(found) == ["03.mp3", "04.mp3"]
+    assert dict(skipped) == {root: 0, os.path.join(root, "a"): 2}
+
+    forced = list(iter_audio_files([root], known, {}, force_deep=True))
+    assert len(forced) == 4
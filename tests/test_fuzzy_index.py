@@ -0,0 +1,74 @@
+# tests/test_fuzzy_index.py
+
+import threading
+import time
+
+from dad_player.core.fuzzy_index import FuzzyIndex
+
+
+class SlowLoader:
+    """Rows for FuzzyIndex; once `block()` is called, loads wait until `finish()`."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+        self._gate = threading.Event()
+        self._gate.set()
+
+    def block(self):
+        self._gate.clear()
+
+    def finish(self):
+        self._gate.set()
+
+    def __call__(self):
+        self.loads += 1
+        self._gate.wait(5)
+        return list(self.rows)
+
+
+def _wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_stale_index_keeps_answering_while_it_rebuilds():
+    loader = SlowLoader([('artist', 1, 'Beyoncé')])
+    index = FuzzyIndex(loader)
+    assert index.build()
+    assert [ref for _, ref, _ in index.search('beyonce')] == [1]
+
+    loader.rows = [('artist', 1, 'Beyoncé'), ('artist', 2, 'Radiohead')]
+    loader.block()
+    index.invalidate()
+    started = time.perf_counter()
+    # Answered from the previous build; the rebuild waits on the loader in the background.
+    assert [ref for _, ref, _ in index.search('beyonce')] == [1]
+    assert index.search('radiohed') == []
+    for _ in range(5):
+        index.warm()
+    assert time.perf_counter() - started < 1
+    _wait_until(lambda: loader.loads == 2)
+
+    loader.finish()
+    _wait_until(lambda: [ref for _, ref, _ in index.search('radiohed')] == [2])
+    assert loader.loads == 2
+
+
+def test_change_during_rebuild_triggers_another_pass():
+    loader = SlowLoader([('track', 1, 'Yesterday')])
+    released = []
+    index = FuzzyIndex(loader, release=lambda: released.append(threading.current_thread().name))
+    loader.block()
+    index.warm()
+    _wait_until(lambda: loader.loads == 1)
+
+    loader.rows = [('track', 2, 'Tomorrow')]
+    index.invalidate()
+    loader.finish()
+    _wait_until(lambda: released)
+    assert loader.loads == 2
+    assert [ref for _, ref, _ in index.search('tomorow')] == [2]
+    assert released == ['fuzzy-index']
@@ -0,0 +1,12 @@
+# tests/test_library_search.py
+
+from benchmarks.synthetic_library import generate_library
+
+
+def test_like_fallback_respects_limit(library, music_dir):
+    generate_library(music_dir, 12)
+    library.run_scan()
+    # As on an SQLite build without FTS5.
+    library._search_index = False
+    assert len(library.search_tracks("song")) == 12
+    assert len(library.search_tracks("song", limit=5)) == 5
@@ -0,0 +1,166 @@
+# tests/test_library_watcher.py
+
+import ctypes
+import os
+import struct
+import threading
+import time
+
+from dad_player.core.library_watcher import (
+    EVENT_CHANGED, EVENT_DELETED, EVENT_OVERFLOW, FILE_ACTION_ADDED, FILE_ACTION_MODIFIED,
+    FILE_ACTION_REMOVED, FILE_ACTION_RENAMED_NEW_NAME, FILE_ACTION_RENAMED_OLD_NAME,
+    LibraryWatcher, PollingWatcherBackend, WindowsWatcherBackend,
+)
+
+
+def _notify_buffer(records):
+    """Packs (action, name) pairs the way ReadDirectoryChangesW fills its buffer."""
+    entries = []
+    for action, name in records:
+        encoded = name.encode("utf-16-le")
+        entry = struct.pack("<II", action, len(encoded)) + encoded
+        entries.append(entry + b"\0" * (-(len(entry) + 4) % 4))
+    data = b""
+    for i, entry in enumerate(entries):
+        next_offset = len(entry) + 4 if i < len(entries) - 1 else 0
+        data += struct.pack("<I", next_offset) + entry
+    return data
+
+
+class FakeKernel32:
+    """Hands each ReadDirectoryChangesW call the next scripted buffer, then blocks until cancelled."""
+
+    def __init__(self, buffers):
+        self.buffers = list(buffers)
+        self.cancelled = threading.Event()
+        self.closed = []
+
+    def CreateFileW(self, path, *args):
+        return 42
+
+    def ReadDirectoryChangesW(self, handle, buffer, size, subtree, notify_filter, returned, overlapped, routine):
+        if not self.buffers:
+            self.cancelled.wait(5)
+            return False
+        data = self.buffers.pop(0)
+        ctypes.memmove(buffer, data, len(data))
+        returned._obj.value = len(data)
+        return True
+
+    def CancelIoEx(self, handle, overlapped):
+        self.cancelled.set()
+        return True
+
+    def CloseHandle(self, handle):
+        self.closed.append(handle)
+        return True
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_windows_backend_reports_events_from_notify_buffer(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "Old Album", "CD1"))
+    os.makedirs(os.path.join(root, "New Album"))
+    open(os.path.join(root, "New Album", "01.flac"), "wb").close()
+    events = []
+    kernel32 = FakeKernel32([
+        _notify_buffer([
+            (FILE_ACTION_MODIFIED, "song.mp3"),
+            (FILE_ACTION_REMOVED, "cover.jpg"),
+            (FILE_ACTION_REMOVED, "gone.ogg"),
+            (FILE_ACTION_RENAMED_OLD_NAME, "Old Album"),
+            (FILE_ACTION_RENAMED_NEW_NAME, "New Album"),
+            (FILE_ACTION_MODIFIED, "New Album"),
+        ]),
+        b"",  # Nothing returned: the buffer overflowed.
+    ])
+    backend = WindowsWatcherBackend([root], lambda kind, path: events.append((kind, path)), kernel32=kernel32)
+    backend.start()
+    assert _wait_for(lambda: len(events) == 5)
+    backend.stop()
+
+    assert events == [
+        (EVENT_CHANGED, os.path.join(root, "song.mp3")),
+        (EVENT_DELETED, os.path.join(root, "gone.ogg")),
+        (EVENT_DELETED, os.path.join(root, "Old Album")),
+        (EVENT_CHANGED, os.path.join(root, "New Album", "01.flac")),
+        (EVENT_OVERFLOW, root),
+    ]
+    assert kernel32.closed == [42]
+    # The renamed-away folder and its subfolder are forgotten; the new one is tracked.
+    assert backend._dirs[root] == {root, os.path.join(root, "New Album")}
+
+
+def test_windows_backend_walks_added_folder(tmp_path):
+    root = str(tmp_path)
+    events = []
+    kernel32 = FakeKernel32([])
+    backend = WindowsWatcherBackend([root], lambda kind, path: events.append((kind, path)), kernel32=kernel32)
+    os.makedirs(os.path.join(root, "Copied", "Disc 2"))
+    open(os.path.join(root, "Copied", "Disc 2", "03.mp3"), "wb").close()
+    backend._handle_events(root, _notify_buffer([(FILE_ACTION_ADDED, "Copied")]))
+    assert events == [(EVENT_CHANGED, os.path.join(root, "Copied", "Disc 2", "03.mp3"))]
+
+
+class FakeLibrary:
+    is_scanning = False
+
+    def __init__(self):
+        self.applied = []
+        self.scans = []
+
+    def apply_file_changes(self, changed, deleted):
+        self.applied.append((sorted(changed), sorted(deleted)))
+
+    def start_scan_music_library(self, full_rescan=False, force_deep=None, folders=None):
+        self.scans.append((force_deep, folders))
+
+
+def test_overflow_deep_rescans_only_the_affected_folder():
+    library = FakeLibrary()
+    watcher = LibraryWatcher(library, settings_manager=None)
+    lost, other = os.path.join(os.sep, "music", "a"), os.path.join(os.sep, "music", "b")
+    watcher.record_event(EVENT_CHANGED, os.path.join(lost, "1.mp3"))
+    watcher.record_event(EVENT_OVERFLOW, lost)
+    watcher.record_event(EVENT_CHANGED, os.path.join(other, "2.mp3"))
+    watcher.record_event(EVENT_DELETED, os.path.join(other, "3.mp3"))
+
+    assert watcher.flush()
+    assert library.applied == [([os.path.join(other, "2.mp3")], [os.path.join(other, "3.mp3")])]
+    assert library.scans == [(True, [lost])]
+
+
+def test_overflow_of_unknown_folder_deep_rescans_everything():
+    library = FakeLibrary()
+    watcher = LibraryWatcher(library, settings_manager=None)
+    watcher.record_event(EVENT_CHANGED, os.path.join(os.sep, "music", "1.mp3"))
+    watcher.record_event(EVENT_OVERFLOW, None)
+
+    assert watcher.flush()
+    assert library.applied == []
+    assert library.scans == [(True, None)]
+
+
+def test_polling_backend_rereads_only_changed_directories(tmp_path):
+    root = str(tmp_path)
+    os.makedirs(os.path.join(root, "Album"))
+    song = os.path.join(root, "Album", "01.mp3")
+    with open(song, "wb") as f:
+        f.write(b"a")
+    events = []
+    backend = PollingWatcherBackend([root], lambda kind, path: events.append((kind, path)))
+
+    added = os.path.join(root, "Album", "02.mp3")
+    open(added, "wb").close()
+    assert backend.poll() == 1
+    assert events == [(EVENT_CHANGED, added)]
+
+    os.remove(added)
+    assert backend.poll() == 1
+    assert events[-1] == (EVENT_DELETED, added)
@@ -0,0 +1,146 @@
+# tests/test_query_plans.py
+#
+# Runs every LibraryManager query method against a small synthetic library,
+# captures the SQL it executes and checks its `EXPLAIN QUERY PLAN`: each
+# query must use the indexes it was written for and scan no table in full
+# unless listed below.
+
+import os
+import re
+
+import pytest
+
+from benchmarks.synthetic_library import generate_library
+
+LIBRARY_TRACKS = 300
+
+# name -> (call, indexes the plan must use, tables it may read in full). "rowid"
+# stands for an INTEGER PRIMARY KEY lookup. Full scans are allowed for
+# whole-library listings and for substring LIKE searches no b-tree can serve.
+QUERIES = {
+    "get_all_artists": (
+        lambda lib, s: lib.get_all_artists(), {"sqlite_autoindex_artists_1"}, {"artists"}),
+    "get_all_albums": (
+        lambda lib, s: lib.get_all_albums(), {"sqlite_autoindex_albums_1"}, {"albums"}),
+    "get_all_albums_consolidated": (
+        lambda lib, s: lib.get_all_albums(consolidated=True), set(), {"album_groups"}),
+    "get_albums_by_artist": (
+        lambda lib, s: lib.get_albums_by_artist(s["artist_id"]), {"idx_albums_artist", "rowid"}, set()),
+    "get_albums_by_artist_all": (
+        lambda lib, s: lib.get_albums_by_artist(None), {"sqlite_autoindex_albums_1"}, {"albums"}),
+    "get_tracks_by_album": (
+        lambda lib, s: lib.get_tracks_by_album(s["album_id"]), {"idx_tracks_album", "rowid"}, set()),
+    "get_tracks_by_album_name": (
+        lambda lib, s: lib.get_tracks_by_album_name(s["album_name"]),
+        {"sqlite_autoindex_albums_1", "idx_tracks_album"}, set()),
+    "search_tracks_all": (
+        lambda lib, s: lib.search_tracks(""), {"idx_tracks_listing"}, {"tracks"}),
+    # Walks idx_tracks_listing from the start, but LIMIT stops it after one page.
+    "get_tracks_page_first": (
+        lambda lib, s: lib.get_tracks_page(limit=50), {"idx_tracks_listing"}, {"tracks"}),
+    "get_tracks_page_next": (
+        lambda lib, s: lib.get_tracks_page(s["page_cursor"], limit=50), {"idx_tracks_listing"}, set()),
+    "get_all_track_filepaths": (
+        lambda lib, s: lib.get_all_track_filepaths(), {"idx_tracks_listing"}, {"tracks"}),
+    "search_tracks": (
+        lambda lib, s: lib.search_tracks("song 00"), {"rowid"}, set()),
+    "search_tracks_like": (
+        lambda lib, s: lib._search_tracks_like("song 00"),
+        {"idx_tracks_album", "idx_tracks_artist"}, {"tracks", "albums", "artists"}),
+    "fuzzy_search_tracks": (
+        lambda lib, s: lib.fuzzy_search_tracks("sonh 000010"), {"rowid"}, set()),
+    "get_track_summary_by_filepath": (
+        lambda lib, s: lib.get_track_summary_by_filepath(s["path"]), {"sqlite_autoindex_tracks_1"}, set()),
+    "get_track_details_by_filepath": (
+        lambda lib, s: lib.get_track_details_by_filepath(s["path"], include_text=True),
+        {"sqlite_autoindex_tracks_1", "rowid"}, set()),
+    "get_track_summaries_for_filepaths": (
+        lambda lib, s: lib.get_track_summaries_for_filepaths([s["path"]] * 3), {"sqlite_autoindex_tracks_1"}, set()),
+    "get_track_details_for_ids": (
+        lambda lib, s: lib.get_track_details_for_ids([1, 2, 3], include_text=True), {"rowid"}, set()),
+    "get_album_art_path_for_file": (
+        lambda lib, s: lib.get_album_art_path_for_file(s["path"]), {"sqlite_autoindex_tracks_1"}, set()),
+    "clean_orphans": (
+        lambda lib, s: lib._clean_orphans(),
+        {"idx_tracks_album", "idx_tracks_artist", "idx_albums_artist"}, {"albums", "artists"}),
+}
+
+_SCAN_RE = re.compile(r"\bSCAN (\w+)")
+_INDEX_RE = re.compile(r"\bUSING (?:COVERING )?INDEX (\w+)")
+
+
+def _plan(conn, sql):
+    """(tables read in full, indexes used) for one statement, with aliases resolved to table names."""
+    aliases = dict((alias, table) for table, alias in re.findall(r"\b(?:FROM|JOIN)\s+(\w+)\s+(?:AS\s+)?(\w+)", sql, re.I))
+    scans, indexes = set(), set()
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        detail = row[3]
+        indexes.update(_INDEX_RE.findall(detail))
+        if "USING INTEGER PRIMARY KEY" in detail:
+            indexes.add("rowid")
+        match = _SCAN_RE.search(detail)
+        # Walking a whole index is still a full scan; only SEARCH narrows the rows read.
+        # FTS5 reports its MATCH lookups as a SCAN of the virtual table.
+        if match and "CONSTANT ROW" not in detail and "VIRTUAL TABLE" not in detail:
+            scans.add(aliases.get(match.group(1), match.group(1)))
+    return scans, indexes
+
+
+def _capture(conn, call):
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        call()
+    finally:
+        conn.set_trace_callback(None)
+    return [s for s in statements if s.lstrip().upper().startswith(("SELECT", "DELETE", "UPDATE", "WITH"))]
+
+
+@pytest.fixture(scope="module")
+def planned_library(tmp_path_factory):
+    from dad_player.core.library_manager import LibraryManager
+    from dad_player.core.settings_manager import SettingsManager
+
+    root = tmp_path_factory.mktemp("plans")
+    music_dir, data_dir = str(root / "music"), str(root / "data")
+    os.makedirs(data_dir)
+    generate_library(music_dir, LIBRARY_TRACKS)
+    settings = SettingsManager(data_dir=data_dir)
+    settings.put("music_folders", [music_dir])
+    library = LibraryManager(settings, data_dir=data_dir)
+    library.run_scan(full_rescan=True)
+    conn = library._get_db_connection()
+    # Real libraries have planner statistics; give the small test library the same.
+    conn.execute("ANALYZE")
+    # Loading the fuzzy index reads every name once, and FTS5 reads its config
+    # table once per connection; only the per-query lookups are checked.
+    library._fuzzy_index.build()
+    library.search_tracks("warm up")
+    album = library.get_all_albums()[0]
+    samples = {
+        "artist_id": library.get_all_artists()[0]["id"],
+        "album_id": album["id"],
+        "album_name": album["name"],
+        "path": library.search_tracks("")[0]["filepath"],
+        "page_cursor": library.get_tracks_page(limit=50)[1],
+    }
+    yield library, conn, samples
+    library.close()
+
+
+@pytest.mark.parametrize("name", QUERIES)
+def test_query_uses_its_indexes(planned_library, name):
+    library, conn, samples = planned_library
+    call, expected_indexes, allowed_scans = QUERIES[name]
+    # Cached rows would skip the SQL under test.
+    library._track_cache.clear()
+    statements = _capture(conn, lambda: call(library, samples))
+    assert statements, f"{name} ran no SQL"
+
+    scans, indexes = set(), set()
+    for sql in statements:
+        statement_scans, statement_indexes = _plan(conn, sql)
+        scans |= statement_scans
+        indexes |= statement_indexes
+    assert scans <= allowed_scans, f"{name} scans {sorted(scans - allowed_scans)} in full"
+    assert expected_indexes <= indexes, f"{name} does not use {sorted(expected_indexes - indexes)}"
@@ -0,0 +1,50 @@
+# tests/test_scan_checkpoint.py
+
+import os
+import shutil
+import threading
+
+from benchmarks.synthetic_library import generate_library
+from dad_player.core import library_manager as library_module
+
+
+def test_failed_file_is_retried_when_a_cancelled_scan_resumes(library, music_dir, tmp_path, monkeypatch):
+    good = generate_library(music_dir, 3)
+    broken = os.path.join(os.path.dirname(good[0]), "04 - Half Copied.mp3")
+    with open(broken, "wb") as f:
+        f.write(b"not an mp3 yet" * 64)
+
+    # Stop the scan once every file has been extracted but before the folder is
+    # marked complete, which is where a user pressing Stop usually lands.
+    extracted, all_extracted = [], threading.Event()
+    real_extract, real_walk = library_module.extract_track_record, library_module.iter_audio_files
+
+    def extract(*args, **kwargs):
+        record = real_extract(*args, **kwargs)
+        extracted.append(record['filepath'])
+        if len(extracted) == len(good) + 1:
+            all_extracted.set()
+        return record
+
+    def walk_then_stop(*args, **kwargs):
+        yield from real_walk(*args, **kwargs)
+        assert all_extracted.wait(10)
+        library.stop_scan()
+
+    monkeypatch.setattr(library_module, "extract_track_record", extract)
+    monkeypatch.setattr(library_module, "iter_audio_files", walk_then_stop)
+    assert library.run_scan().startswith("Scan paused")
+    assert library.last_scan_stats['failed'] == 1
+
+    checkpoint = library._load_scan_checkpoint()
+    assert checkpoint['done_paths'] == set(good)
+
+    # The copy finishes; the resumed scan must pick the file up.
+    spare = generate_library(str(tmp_path / "spare"), len(good) + 1)[-1]
+    shutil.copyfile(spare, broken)
+    monkeypatch.undo()
+    assert library.run_scan().startswith("Library scan completed")
+    assert library.last_scan_stats['checkpoint_skipped'] == len(good)
+    assert library.last_scan_stats['added'] == 1
+    assert library.last_scan_stats['failed'] == 0
+    assert broken in library.get_all_track_filepaths()
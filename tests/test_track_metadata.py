@@ -0,0 +1,11 @@
+# tests/test_track_metadata.py
+
+from benchmarks.synthetic_library import generate_library
+
+
+def test_ogg_file_without_cover_art_is_added(library, music_dir):
+    paths = generate_library(music_dir, 2, formats=("ogg",))
+    library.run_scan()
+    assert library.last_scan_stats['failed'] == 0
+    assert library.last_scan_stats['added'] == 2
+    assert sorted(library.get_all_track_filepaths()) == sorted(paths)